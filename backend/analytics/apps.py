@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class AnalyticsConfig(AppConfig):
     name = 'analytics'
+
+    def ready(self):
+        # Connects the signal handlers that keep VisitDailyRollup up to date
+        from . import rollup  # noqa: F401
@@ -0,0 +1,218 @@
+"""
+Asynchronous execution of analytics jobs.
+
+submit() records an AnalyticsJob and, in the default "thread" mode, hands
+it to a small in-process thread pool so the HTTP worker that accepted it
+returns immediately.  In "external" mode jobs are only recorded and the
+run_analytics_jobs command (a separate process) executes them.  Either
+way the job row is claimed with a conditional UPDATE, so a job never runs
+twice even when several executors poll the same table.
+
+A thread-mode queue dies with its process.  submit() and job polls
+therefore recover jobs no live executor will finish (recover_lost_jobs):
+running jobs past JOB_STALE_MINUTES and jobs left pending past
+JOB_PENDING_STALE_MINUTES are scheduled again in the calling process.
+"""
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.db import connections
+from django.db.models import Q
+from django.utils import timezone
+
+from . import services
+from .models import AnalyticsJob
+
+# "thread": run jobs in this process's pool; "external": leave them to run_analytics_jobs
+JOB_MODE = os.getenv("ANALYTICS_JOB_MODE", "thread")
+
+# Concurrent jobs per process in "thread" mode
+JOB_WORKERS = int(os.getenv("ANALYTICS_JOB_WORKERS", "2"))
+
+# A running job not finished after this long is assumed lost (worker died)
+JOB_STALE_MINUTES = 30
+
+# "thread" mode: a job still pending after this long is assumed lost with
+# the queue of the process that accepted it, and is scheduled again
+JOB_PENDING_STALE_MINUTES = 5
+
+# Seconds between two lost-job recoveries of one process
+JOB_RECOVERY_INTERVAL_SECONDS = 60
+
+
+def _run_forecast(hospital_id, params):
+    return services.forecast_payload(
+        hospital_id,
+        days=params.get("days", 7),
+        reconcile=params.get("reconcile"),
+        budgeted=False,          # no one is waiting on the HTTP request
+    )
+
+
+def _run_disease_distribution(hospital_id, params):
+    return services.disease_payload(
+        hospital_id,
+        params.get("range", "30days"),
+        params.get("dept", "all"),
+    )
+
+
+def _run_evaluate_models(hospital_id, params):
+    return services.evaluate_models(hospital_id)
+
+
+# Job kind → callable(hospital_id, params) returning a JSON-serialisable result
+JOB_KINDS = {
+    "forecast":             _run_forecast,
+    "disease_distribution": _run_disease_distribution,
+    "evaluate_models":      _run_evaluate_models,
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+# Jobs queued on this process's executor, and when lost jobs were last recovered
+_scheduled = set()
+_scheduled_lock = threading.Lock()
+_last_recovery = float("-inf")
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(1, JOB_WORKERS), thread_name_prefix="analytics-job"
+            )
+        return _executor
+
+
+def submit(hospital_id, kind: str, params: dict) -> AnalyticsJob:
+    """
+    Record a job and schedule it.  An identical job (same hospital, kind
+    and params) that is still pending or running is returned instead of
+    creating a duplicate — unless it is stale (running past
+    JOB_STALE_MINUTES), in which case a new job is created.
+    """
+    if kind not in JOB_KINDS:
+        raise ValueError(f"Unknown job kind: {kind}")
+
+    recover_lost_jobs()
+    existing = AnalyticsJob.objects.filter(
+        hospital_id=hospital_id,
+        kind=kind,
+        params=params,
+        status__in=[AnalyticsJob.STATUS_PENDING, AnalyticsJob.STATUS_RUNNING],
+    ).exclude(_stale_running()).order_by('-created_at').first()
+    if existing is not None:
+        return existing
+
+    job = AnalyticsJob.objects.create(hospital_id=hospital_id, kind=kind, params=params)
+    if JOB_MODE == "thread":
+        _schedule(job.id)
+    return job
+
+
+def _schedule(job_id) -> bool:
+    """Queue a job on this process's executor; False if it is already queued here."""
+    with _scheduled_lock:
+        if job_id in _scheduled:
+            return False
+        _scheduled.add(job_id)
+    _get_executor().submit(_run_in_thread, job_id)
+    return True
+
+
+def _run_in_thread(job_id):
+    try:
+        run_job(job_id)
+    finally:
+        with _scheduled_lock:
+            _scheduled.discard(job_id)
+        # Pool threads open their own DB connections — release them
+        connections.close_all()
+
+
+def claim(job_id) -> bool:
+    """Atomically move a pending job to running; False if someone else got it."""
+    return AnalyticsJob.objects.filter(
+        id=job_id, status=AnalyticsJob.STATUS_PENDING
+    ).update(status=AnalyticsJob.STATUS_RUNNING, started_at=timezone.now()) == 1
+
+
+def run_job(job_id) -> bool:
+    """Claim and execute one job.  Returns False if it was already claimed."""
+    if not claim(job_id):
+        return False
+
+    job = AnalyticsJob.objects.get(id=job_id)
+    try:
+        result = JOB_KINDS[job.kind](job.hospital_id, job.params)
+        AnalyticsJob.objects.filter(id=job_id).update(
+            status=AnalyticsJob.STATUS_SUCCEEDED,
+            result=result,
+            finished_at=timezone.now(),
+        )
+    except Exception as e:
+        print(f"[AnalyticsJob] {job.kind} job {job_id} failed: {e}")
+        traceback.print_exc()
+        AnalyticsJob.objects.filter(id=job_id).update(
+            status=AnalyticsJob.STATUS_FAILED,
+            error=str(e),
+            finished_at=timezone.now(),
+        )
+    return True
+
+
+def _stale_running() -> Q:
+    """Running jobs whose worker is assumed dead (see JOB_STALE_MINUTES)."""
+    cutoff = timezone.now() - timedelta(minutes=JOB_STALE_MINUTES)
+    return Q(status=AnalyticsJob.STATUS_RUNNING, started_at__lt=cutoff)
+
+
+def requeue_stale_jobs() -> int:
+    """Return jobs whose worker died mid-run to the pending queue."""
+    return AnalyticsJob.objects.filter(_stale_running()).update(
+        status=AnalyticsJob.STATUS_PENDING, started_at=None
+    )
+
+
+def recover_lost_jobs(force: bool = False) -> int:
+    """
+    "thread" mode: requeue stale running jobs, then schedule in this process
+    every job pending for longer than JOB_PENDING_STALE_MINUTES that is not
+    already queued here.  If the job is in fact still queued in a live
+    process, claim() lets only one of the two run it.  Runs at most once
+    per JOB_RECOVERY_INTERVAL_SECONDS (unless `force`); returns the number
+    of jobs scheduled.
+    """
+    global _last_recovery
+    if JOB_MODE != "thread":
+        return 0
+    now = time.monotonic()
+    with _scheduled_lock:
+        if not force and now - _last_recovery < JOB_RECOVERY_INTERVAL_SECONDS:
+            return 0
+        _last_recovery = now
+
+    requeue_stale_jobs()
+    cutoff = timezone.now() - timedelta(minutes=JOB_PENDING_STALE_MINUTES)
+    lost = AnalyticsJob.objects.filter(
+        status=AnalyticsJob.STATUS_PENDING, created_at__lt=cutoff
+    ).values_list('id', flat=True)
+    recovered = sum(_schedule(job_id) for job_id in lost)
+    if recovered:
+        print(f"[AnalyticsJob] Rescheduled {recovered} lost job(s).")
+    return recovered
+
+
+def pending_job_ids(limit: int):
+    return list(
+        AnalyticsJob.objects.filter(status=AnalyticsJob.STATUS_PENDING)
+        .order_by('created_at')
+        .values_list('id', flat=True)[:limit]
+    )
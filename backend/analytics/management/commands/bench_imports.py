@@ -0,0 +1,107 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Runs in a fresh interpreter: boot Django the way a gunicorn worker does
+# (WSGI application + URLconf, which imports every view module), then
+# report the boot time, resident memory and which heavy libraries loaded.
+PROBE_SCRIPT = r"""
+import json, os, sys, time
+started = time.perf_counter()
+
+from sih_backend.wsgi import application
+from django.urls import get_resolver
+get_resolver().url_patterns
+booted = time.perf_counter()
+
+first_use = None
+if os.environ.get("BENCH_FIRST_USE") == "1":
+    from analytics import ml_models
+    ml_models.ARIMAForecaster, ml_models.DiseaseClassifier
+    first_use = time.perf_counter() - booted
+
+def rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+print(json.dumps({
+    "boot_seconds": booted - started,
+    "first_use_seconds": first_use,
+    "rss_mb": rss_mb(),
+    "loaded": sorted(m for m in ("numpy", "pandas", "statsmodels", "pmdarima", "sklearn")
+                     if m in sys.modules),
+}))
+"""
+
+# name → extra environment for the probe process
+SCENARIOS = {
+    "boot":              {},
+    "boot+warm":         {"ANALYTICS_PRELOAD_MODELS": "1"},
+    "boot+first_use":    {"BENCH_FIRST_USE": "1"},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures worker boot time and resident memory in fresh interpreters, "
+        "with and without analytics model warm-up"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Fresh interpreters per scenario (default: 5)')
+        parser.add_argument('--json', action='store_true',
+                            help='Print machine-readable results')
+
+    def handle(self, *args, **options):
+        results = {
+            name: self._run_scenario(extra_env, max(1, options['repeat']))
+            for name, extra_env in SCENARIOS.items()
+        }
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        self.stdout.write(f"{'scenario':<16}{'boot (ms)':>11}{'first use (ms)':>16}{'RSS (MB)':>10}  loaded")
+        for name, r in results.items():
+            first_use = f"{r['first_use_ms']:.0f}" if r['first_use_ms'] is not None else "-"
+            self.stdout.write(
+                f"{name:<16}{r['boot_ms']:>11.0f}{first_use:>16}{r['rss_mb']:>10.1f}  "
+                f"{', '.join(r['loaded']) or '-'}"
+            )
+
+    def _run_scenario(self, extra_env, repeat):
+        env = {
+            **os.environ,
+            "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "sih_backend.settings"),
+            "ANALYTICS_PRELOAD_MODELS": "0",
+            **extra_env,
+        }
+        runs = []
+        for _ in range(repeat):
+            out = subprocess.run(
+                [sys.executable, "-c", PROBE_SCRIPT],
+                cwd=settings.BASE_DIR, env=env,
+                capture_output=True, text=True, check=True,
+            ).stdout
+            # The JSON report is the probe's last line (warm-up may print before it)
+            runs.append(json.loads(out.strip().splitlines()[-1]))
+
+        first_use = [r["first_use_seconds"] for r in runs if r["first_use_seconds"] is not None]
+        return {
+            "boot_ms":      round(statistics.median(r["boot_seconds"] for r in runs) * 1000, 1),
+            "first_use_ms": round(statistics.median(first_use) * 1000, 1) if first_use else None,
+            "rss_mb":       round(statistics.median(r["rss_mb"] for r in runs), 1),
+            "loaded":       runs[-1]["loaded"],
+            "runs":         repeat,
+        }
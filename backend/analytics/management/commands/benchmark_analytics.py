@@ -0,0 +1,282 @@
+import glob
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import timedelta
+
+import pandas as pd
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from hospitals.models import Department, Hospital
+from analytics import rollup, synthetic
+from analytics.ml_models import arima_model, disease_model, fingerprint
+from analytics.ml_models.model_cache import model_cache
+
+# Dataset scales: generate_synthetic_data parameters per scale.  Each scale
+# is one labelled synthetic hospital, generated on first use and reused.
+SCALES = {
+    "small":  {"departments": 4,  "doctors": 2, "patients": 300,   "days": 120,
+               "daily_rate": 8.0,  "seed": 1001},
+    "medium": {"departments": 8,  "doctors": 4, "patients": 5000,  "days": 365,
+               "daily_rate": 30.0, "seed": 1002},
+    "large":  {"departments": 12, "doctors": 6, "patients": 50000, "days": 730,
+               "daily_rate": 90.0, "seed": 1003},
+}
+
+# Benchmarked engine calls: name → callable(hospital_id)
+OPERATIONS = {
+    "forecast_by_department": lambda hid: arima_model.ARIMAForecaster(hid).forecast_by_department(
+        steps=30, budgeted=False
+    ),
+    "get_distribution":       lambda hid: disease_model.DiseaseClassifier(hid).get_distribution(days=30),
+    "get_trending_diagnoses": lambda hid: disease_model.DiseaseClassifier(hid).get_trending_diagnoses(days=30),
+    "arima_evaluate":         lambda hid: arima_model.ARIMAForecaster(hid).evaluate(workers=0),
+    "disease_evaluate":       lambda hid: disease_model.DiseaseClassifier(hid).evaluate(),
+    # Cache-key fingerprints — must stay far cheaper than the fits they save
+    "visits_fingerprint":     lambda hid: fingerprint.for_visits(hid, 30),
+    "series_fingerprint":     lambda hid: _series_fingerprints(hid),
+}
+
+# Fingerprint operation → the cold (fitting) operation it is compared with
+FINGERPRINT_BASELINES = {
+    "visits_fingerprint": "get_distribution",
+    "series_fingerprint": "forecast_by_department",
+}
+
+
+def _series_fingerprints(hospital_id):
+    """Fingerprints of every department series of the department forecast window."""
+    departments = list(Department.objects.filter(hospital_id=hospital_id).values_list("id", flat=True))
+    end_date = timezone.now()
+    dates, matrix = arima_model._load_visit_matrix(
+        hospital_id, end_date - timedelta(days=90), end_date, departments
+    )
+    return [fingerprint.of_series(pd.Series(row, index=dates)) for row in matrix[:-1]]
+
+# Metrics compared by --compare (lower is better for all of them)
+COMPARED_METRICS = ("cold_ms", "warm_ms", "peak_mb", "queries")
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks the analytics engines on small/medium/large synthetic "
+        "datasets: cold and warm latency, peak Python memory and query counts"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scales', type=str, default='small,medium',
+                            help=f"Comma-separated scales ({', '.join(SCALES)}; default: small,medium)")
+        parser.add_argument('--operations', type=str, default=','.join(OPERATIONS),
+                            help='Comma-separated operations to run (default: all)')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Warm runs per operation; the median is reported (default: 5)')
+        parser.add_argument('--regenerate', action='store_true',
+                            help='Rebuild the scale datasets even if they already exist')
+        parser.add_argument('--output', type=str, default=None,
+                            help='Write the JSON results to this file')
+        parser.add_argument('--compare', type=str, default=None,
+                            help='Earlier results file to compare against')
+        parser.add_argument('--max-regression', type=float, default=None,
+                            help='With --compare, fail when any metric grows by more than '
+                                 'this fraction (e.g. 0.2 = 20%%)')
+
+    def handle(self, *args, **options):
+        scales = self._pick(options['scales'], SCALES, 'scale')
+        operations = self._pick(options['operations'], OPERATIONS, 'operation')
+        repeat = max(1, options['repeat'])
+
+        results = {
+            "meta": self._meta(),
+            "scales": {},
+        }
+        for scale in scales:
+            hospital, visits = self._dataset(scale, options['regenerate'])
+            self.stdout.write(f"[{scale}] {visits} visits — hospital {hospital.id}")
+            results["scales"][scale] = {
+                "visits": visits,
+                "params": SCALES[scale],
+                "operations": {
+                    name: self._measure(name, hospital.id, repeat) for name in operations
+                },
+            }
+
+        self._print_table(results)
+        self._print_fingerprint_costs(results)
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+        if options['compare']:
+            with open(options['compare']) as f:
+                baseline = json.load(f)
+            worst = self._print_comparison(baseline, results)
+            limit = options['max_regression']
+            if limit is not None and worst > limit:
+                raise CommandError(
+                    f"Regression of {worst:.0%} exceeds the allowed {limit:.0%}"
+                )
+
+    # ------------------------------------------------------------------
+    # Datasets
+    # ------------------------------------------------------------------
+
+    def _dataset(self, scale, regenerate):
+        name = f"{synthetic.SYNTHETIC_PREFIX} bench-{scale}"
+        hospital = Hospital.objects.filter(name=name).first()
+        if hospital is not None and regenerate:
+            # Visits cascade with the hospital; the rollup rows go with it too
+            with rollup.suspended():
+                hospital.delete()
+            hospital = None
+
+        if hospital is None:
+            self.stdout.write(f"[{scale}] Generating dataset...")
+            params = SCALES[scale]
+            synthetic.generate(
+                hospitals=1, label=f"bench-{scale}", log=self.stdout.write, **params
+            )
+            hospital = Hospital.objects.get(name=name)
+
+        return hospital, hospital.visit_set.count()
+
+    # ------------------------------------------------------------------
+    # Measurement
+    # ------------------------------------------------------------------
+
+    def _clear_model_caches(self, hospital_id):
+        """Remove every on-disk and in-memory model of the hospital (cold start)."""
+        for directory in (arima_model.MODEL_CACHE_DIR, disease_model.MODEL_CACHE_DIR):
+            for path in glob.glob(os.path.join(directory, f"*_{hospital_id}_*.pkl")):
+                os.remove(path)
+        model_cache.clear()
+
+    def _run_once(self, operation, hospital_id, trace_memory=False):
+        if trace_memory:
+            tracemalloc.start()
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                OPERATIONS[operation](hospital_id)
+                elapsed = time.perf_counter() - started
+            peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+        finally:
+            if trace_memory:
+                tracemalloc.stop()
+        return elapsed, len(queries), peak
+
+    def _measure(self, operation, hospital_id, repeat):
+        self._clear_model_caches(hospital_id)
+        # Cold run: timed without tracemalloc (it slows allocation-heavy code)
+        cold, cold_queries, _ = self._run_once(operation, hospital_id)
+
+        warm_runs = [self._run_once(operation, hospital_id) for _ in range(repeat)]
+
+        # Peak memory of a cold run, measured separately
+        self._clear_model_caches(hospital_id)
+        _, _, peak = self._run_once(operation, hospital_id, trace_memory=True)
+
+        result = {
+            "cold_ms":      round(cold * 1000, 1),
+            "warm_ms":      round(statistics.median(r[0] for r in warm_runs) * 1000, 1),
+            "peak_mb":      round(peak / 2 ** 20, 2),
+            "queries":      int(statistics.median(r[1] for r in warm_runs)),
+            "cold_queries": cold_queries,
+        }
+        self.stdout.write(
+            f"  {operation:<24} cold {result['cold_ms']:>9.1f} ms  "
+            f"warm {result['warm_ms']:>9.1f} ms  peak {result['peak_mb']:>8.2f} MB  "
+            f"queries {result['cold_queries']}/{result['queries']}"
+        )
+        return result
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def _pick(self, text, choices, kind):
+        names = [n.strip() for n in text.split(',') if n.strip()]
+        unknown = [n for n in names if n not in choices]
+        if unknown:
+            raise CommandError(
+                f"Unknown {kind}(s): {', '.join(unknown)}. Choose from {', '.join(choices)}"
+            )
+        return names
+
+    def _meta(self):
+        try:
+            commit = subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {
+            "commit":    commit,
+            "timestamp": timezone.now().isoformat(),
+            "python":    platform.python_version(),
+            "database":  connection.vendor,
+            "pmdarima":  arima_model.PMDARIMA_AVAILABLE,
+        }
+
+    def _print_table(self, results):
+        self.stdout.write("")
+        self.stdout.write(
+            f"{'scale':<8}{'operation':<26}{'cold (ms)':>11}{'warm (ms)':>11}"
+            f"{'peak (MB)':>11}{'queries':>9}"
+        )
+        for scale, data in results["scales"].items():
+            for name, r in data["operations"].items():
+                self.stdout.write(
+                    f"{scale:<8}{name:<26}{r['cold_ms']:>11.1f}{r['warm_ms']:>11.1f}"
+                    f"{r['peak_mb']:>11.2f}{r['queries']:>9}"
+                )
+
+    def _print_fingerprint_costs(self, results):
+        """Fingerprint latency as a fraction of the cold fit it lets the cache skip."""
+        for scale, data in results["scales"].items():
+            ops = data["operations"]
+            for name, fit_name in FINGERPRINT_BASELINES.items():
+                if name in ops and fit_name in ops and ops[fit_name]["cold_ms"]:
+                    ratio = ops[name]["warm_ms"] / ops[fit_name]["cold_ms"]
+                    self.stdout.write(
+                        f"[{scale}] {name}: {ops[name]['warm_ms']:.1f} ms = "
+                        f"{ratio:.2%} of a cold {fit_name}"
+                    )
+
+    def _print_comparison(self, baseline, results):
+        """Print current/baseline ratios; returns the largest relative increase."""
+        self.stdout.write("")
+        self.stdout.write(
+            f"Compared with {baseline.get('meta', {}).get('commit') or 'baseline'} "
+            f"(ratio current / baseline):"
+        )
+        self.stdout.write(
+            f"{'scale':<8}{'operation':<26}" + "".join(f"{m:>11}" for m in COMPARED_METRICS)
+        )
+        worst = 0.0
+        for scale, data in results["scales"].items():
+            base_ops = baseline.get("scales", {}).get(scale, {}).get("operations", {})
+            for name, r in data["operations"].items():
+                base = base_ops.get(name)
+                if base is None:
+                    continue
+                cells = []
+                for metric in COMPARED_METRICS:
+                    if not base.get(metric):
+                        cells.append(f"{'-':>11}")
+                        continue
+                    ratio = r[metric] / base[metric]
+                    worst = max(worst, ratio - 1)
+                    cells.append(f"{ratio:>11.2f}")
+                self.stdout.write(f"{scale:<8}{name:<26}" + "".join(cells))
+        return worst
@@ -0,0 +1,91 @@
+import json
+import os
+import tempfile
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand
+
+from analytics.ml_models import arima_model
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the compact parameter-only forecaster cache format with "
+        "full results pickles: file size and load+predict latency"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=90,
+                            help='Length of the synthetic daily series (default: 90)')
+        parser.add_argument('--steps', type=int, default=30,
+                            help='Forecast horizon predicted after each load (default: 30)')
+        parser.add_argument('--repeat', type=int, default=20,
+                            help='Load+predict repetitions per format (default: 20)')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--json', action='store_true',
+                            help='Print machine-readable results')
+
+    def handle(self, *args, **options):
+        series = self._synthetic_series(options['days'], options['seed'])
+        steps, repeat = options['steps'], options['repeat']
+
+        t = time.perf_counter()
+        model_fit, order_str = arima_model._estimate(series)
+        fit_seconds = time.perf_counter() - t
+
+        compact = arima_model._compact_model(model_fit)
+        results = {"order": order_str, "days": len(series), "fit_seconds": round(fit_seconds, 4)}
+
+        with tempfile.TemporaryDirectory() as tmp:
+            full_path    = os.path.join(tmp, "full.pkl")
+            compact_path = os.path.join(tmp, "compact.pkl")
+            joblib.dump({"model_fit": model_fit}, full_path)
+            joblib.dump({"model": compact}, compact_path)
+
+            full_forecast = arima_model._predict_values(model_fit, steps)
+            results["full"] = self._measure(
+                full_path, "model_fit", steps, repeat,
+            )
+            results["compact"] = self._measure(
+                compact_path, "model", steps, repeat,
+            )
+            results["max_abs_forecast_diff"] = float(np.max(np.abs(
+                arima_model._compact_forecast(compact, steps) - full_forecast
+            )))
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        self.stdout.write(f"Model {order_str} on {len(series)} days (fit {fit_seconds:.3f}s)")
+        self.stdout.write(f"{'format':<10}{'size (KB)':>12}{'load+predict (ms)':>20}")
+        for name in ("full", "compact"):
+            r = results[name]
+            self.stdout.write(f"{name:<10}{r['bytes'] / 1024:>12.1f}{r['load_predict_ms']:>20.2f}")
+        self.stdout.write(
+            f"Compact is {results['full']['bytes'] / results['compact']['bytes']:.0f}x smaller; "
+            f"max forecast difference {results['max_abs_forecast_diff']:.2e}"
+        )
+
+    def _measure(self, path, key, steps, repeat):
+        timings = []
+        for _ in range(repeat):
+            t = time.perf_counter()
+            arima_model._predict_values(joblib.load(path)[key], steps)
+            timings.append(time.perf_counter() - t)
+        return {
+            "bytes": os.path.getsize(path),
+            "load_predict_ms": round(float(np.median(timings)) * 1000, 3),
+        }
+
+    def _synthetic_series(self, days, seed):
+        """Weekly-seasonal Poisson visit counts with a slight upward trend."""
+        rng = np.random.default_rng(seed)
+        t = np.arange(days)
+        weekly = np.array([1.2, 1.1, 1.0, 1.0, 1.1, 0.6, 0.5])[t % 7]
+        lam = (20 + 0.05 * t) * weekly
+        index = pd.date_range(end=pd.Timestamp.now().floor("D"), periods=days, freq="D")
+        return pd.Series(rng.poisson(lam).astype(float), index=index, name="count")
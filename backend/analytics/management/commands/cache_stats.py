@@ -0,0 +1,55 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from analytics.ml_models.disk_cache import model_disk_caches
+from analytics.ml_models.model_cache import model_cache
+
+
+class Command(BaseCommand):
+    help = (
+        "Reports the on-disk model cache directories (files, bytes, cap, TTL, "
+        "evictions) and this process's in-memory model cache"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--gc', action='store_true',
+                            help='Run a garbage collection (TTL + size cap) before reporting')
+        parser.add_argument('--json', action='store_true',
+                            help='Print the statistics as JSON')
+
+    def handle(self, *args, **options):
+        caches = model_disk_caches()
+        collected = {}
+        if options['gc']:
+            collected = {cache.directory: cache.collect() for cache in caches}
+
+        stats = {
+            "disk":   [cache.stats() for cache in caches],
+            "memory": model_cache.stats(),
+        }
+
+        if options['json']:
+            self.stdout.write(json.dumps({**stats, "gc": collected}, indent=2))
+            return
+
+        for disk in stats["disk"]:
+            used = disk["bytes"] / disk["max_bytes"] if disk["max_bytes"] else 0.0
+            self.stdout.write(
+                f"{disk['directory']}: {disk['files']} files, "
+                f"{disk['bytes'] / 2 ** 20:.1f} / {disk['max_bytes'] / 2 ** 20:.0f} MB ({used:.0%}), "
+                f"TTL {disk['ttl_hours']:.0f}h, least recent use "
+                f"{disk['oldest_use_hours'] if disk['oldest_use_hours'] is not None else '-'}h ago"
+            )
+            result = collected.get(disk["directory"])
+            if result:
+                self.stdout.write(
+                    f"  GC: expired {result['expired']}, evicted {result['evicted']}, "
+                    f"freed {result['freed_bytes'] / 2 ** 20:.1f} MB"
+                )
+
+        memory = stats["memory"]
+        self.stdout.write(
+            f"In-memory model cache (this process): {memory['entries']} entries, "
+            f"{memory['bytes'] / 2 ** 20:.1f} / {memory['max_bytes'] / 2 ** 20:.0f} MB"
+        )
@@ -0,0 +1,77 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from hospitals.models import Hospital
+from analytics.ml_models import arima_model
+from analytics.ml_models.arima_model import ARIMAForecaster
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs the rolling-origin forecast backtest for every hospital (or the "
+        "given ones) and reports per-fold and aggregate MAE/RMSE/MAPE"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hospital', action='append', default=[],
+                            help='Only evaluate these hospital IDs (repeatable)')
+        parser.add_argument('--origins', type=int, default=arima_model.EVAL_ORIGINS,
+                            help=f'Forecast origins per hospital (default: {arima_model.EVAL_ORIGINS})')
+        parser.add_argument('--horizon', type=int, default=14,
+                            help='Days forecast from each origin (default: 14)')
+        parser.add_argument('--stride', type=int, default=arima_model.EVAL_ORIGIN_STRIDE_DAYS,
+                            help='Days between consecutive origins '
+                                 f'(default: {arima_model.EVAL_ORIGIN_STRIDE_DAYS})')
+        parser.add_argument('--history-days', type=int, default=90,
+                            help='Days of history loaded per hospital (default: 90)')
+        parser.add_argument('--workers', type=int, default=arima_model.EVAL_POOL_WORKERS,
+                            help='Process-pool size for fold fits, 0 = sequential '
+                                 f'(default: {arima_model.EVAL_POOL_WORKERS})')
+        parser.add_argument('--json', action='store_true',
+                            help='Print machine-readable results')
+
+    def handle(self, *args, **options):
+        hospitals = Hospital.objects.all().order_by('created_at')
+        if options['hospital']:
+            hospitals = hospitals.filter(id__in=options['hospital'])
+
+        results = {}
+        for hospital in hospitals:
+            t = time.monotonic()
+            result = ARIMAForecaster(hospital_id=hospital.id).evaluate(
+                test_days=options['horizon'],
+                origins=options['origins'],
+                stride_days=options['stride'],
+                history_days=options['history_days'],
+                workers=options['workers'],
+            )
+            result['seconds'] = round(time.monotonic() - t, 3)
+            results[str(hospital.id)] = result
+
+            if not options['json']:
+                self._print_result(hospital, result)
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+
+    def _print_result(self, hospital, result):
+        if result['status'] != 'success':
+            detail = result.get('message') or result.get('error')
+            self.stdout.write(self.style.WARNING(f"{hospital.name}: {result['status']} — {detail}"))
+            return
+
+        self.stdout.write(
+            f"{hospital.name}: MAE {result['mae']}, RMSE {result['rmse']}, "
+            f"MAPE {result['mape']} over {result['origins']} origin(s) "
+            f"({result['folds_failed']} failed, {result['seconds']:.1f}s)"
+        )
+        for fold in result['folds']:
+            if fold['status'] != 'success':
+                self.stdout.write(f"  {fold['origin']}: failed — {fold['error']}")
+                continue
+            self.stdout.write(
+                f"  {fold['origin']} ({fold['train_days']}d train, {fold['model_order']}): "
+                f"MAE {fold['mae']}, RMSE {fold['rmse']}, MAPE {fold['mape']}%"
+            )
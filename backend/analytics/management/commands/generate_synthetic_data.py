@@ -0,0 +1,78 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from analytics import synthetic
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates a reproducible synthetic hospital dataset (hospitals, "
+        "departments, doctors, patients and visits) for load and ML benchmarks"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hospitals', type=int, default=1)
+        parser.add_argument('--departments', type=int, default=4,
+                            help='Departments per hospital (default: 4)')
+        parser.add_argument('--doctors', type=int, default=3,
+                            help='Doctors per department (default: 3)')
+        parser.add_argument('--patients', type=int, default=500,
+                            help='Patients per hospital (default: 500)')
+        parser.add_argument('--days', type=int, default=365,
+                            help='Days of history ending today (default: 365)')
+        parser.add_argument('--daily-rate', type=float, default=20.0,
+                            help='Mean visits per department per day before seasonality')
+        parser.add_argument('--weekly-amplitude', type=float, default=1.0,
+                            help='Strength of the weekday profile (0 = flat week)')
+        parser.add_argument('--annual-amplitude', type=float, default=0.2,
+                            help='Relative amplitude of the winter-peaking annual cycle')
+        parser.add_argument('--outbreaks', type=int, default=2,
+                            help='Diagnosis outbreaks per hospital')
+        parser.add_argument('--diagnosis-mix', type=str, default=None,
+                            help='Comma-separated name=weight pairs (default: built-in mix)')
+        parser.add_argument('--seed', type=int, default=42,
+                            help='Random seed; equal parameters and seed give equal data')
+        parser.add_argument('--batch-size', type=int, default=synthetic.DEFAULT_BATCH_SIZE,
+                            help='Visits per bulk_create call')
+        parser.add_argument('--clear', action='store_true',
+                            help='Delete previously generated synthetic data first')
+
+    def handle(self, *args, **options):
+        try:
+            mix = (
+                synthetic.parse_diagnosis_mix(options['diagnosis_mix'])
+                if options['diagnosis_mix'] else None
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        for name in ('hospitals', 'departments', 'doctors', 'patients', 'days', 'batch_size'):
+            if options[name] < 1:
+                raise CommandError(f"--{name.replace('_', '-')} must be at least 1")
+
+        if options['clear']:
+            synthetic.clear(log=self.stdout.write)
+
+        stats = synthetic.generate(
+            hospitals=options['hospitals'],
+            departments=options['departments'],
+            doctors=options['doctors'],
+            patients=options['patients'],
+            days=options['days'],
+            daily_rate=options['daily_rate'],
+            weekly_amplitude=options['weekly_amplitude'],
+            annual_amplitude=options['annual_amplitude'],
+            outbreaks=options['outbreaks'],
+            diagnosis_mix=mix,
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            log=self.stdout.write,
+        )
+
+        rate = stats['visits'] / stats['seconds'] if stats['seconds'] else 0.0
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {stats['visits']} visits for {len(stats['hospitals'])} hospital(s) "
+            f"in {stats['seconds']:.1f}s ({rate:,.0f} visits/s)."
+        ))
+        self.stdout.write(json.dumps(stats))
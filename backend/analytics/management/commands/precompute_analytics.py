@@ -0,0 +1,169 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.utils import timezone
+
+from hospitals.models import Hospital, Department
+from analytics import services
+
+# Where run progress is recorded so an interrupted run can be resumed
+DEFAULT_PROGRESS_FILE = "/tmp/smartaid_precompute_progress.json"
+
+
+class Command(BaseCommand):
+    help = (
+        "Precomputes forecast and disease-distribution analytics for every "
+        "hospital so dashboard reads are cache hits"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hospital', action='append', default=[],
+                            help='Only precompute these hospital IDs (repeatable)')
+        parser.add_argument('--workers', type=int, default=2,
+                            help='Hospitals processed concurrently (default: 2)')
+        parser.add_argument('--ranges', type=str, default=','.join(services.STANDARD_RANGES),
+                            help='Comma-separated disease-distribution ranges')
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep running, starting a new pass every --interval-hours')
+        parser.add_argument('--interval-hours', type=float,
+                            default=services.ANALYTICS_CACHE_HOURS - 1,
+                            help='Hours between passes in --loop mode (keep below the '
+                                 f'{services.ANALYTICS_CACHE_HOURS}h cache window)')
+        parser.add_argument('--progress-file', type=str, default=DEFAULT_PROGRESS_FILE,
+                            help='JSON file recording finished hospitals of the current pass')
+        parser.add_argument('--resume', action='store_true',
+                            help='Skip hospitals already finished by the last (interrupted) pass')
+
+    def handle(self, *args, **options):
+        ranges = [r.strip() for r in options['ranges'].split(',') if r.strip()]
+        resume = options['resume']
+
+        while True:
+            started = time.monotonic()
+            self._run_pass(options, ranges, resume)
+            resume = False     # only the first pass continues an old one
+
+            if not options['loop']:
+                return
+
+            wait = max(0.0, options['interval_hours'] * 3600 - (time.monotonic() - started))
+            self.stdout.write(f"Next pass in {wait / 60:.0f} min.")
+            time.sleep(wait)
+
+    # ------------------------------------------------------------------
+    # One pass over all hospitals
+    # ------------------------------------------------------------------
+
+    def _run_pass(self, options, ranges, resume):
+        hospitals = Hospital.objects.all().order_by('created_at')
+        if options['hospital']:
+            hospitals = hospitals.filter(id__in=options['hospital'])
+        hospitals = list(hospitals)
+
+        progress_file = options['progress_file']
+        progress = self._load_progress(progress_file) if resume else None
+        if not progress:
+            progress = {"started_at": timezone.now().isoformat(), "done": []}
+        done = set(progress["done"])
+        self._save_progress(progress_file, progress)
+
+        pending = [h for h in hospitals if str(h.id) not in done]
+        self.stdout.write(
+            f"Precomputing analytics for {len(pending)} hospital(s) "
+            f"({len(hospitals) - len(pending)} already done)..."
+        )
+
+        lock = threading.Lock()
+        started = time.monotonic()
+        failures = 0
+
+        with ThreadPoolExecutor(max_workers=max(1, options['workers'])) as pool:
+            futures = {
+                pool.submit(self._precompute_hospital, hospital, ranges): hospital
+                for hospital in pending
+            }
+            for future in as_completed(futures):
+                hospital = futures[future]
+                try:
+                    timings = future.result()
+                except Exception as e:
+                    failures += 1
+                    self.stdout.write(self.style.ERROR(f"  {hospital.name}: failed — {e}"))
+                    continue
+
+                self.stdout.write(
+                    f"  {hospital.name}: forecast {timings['forecast']:.1f}s, "
+                    f"disease {timings['disease']:.1f}s "
+                    f"({timings['entries']} distributions)"
+                )
+                with lock:
+                    progress["done"].append(str(hospital.id))
+                    self._save_progress(progress_file, progress)
+
+        elapsed = time.monotonic() - started
+        if failures:
+            self.stdout.write(self.style.WARNING(
+                f"Pass finished in {elapsed:.1f}s with {failures} failure(s); "
+                f"rerun with --resume to retry them."
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Pass finished in {elapsed:.1f}s."))
+
+    def _precompute_hospital(self, hospital, ranges):
+        """Warm every cache entry the dashboard reads for one hospital."""
+        try:
+            timings = {}
+
+            t = time.monotonic()
+            # refresh() serialises with dashboard requests computing the same entry
+            services.refresh(
+                services.FORECAST_CACHE_KEY, hospital.id,
+                lambda: services.compute_forecast(hospital.id, budgeted=False),
+            )
+            timings['forecast'] = time.monotonic() - t
+
+            dept_keys = ['all'] + [
+                str(dept_id) for dept_id in
+                Department.objects.filter(hospital=hospital).values_list('id', flat=True)
+            ]
+
+            t = time.monotonic()
+            entries = 0
+            for days in sorted({services.normalize_range(r) for r in ranges}):
+                for dept_key in dept_keys:
+                    services.refresh(
+                        services.disease_cache_key(days, dept_key), hospital.id,
+                        lambda: services.compute_disease_distribution(hospital.id, days, dept_key),
+                    )
+                    entries += 1
+            timings['disease'] = time.monotonic() - t
+            timings['entries'] = entries
+
+            return timings
+        finally:
+            # Worker threads open their own DB connections — release them
+            connections.close_all()
+
+    # ------------------------------------------------------------------
+    # Resumable progress
+    # ------------------------------------------------------------------
+
+    def _load_progress(self, path):
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_progress(self, path, progress):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(progress, f)
+        os.replace(tmp_path, path)
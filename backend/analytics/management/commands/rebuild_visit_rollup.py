@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from analytics.rollup import rebuild_rollup, REBUILD_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds the daily visit rollup (VisitDailyRollup) from clinical visits. "
+        "Run after bulk imports or any write that bypasses model signals"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hospital', action='append', default=[],
+                            help='Only rebuild these hospital IDs (repeatable)')
+        parser.add_argument('--batch-size', type=int, default=REBUILD_BATCH_SIZE,
+                            help=f'Rows per bulk insert (default: {REBUILD_BATCH_SIZE})')
+
+    def handle(self, *args, **options):
+        hospital_ids = options['hospital'] or None
+        scope = f"{len(hospital_ids)} hospital(s)" if hospital_ids else "all hospitals"
+        self.stdout.write(f"Rebuilding visit rollup for {scope}...")
+
+        started = time.monotonic()
+        written = rebuild_rollup(hospital_ids, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {written} rollup rows in {time.monotonic() - started:.1f}s."
+        ))
@@ -0,0 +1,53 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from analytics import jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Executes pending analytics jobs submitted through the jobs API "
+        "(use with ANALYTICS_JOB_MODE=external on the web workers)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=jobs.JOB_WORKERS,
+                            help=f'Jobs executed concurrently (default: {jobs.JOB_WORKERS})')
+        parser.add_argument('--batch', type=int, default=20,
+                            help='Pending jobs fetched per poll (default: 20)')
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep polling for new jobs instead of exiting when the queue is empty')
+        parser.add_argument('--poll-interval', type=float, default=2.0,
+                            help='Seconds between polls of an empty queue in --loop mode')
+
+    def handle(self, *args, **options):
+        with ThreadPoolExecutor(max_workers=max(1, options['workers'])) as pool:
+            while True:
+                requeued = jobs.requeue_stale_jobs()
+                if requeued:
+                    self.stdout.write(self.style.WARNING(f"Requeued {requeued} stale job(s)."))
+
+                job_ids = jobs.pending_job_ids(options['batch'])
+                if job_ids:
+                    started = time.monotonic()
+                    ran = sum(pool.map(self._run_one, job_ids))
+                    self.stdout.write(
+                        f"Ran {ran} job(s) in {time.monotonic() - started:.1f}s "
+                        f"({len(job_ids) - ran} claimed elsewhere)."
+                    )
+                    continue
+
+                if not options['loop']:
+                    self.stdout.write(self.style.SUCCESS("Job queue empty."))
+                    return
+                time.sleep(options['poll_interval'])
+
+    def _run_one(self, job_id):
+        try:
+            return jobs.run_job(job_id)
+        finally:
+            # Worker threads open their own DB connections — release them
+            connections.close_all()
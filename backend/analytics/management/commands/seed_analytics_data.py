@@ -5,6 +5,8 @@ from django.utils import timezone
 from hospitals.models import Hospital, Department
 from users.models import Profile
 from clinical.models import Visit
+from analytics.rollup import rebuild_rollup
+from analytics.synthetic import bulk_create_backdated
 from django.contrib.auth.models import User
 import uuid
 
@@ -68,14 +70,24 @@ class Command(BaseCommand):
         current_date = start_date
         total_visits = 0
 
+        # Evaluate the lookups once instead of once per visit
+        patients = list(patients)
+        all_doctors = list(doctors)
+        depts_by_hospital = {
+            hospital.id: list(Department.objects.filter(hospital=hospital))
+            for hospital in hospitals
+        }
+        doctors_by_hospital = {
+            hospital.id: [d for d in all_doctors if d.hospital_id == hospital.id] or all_doctors
+            for hospital in hospitals
+        }
+
         while current_date <= end_date:
+            day_visits = []
+
             # For each hospital and its departments
             for hospital in hospitals:
-                depts = Department.objects.filter(hospital=hospital)
-                if not depts.exists():
-                    continue
-
-                for dept in depts:
+                for dept in depts_by_hospital[hospital.id]:
                     # Random load: some departments busier than others
                     # Also add a "weekly" cycle: weekends quieter
                     is_weekend = current_date.weekday() >= 5
@@ -86,24 +98,25 @@ class Command(BaseCommand):
                         base_load *= 2 # Spike
 
                     for _ in range(base_load):
-                        patient = random.choice(patients)
-                        doctor = random.choice(doctors.filter(hospital=hospital) or [random.choice(doctors)])
-                        
-                        visit = Visit.objects.create(
+                        day_visits.append(Visit(
                             hospital=hospital,
-                            patient=patient,
-                            doctor=doctor,
+                            patient=random.choice(patients),
+                            doctor=random.choice(doctors_by_hospital[hospital.id]),
                             diagnosis=random.choice(diagnoses),
-                            visit_date=current_date
-                        )
-                        # Avoid auto_now_add override issues if any, but visit_date is usually set at creation
-                        # If Visit.visit_date has auto_now_add=True, we might need to manually update after save
-                        # Let's check model again... yes, visit_date = models.DateTimeField(auto_now_add=True)
-                        Visit.objects.filter(id=visit.id).update(visit_date=current_date, created_at=current_date)
-                        total_visits += 1
+                            visit_date=current_date,
+                            created_at=current_date,
+                        ))
+
+            # visit_date/created_at are auto_now_add — written back after the insert
+            bulk_create_backdated(Visit, day_visits, ["visit_date", "created_at"])
+            total_visits += len(day_visits)
 
             current_date += timedelta(days=1)
-            if total_visits % 100 == 0:
+            if (current_date - start_date).days % 30 == 0:
                 self.stdout.write(f"Generated {total_visits} visits...")
 
+        # bulk_create bypasses the rollup signals
+        self.stdout.write("Rebuilding visit rollup...")
+        rebuild_rollup([hospital.id for hospital in hospitals])
+
         self.stdout.write(self.style.SUCCESS(f"Successfully seeded {total_visits} visits across 180 days."))
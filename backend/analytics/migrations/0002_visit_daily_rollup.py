@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:44
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def backfill_rollup(apps, schema_editor):
+    Visit = apps.get_model('clinical', 'Visit')
+    VisitDailyRollup = apps.get_model('analytics', 'VisitDailyRollup')
+
+    groups = (
+        Visit.objects.annotate(day=TruncDate('visit_date'))
+        .values('hospital_id', 'doctor__department_id', 'doctor_id', 'diagnosis', 'day')
+        .annotate(visits=Count('id'))
+        .order_by()
+    )
+    batch = []
+    for group in groups.iterator(chunk_size=5000):
+        batch.append(VisitDailyRollup(
+            hospital_id=group['hospital_id'],
+            department_id=group['doctor__department_id'],
+            doctor_id=group['doctor_id'],
+            diagnosis=group['diagnosis'],
+            day=group['day'],
+            visit_count=group['visits'],
+        ))
+        if len(batch) >= 5000:
+            VisitDailyRollup.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        VisitDailyRollup.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0001_initial'),
+        ('clinical', '0001_initial'),
+        ('hospitals', '0001_initial'),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VisitDailyRollup',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('diagnosis', models.TextField()),
+                ('day', models.DateField()),
+                ('visit_count', models.PositiveIntegerField(default=0)),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='hospitals.department')),
+                ('doctor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='users.profile')),
+                ('hospital', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='hospitals.hospital')),
+            ],
+            options={
+                'db_table': 'visit_daily_rollup',
+                'indexes': [models.Index(fields=['hospital', 'day'], name='rollup_hospital_day_idx'), models.Index(fields=['doctor', 'day'], name='rollup_doctor_day_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_rollup, migrations.RunPython.noop),
+    ]
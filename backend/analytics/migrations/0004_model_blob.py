@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:11
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0003_analytics_job'),
+        ('hospitals', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModelBlob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('series_key', models.CharField(max_length=255)),
+                ('data_hash', models.CharField(max_length=64)),
+                ('code_version', models.CharField(max_length=50)),
+                ('payload', models.BinaryField()),
+                ('size', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('hospital', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='hospitals.hospital')),
+            ],
+            options={
+                'db_table': 'analytics_model_blobs',
+                'indexes': [models.Index(fields=['hospital', 'series_key', 'updated_at'], name='model_blob_series_idx')],
+                'constraints': [models.UniqueConstraint(fields=('hospital', 'series_key', 'code_version', 'data_hash'), name='model_blob_address_uniq')],
+            },
+        ),
+    ]
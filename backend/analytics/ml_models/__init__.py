@@ -1,4 +1,35 @@
-from .arima_model import ARIMAForecaster
-from .disease_model import DiseaseClassifier
+"""
+Lazy facade over the analytics ML engines.
 
-__all__ = ['ARIMAForecaster', 'DiseaseClassifier']
+Importing this package is cheap: the forecaster and classifier modules —
+and with them pandas, statsmodels, pmdarima and scikit-learn — are only
+imported the first time one of their names is accessed, e.g.
+`ml_models.ARIMAForecaster(...)`.  Workers that never serve analytics
+never load the ML stack.  Use `from analytics import ml_models` and
+attribute access; `from analytics.ml_models import ARIMAForecaster` works
+too but loads the engine at that import.
+"""
+import importlib
+
+from .constants import MAX_FORECAST_HORIZON, RECONCILIATION_METHODS
+
+# Public name → submodule that defines it
+_LAZY_ATTRS = {
+    'ARIMAForecaster':   '.arima_model',
+    'DiseaseClassifier': '.disease_model',
+}
+
+__all__ = ['ARIMAForecaster', 'DiseaseClassifier', 'MAX_FORECAST_HORIZON', 'RECONCILIATION_METHODS']
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value          # later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
@@ -1,10 +1,17 @@
 import os
+import time
+import hashlib
 import warnings
-import joblib
+import threading
+import contextvars
+import multiprocessing
 import numpy as np
 import pandas as pd
 
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
 from datetime import timedelta
+from django.db import connections
+from django.db.models import Count, Q, Sum
 from django.utils import timezone
 
 # Suppress noisy convergence warnings during grid search
@@ -20,8 +27,14 @@ except ImportError:
 from statsmodels.tsa.statespace.sarimax import SARIMAX
 from statsmodels.tsa.stattools import adfuller
 
-from clinical.models import Visit
 from hospitals.models import Department
+from analytics import timing
+from analytics.models import VisitDailyRollup
+
+from . import fast_models, fingerprint, fourier_model, hierarchy, model_store
+from .constants import MAX_FORECAST_HORIZON, RECONCILIATION_METHODS
+from .disk_cache import disk_cache_for
+from .model_cache import model_cache, atomic_dump
 
 
 # ---------------------------------------------------------------------------
@@ -31,8 +44,28 @@ from hospitals.models import Department
 # Cache directory for fitted models (one file per hospital+department)
 MODEL_CACHE_DIR = "/tmp/smartaid_arima"
 
-# How long a cached model stays valid before retraining (hours)
-MODEL_CACHE_TTL_HOURS = 24
+# Size cap, LRU/TTL eviction and background GC of MODEL_CACHE_DIR
+disk_cache = disk_cache_for(MODEL_CACHE_DIR)
+
+# Version of the bundle format and fitting code.  Recorded in every bundle
+# and part of every shared model's address (see model_store): bump it and
+# bundles of older code are never served.
+ARIMA_CODE_VERSION = "sarima-2"
+
+# How long a model may be incrementally updated before a full re-estimation
+# of its parameters is forced (hours)
+FULL_REFIT_INTERVAL_HOURS = float(os.getenv("ARIMA_FULL_REFIT_HOURS", str(7 * 24)))
+
+# Incremental updates are skipped (full refit instead) when more new days
+# than this have accumulated since the model last saw data
+MAX_INCREMENTAL_DAYS = 14
+
+# Drift guard: full refit when the cached model's forecast for the new days
+# misses by more than this fraction of the recent daily mean (MAE / mean)
+DRIFT_THRESHOLD = 0.5
+
+# Observations stored with a model to detect edits to already-seen history
+HISTORY_CHECK_DAYS = 7
 
 # Minimum observations required for the global forecaster
 MIN_GLOBAL_DAYS = 30
@@ -43,12 +76,74 @@ MIN_DEPT_ACTIVE_DAYS = 21
 # Minimum total observations for per-department series
 MIN_DEPT_TOTAL_DAYS = 21
 
+# Departments below MIN_DEPT_ACTIVE_DAYS but with at least this many active
+# days get the vectorised fast tier (fast_models) instead of a flat mean
+MIN_FAST_TIER_ACTIVE_DAYS = 7
+
+# SARIMA is only used when its quick backtest beats the best fast-tier
+# method's backtest MAE by at least this fraction
+SARIMA_MIN_IMPROVEMENT = 0.05
+
+# Optimiser iterations allowed for the fixed-order SARIMA quick backtest
+QUICK_BACKTEST_MAXITER = 50
+
 # Patients per doctor per day — used as fallback when DB lookup fails
 DEFAULT_PATIENTS_PER_DOCTOR = 15
 
+# Load status bands: (utilisation % above which it applies, status, colour, dot),
+# checked in order; anything at or below the last threshold is "Normal"
+LOAD_STATUS_BANDS = [
+    (80, "High",     "text-red-500",    "🔴"),
+    (60, "Moderate", "text-orange-500", "🟡"),
+]
+NORMAL_LOAD_STATUS = ("Normal", "text-green-500", "🟢")
+
 # Fixed seasonal period — hospitals have strong 7-day (weekly) cycles
 SEASONAL_PERIOD = 7
 
+# Days of history the fast tier sees — more than the 90-day SARIMA window, so
+# the Fourier method's annual terms (fourier_model.ANNUAL_MIN_DAYS) are fitted
+# even in its backtest.  Days before a hospital's first visit are left out.
+FAST_TIER_HISTORY_DAYS = (
+    fourier_model.ANNUAL_MIN_DAYS + fast_models.BACKTEST_DAYS + 3 * SEASONAL_PERIOD
+)
+
+# Opt-in process pool for per-department fits (0 = fit in the request thread).
+# Capped at the number of CPUs and the number of series that need a fit.
+FIT_POOL_WORKERS = int(os.getenv("ARIMA_FIT_WORKERS", "0"))
+
+# Seconds to wait for a single pooled fit before using the rolling-mean fallback
+# (unbudgeted runs only — budgeted forecasts use the limits below)
+FIT_TIMEOUT_SECONDS = float(os.getenv("ARIMA_FIT_TIMEOUT", "60"))
+
+# Time budget of a budgeted (request-path) department forecast: seconds for
+# all model fitting in the request, and for any one series.  Series not
+# fitted within it degrade to the fast tier, then the rolling mean; a fit
+# that overruns keeps going in the background and lands in the model cache.
+FORECAST_BUDGET_SECONDS = float(os.getenv("ARIMA_REQUEST_BUDGET", "20"))
+SERIES_BUDGET_SECONDS   = float(os.getenv("ARIMA_SERIES_BUDGET", "8"))
+
+# A remembered order is refitted as-is while its AIC per observation and
+# recent one-step MAE stay within this fraction of the values it was chosen
+# with; beyond that a bounded local search around it runs instead
+ORDER_DEGRADATION_TOLERANCE = 0.10
+
+# Most candidate orders fitted by one local search (neighbours of the
+# remembered order: p/q/P/Q ± 1 within the auto_arima bounds, d and D kept)
+MAX_LOCAL_SEARCH_FITS = 8
+ORDER_BOUNDS = {"p": 5, "q": 3, "P": 2, "Q": 1}
+
+# Rolling-origin evaluation: number of forecast origins, days between them,
+# and the process-pool size the folds are fitted on (0 = sequential)
+EVAL_ORIGINS = 4
+EVAL_ORIGIN_STRIDE_DAYS = 7
+EVAL_POOL_WORKERS = int(os.getenv("ARIMA_EVAL_WORKERS", "4"))
+
+# Cache-key prefix of evaluation-fold models.  Every fold is a new series
+# (keyed by its training data), so they stay node-local: in the shared
+# store they would never be pruned (see model_store.MAX_VERSIONS_PER_SERIES)
+EVAL_CACHE_PREFIX = "eval_"
+
 
 # ---------------------------------------------------------------------------
 # Stationarity helpers
@@ -81,6 +176,74 @@ def _recommended_d(series: pd.Series) -> int:
     return 2   # rarely needed, but cap here
 
 
+# ---------------------------------------------------------------------------
+# Compact model format
+# ---------------------------------------------------------------------------
+#
+# Instead of pickling the whole statsmodels/pmdarima results object (training
+# data, filter output, covariance matrices — megabytes, and tied to the
+# library version) the cache stores only what forecasting needs: the order,
+# the fitted parameter vector, the (time-invariant) state-space matrices they
+# imply and the filtered state after the last observation.  Forecasting and
+# incremental updates are then a few small NumPy matrix products.
+
+def _compact_model(model_fit) -> dict:
+    """Reduce a fitted SARIMAX / pmdarima model to a parameter-only dict."""
+    res   = getattr(model_fit, "arima_res_", model_fit)   # pmdarima wraps statsmodels
+    model = res.model
+    ssm   = res.filter_results
+
+    selection = ssm.selection[:, :, -1]
+    return {
+        "order":           tuple(model.order),
+        "seasonal_order":  tuple(model.seasonal_order),
+        "params":          np.asarray(res.params, dtype=float),
+        "design":          np.asarray(ssm.design[0, :, -1], dtype=float),
+        "obs_intercept":   float(ssm.obs_intercept[0, -1]),
+        "obs_cov":         float(ssm.obs_cov[0, 0, -1]),
+        "transition":      np.asarray(ssm.transition[:, :, -1], dtype=float),
+        "state_intercept": np.asarray(ssm.state_intercept[:, -1], dtype=float),
+        "state_noise_cov": selection @ ssm.state_cov[:, :, -1] @ selection.T,
+        # Predicted state (and its covariance) for the day after the last one
+        "state":           np.asarray(ssm.predicted_state[:, -1], dtype=float),
+        "state_cov":       np.asarray(ssm.predicted_state_cov[:, :, -1], dtype=float),
+    }
+
+
+def _compact_forecast(compact: dict, steps: int) -> np.ndarray:
+    """Point forecast: iterate the transition equation from the last state."""
+    Z, d = compact["design"], compact["obs_intercept"]
+    T, c = compact["transition"], compact["state_intercept"]
+
+    state = compact["state"]
+    out   = np.empty(steps, dtype=float)
+    for h in range(steps):
+        out[h] = Z @ state + d
+        state  = T @ state + c
+    return out
+
+
+def _compact_extend(compact: dict, values) -> dict:
+    """
+    Run the Kalman filter forward over new observations with the parameters
+    held fixed — the NumPy equivalent of statsmodels' append(refit=False).
+    """
+    Z, d, H = compact["design"], compact["obs_intercept"], compact["obs_cov"]
+    T, c, RQR = compact["transition"], compact["state_intercept"], compact["state_noise_cov"]
+
+    state, P = compact["state"].copy(), compact["state_cov"].copy()
+    for y in np.asarray(values, dtype=float):
+        PZ = P @ Z
+        F  = Z @ PZ + H
+        if F > 0:
+            state = state + PZ * ((y - (Z @ state + d)) / F)
+            P     = P - np.outer(PZ, PZ) / F
+        state = T @ state + c
+        P     = T @ P @ T.T + RQR
+
+    return {**compact, "state": state, "state_cov": P}
+
+
 # ---------------------------------------------------------------------------
 # Model cache helpers
 # ---------------------------------------------------------------------------
@@ -91,79 +254,206 @@ def _cache_path(hospital_id, key: str) -> str:
     return os.path.join(MODEL_CACHE_DIR, f"arima_{hospital_id}_{safe_key}.pkl")
 
 
-def _load_cached_model(path: str):
+def _age_hours(ts: pd.Timestamp) -> float:
+    return (pd.Timestamp.now() - ts).total_seconds() / 3600
+
+
+def _load_cached_model(path: str, data_hash: str = None):
     """
-    Load a serialised model bundle if it exists and is still fresh.
-    Returns None if missing, unreadable, or expired.
+    Load a serialised model bundle of the current code version.  With a
+    `data_hash` (see _series_fingerprint) only a bundle trained on exactly
+    that data is returned.  Returns None if missing, unreadable, or stale.
     """
     if not os.path.exists(path):
         return None
     try:
-        bundle = joblib.load(path)
-        age_hours = (
-            pd.Timestamp.now() - bundle["trained_at"]
-        ).total_seconds() / 3600
-        if age_hours > MODEL_CACHE_TTL_HOURS:
+        with timing.stage("model_load"):
+            bundle = model_cache.load(path)
+        if bundle is None or "model" not in bundle:
+            return None          # legacy full-results pickle — refit once
+        disk_cache.touch(path)
+        if bundle.get("code_version") != ARIMA_CODE_VERSION:
+            return None
+        if data_hash is not None and bundle.get("data_hash") != data_hash:
             return None
         return bundle
     except Exception:
         return None
 
 
-def _save_model(path: str, model_fit, meta: dict):
-    bundle = {"model_fit": model_fit, "trained_at": pd.Timestamp.now(), **meta}
+def _save_model(path: str, model: dict, meta: dict) -> dict:
+    """Persist a compact model (see _compact_model) with its metadata."""
+    bundle = {
+        "model":      model,
+        "trained_at": pd.Timestamp.now(),
+        "fitted_at":  pd.Timestamp.now(),
+        "code_version": ARIMA_CODE_VERSION,
+        **meta,
+    }
     try:
-        joblib.dump(bundle, path)
+        atomic_dump(bundle, path)
+        model_cache.store(path, bundle)
+        disk_cache.record(path)
     except Exception as e:
         print(f"[ARIMAForecaster] Warning: could not cache model to {path}: {e}")
+    if _is_shared(path):
+        model_store.publish(_store_key(path, bundle.get("data_hash")), bundle)
+    return bundle
+
+
+def _store_key(path: str, data_hash: str) -> model_store.ModelKey:
+    return model_store.key_for_path(path, data_hash, ARIMA_CODE_VERSION)
+
+
+def _is_shared(path: str) -> bool:
+    """Whether the bundle cached at `path` goes to the shared store (not evaluation folds)."""
+    return not _store_key(path, None).series_key.startswith(EVAL_CACHE_PREFIX)
+
+
+def _provisional_days(settled: bool) -> int:
+    """Trailing days of a series left out of its model (none for a settled series)."""
+    return 0 if settled else fingerprint.PROVISIONAL_DAYS
+
+
+def _series_fingerprint(series: pd.Series, settled: bool = False) -> str:
+    """The series' data hash: digest of its fingerprint (see fingerprint.py)."""
+    return fingerprint.of_series(series, _provisional_days(settled)).digest
+
+
+def _pull_shared_model(path: str, data_hash: str, local):
+    """
+    The shared store's bundle for this series — copied into the local
+    cache — when it was trained on exactly the current data, or else when
+    it is newer than the local one (`local`, possibly None) and so the
+    better base for an update; otherwise `local`.  Consulted only when the
+    local bundle does not match the data, so local hits cost no store
+    round trip.
+    """
+    if not _is_shared(path):
+        return local
+    shared = model_store.fetch(_store_key(path, data_hash))
+    if not shared or "model" not in shared or shared.get("code_version") != ARIMA_CODE_VERSION:
+        return local
+    if shared.get("data_hash") != data_hash:
+        if _age_hours(shared.get("fitted_at", shared["trained_at"])) > FULL_REFIT_INTERVAL_HOURS:
+            return local
+        if local is not None and shared["trained_at"] <= local["trained_at"]:
+            return local
+    try:
+        atomic_dump(shared, path)
+        model_cache.store(path, shared)
+        disk_cache.record(path)
+    except Exception as e:
+        print(f"[ARIMAForecaster] Warning: could not cache shared model to {path}: {e}")
+    timing.count("shared_model_hits")
+    return shared
+
+
+def _prefetch_shared(series: pd.Series, path: str, fixed_order: bool = False,
+                     settled: bool = False):
+    """
+    Pull the shared store's bundle for a series into the local cache ahead
+    of a pooled fit (see _fit_series), since forked workers do not read the
+    store themselves.
+    """
+    data_hash = _series_fingerprint(series, settled)
+    local = _load_cached_model(path)
+    if (local is None
+            or local.get("data_hash") != data_hash
+            or (local.get("fixed_order") and not fixed_order)):
+        _pull_shared_model(path, data_hash, local)
+
+
+def _publish_cached(path: str):
+    """Publish the locally cached bundle at `path` (fitted in a pool worker)."""
+    if not _is_shared(path):
+        return
+    try:
+        bundle = model_cache.load(path)
+    except Exception:
+        return
+    if bundle and "model" in bundle:
+        model_store.publish(_store_key(path, bundle.get("data_hash")), bundle)
 
 
 # ---------------------------------------------------------------------------
 # Data loading helpers
 # ---------------------------------------------------------------------------
 
-def _build_daily_series(
-    visits_qs,
-    start_date: pd.Timestamp,
-    end_date: pd.Timestamp,
-) -> pd.Series:
+def _naive_day(ts) -> pd.Timestamp:
+    """Timezone-naive midnight for a (possibly aware) datetime."""
+    ts = pd.Timestamp(ts)
+    if ts.tzinfo is not None:
+        ts = ts.tz_localize(None)
+    return ts.floor("D")
+
+
+def _load_visit_matrix(hospital_id, start_date, end_date, dept_ids) -> tuple:
     """
-    Convert a Visit queryset → a complete daily count Series with no gaps.
-    Index is timezone-naive dates at midnight.
+    Load daily visit counts for every department with ONE grouped query.
+
+    Reads the VisitDailyRollup table, so the cost depends on the number of
+    days in the window rather than on the number of visits; only one small
+    aggregate row per active (department, day) pair crosses the wire.  The
+    rows are pivoted into a dense matrix:
+
+        matrix[i, j]  = visits for dept_ids[i] on dates[j]
+        matrix[-1, j] = visits recorded without a (or with a foreign) department
+
+    Days without visits stay 0, so every row is a gap-free daily series and
+    matrix.sum(axis=0) is the hospital-wide series.
+
+    Returns (dates, matrix) — dates is a timezone-naive DatetimeIndex at
+    midnight, matrix has shape (len(dept_ids) + 1, len(dates)).
     """
-    if not visits_qs.exists():
-        all_dates = pd.date_range(
-            start=start_date.floor("D"),
-            end=end_date.floor("D"),
-            freq="D",
+    dates = pd.date_range(
+        start=_naive_day(start_date),
+        end=_naive_day(end_date),
+        freq="D",
+    )
+    row_of     = {str(dept_id): i for i, dept_id in enumerate(dept_ids)}
+    unassigned = len(dept_ids)
+    matrix     = np.zeros((len(dept_ids) + 1, len(dates)), dtype=float)
+
+    origin = dates[0].date()
+    rows = (
+        VisitDailyRollup.objects.filter(
+            hospital_id=hospital_id,
+            day__range=(origin, dates[-1].date()),
         )
-        return pd.Series(0, index=all_dates, name="count", dtype=float)
-
-    df = pd.DataFrame(list(visits_qs))
-    df["visit_date"] = pd.to_datetime(df["visit_date"]).dt.tz_localize(None)
-    daily = (
-        df.groupby(df["visit_date"].dt.floor("D"))
-        .size()
-        .rename("count")
-        .astype(float)
+        .values("department_id", "day")
+        .annotate(visits=Sum("visit_count"))
+        .order_by()
     )
+    with timing.stage("db"):
+        rows = list(rows)
+    timing.count("rows_loaded", len(rows))
 
-    all_dates = pd.date_range(
-        start=pd.Timestamp(start_date).tz_localize(None).floor("D"),
-        end=pd.Timestamp(end_date).tz_localize(None).floor("D"),
-        freq="D",
-    )
-    return daily.reindex(all_dates, fill_value=0)
+    with timing.stage("aggregate"):
+        for row in rows:
+            col = (row["day"] - origin).days
+            if 0 <= col < len(dates):
+                dept_row = row_of.get(str(row["department_id"]), unassigned)
+                matrix[dept_row, col] += row["visits"]
+
+    return dates, matrix
+
+
+def _recent_mean(series: pd.Series) -> float:
+    """Mean of the last 7 complete days (0.0 without any)."""
+    complete = fingerprint.settled(series)
+    window   = min(7, len(complete))
+    avg      = float(complete.iloc[-window:].mean()) if window > 0 else 0.0
+    return avg if np.isfinite(avg) else 0.0
 
 
 def _rolling_mean_fallback(series: pd.Series, steps: int) -> list[dict]:
     """
     Deterministic fallback when ARIMA cannot be fitted.
-    Uses the 7-day rolling mean of the last available window.
+    Uses the 7-day rolling mean of the last complete days.
     Clearly marked as 'estimated' so the frontend can style it differently.
     """
-    window = min(7, len(series))
-    avg = float(series.iloc[-window:].mean()) if len(series) > 0 else 0.0
+    avg = _recent_mean(series)
     start = series.index[-1] + timedelta(days=1) if len(series) > 0 else pd.Timestamp.now()
     dates = pd.date_range(start=start, periods=steps, freq="D")
     return [
@@ -176,6 +466,713 @@ def _rolling_mean_fallback(series: pd.Series, steps: int) -> list[dict]:
     ]
 
 
+# ---------------------------------------------------------------------------
+# Model fitting (module-level so it can also run inside a worker process)
+# ---------------------------------------------------------------------------
+
+def _fit_series(series: pd.Series, path: str, fixed_order: bool = False,
+                settled: bool = False):
+    """
+    Load the cached model at `path` or fit a new one for the series.
+
+    Order selection strategy:
+      1. If the series' order registry remembers an order → refit it, with a
+         bounded local search around it only when the fit has degraded.
+      2. If pmdarima is available → auto_arima with seasonal=True, m=7.
+      3. Otherwise → statsmodels SARIMAX with data-driven d from ADF test
+         and fixed (1,d,1)(1,1,0,7) which handles both trend and weekly cycle.
+
+    The cache is content-addressed: a cached model whose data hash (the
+    fingerprint of its training series) matches the current series is
+    returned as-is, however old.  When the data has changed the model is
+    brought up to date with _update_model — parameters are kept and only
+    the new daily observations are filtered — until
+    FULL_REFIT_INTERVAL_HOURS have passed since its last full estimation or
+    drift is detected, at which point the model is re-estimated.
+
+    Models only ever see complete days: the series' provisional current day
+    (see fingerprint.settled) is left out of fitting, updating and the
+    stored history, so it is observed once it is complete rather than
+    while it is still filling up.  A `settled` series (a backtest training
+    window) holds complete days only and is used as a whole.
+
+    Every saved bundle also carries the MAX_FORECAST_HORIZON-day prediction
+    path (see _slice_forecast), computed once per model version.
+
+    With a shared model store configured, a missing or out-of-date local
+    bundle is first replaced by a newer one another node has published
+    (see _pull_shared_model), and every saved bundle is published.
+
+    With fixed_order (budgeted forecasts) a new model is estimated by
+    _estimate_fixed instead — a single fit, no order search.  Such bundles
+    are marked and re-estimated properly by the next unbudgeted call.
+
+    Returns the model bundle dict (model, order_str, forecast_path, ...)
+    or raises on failure.  bundle["model"] is the compact parameter-only
+    form of the fitted model.
+    """
+    data_hash = _series_fingerprint(series, settled)
+    complete  = fingerprint.settled(series, _provisional_days(settled))
+    bundle = _load_cached_model(path)
+    if (bundle is None
+            or bundle.get("data_hash") != data_hash
+            or (bundle.get("fixed_order") and not fixed_order)):
+        bundle = _pull_shared_model(path, data_hash, bundle)
+    if bundle and bundle.get("fixed_order") and not fixed_order:
+        bundle = None            # budget-time stopgap — run the full estimation now
+    if bundle:
+        bundle.setdefault("order_str", "cached")
+        if bundle.get("data_hash") == data_hash:
+            timing.count("cache_hits")
+            return bundle
+
+        if _age_hours(bundle.get("fitted_at", bundle["trained_at"])) <= FULL_REFIT_INTERVAL_HOURS:
+            with timing.stage("fit"):
+                model = _update_model(bundle, complete)
+            if model is not None:
+                timing.count("cache_hits")
+                timing.count("model_updates")
+                return _save_model(path, model, {
+                    "order_str":   bundle["order_str"],
+                    "fitted_at":   bundle.get("fitted_at", bundle["trained_at"]),
+                    "fixed_order": bundle.get("fixed_order", False),
+                    **_history_meta(complete, data_hash),
+                    **_path_meta(model),
+                })
+
+    timing.count("cache_misses")
+    with timing.stage("fit"):
+        if fixed_order:
+            model_fit, order_str = _estimate_fixed(complete, path)
+        else:
+            model_fit, order_str = _estimate(complete, path)
+    model = _compact_model(model_fit)
+    return _save_model(path, model, {
+        "order_str":   order_str,
+        "fixed_order": fixed_order,
+        **_history_meta(complete, data_hash),
+        **_path_meta(model),
+    })
+
+
+def _estimate(series: pd.Series, path: str = None) -> tuple:
+    """
+    Run the order selection and parameter estimation for one series.
+    Returns (model_fit, order_str) with the full library results object.
+
+    With a cache `path` the selected order is remembered in the series'
+    order registry (see _load_order).  Later estimations refit that order
+    directly and only search again — locally, around it — when the fit has
+    degraded, instead of repeating the full order search every time.
+    """
+    remembered = _load_order(path) if path else None
+    if remembered is not None:
+        try:
+            model_fit, record = _estimate_from_order(series, remembered)
+            _save_order(path, record)
+            return model_fit, _sarima_order_str(model_fit)
+        except Exception as e:
+            print(f"[ARIMAForecaster] Remembered order failed: {e}. Running full search.")
+
+    model_fit, order_str = _search_order(series)
+    if path:
+        _save_order(path, _order_record(model_fit, full_searches=1 + (
+            remembered.get("full_searches", 0) if remembered else 0
+        )))
+    return model_fit, order_str
+
+
+def _estimate_fixed(series: pd.Series, path: str = None) -> tuple:
+    """
+    Budget-friendly estimation: one SARIMAX fit of the series' remembered
+    order, or of the default (1,d,1)(1,1,0,7) — no auto_arima and no local
+    search, so its cost is a single fit.  The order registry is left
+    untouched for the next full estimation.
+    """
+    remembered = _load_order(path) if path else None
+    if remembered is not None:
+        order, seasonal_order = remembered["order"], remembered["seasonal_order"]
+    else:
+        order, seasonal_order = (1, _recommended_d(series), 1), (1, 1, 0, SEASONAL_PERIOD)
+
+    model_fit = _fit_order(series, order, seasonal_order)
+    if not _usable_fit(model_fit):
+        raise ValueError(f"fixed-order fit SARIMA{tuple(order)}x{tuple(seasonal_order)} is unusable")
+    return model_fit, _sarima_order_str(model_fit)
+
+
+def _search_order(series: pd.Series) -> tuple:
+    """Full order search (auto_arima) or the fixed-order SARIMAX fallback."""
+    timing.count("fits")
+    if PMDARIMA_AVAILABLE:
+        model_fit = auto_arima(
+            series,
+            start_p=1, start_q=1,
+            max_p=5,   max_q=3,
+            d=None,                    # determined automatically via unit-root tests
+            seasonal=True,
+            m=SEASONAL_PERIOD,         # 7-day weekly cycle
+            start_P=0, start_Q=0,
+            max_P=2,   max_Q=1,
+            D=1,                       # one seasonal difference to capture weekly pattern
+            information_criterion="aic",
+            stepwise=True,             # much faster than exhaustive search
+            suppress_warnings=True,
+            error_action="ignore",
+            trace=False,
+        )
+        order_str = str(model_fit.order) + str(model_fit.seasonal_order)
+    else:
+        # Fallback: SARIMAX with data-driven d
+        d = _recommended_d(series)
+        order          = (1, d, 1)
+        seasonal_order = (1, 1, 0, SEASONAL_PERIOD)
+        model     = SARIMAX(
+            series,
+            order=order,
+            seasonal_order=seasonal_order,
+            enforce_stationarity=False,
+            enforce_invertibility=False,
+        )
+        model_fit = model.fit(disp=False)
+        order_str = f"SARIMA{order}x{seasonal_order}"
+
+    return model_fit, order_str
+
+
+# ---------------------------------------------------------------------------
+# Order registry: the selected (p,d,q)(P,D,Q,m) per series, kept across
+# model expiries in a sidecar file next to the model bundle
+# ---------------------------------------------------------------------------
+
+def _order_path(path: str) -> str:
+    return path[:-len(".pkl")] + "_order.pkl"
+
+
+def _load_order(path: str):
+    """Remembered order record for the series cached at `path`, or None."""
+    try:
+        record = model_cache.load(_order_path(path))
+    except Exception:
+        return None
+    if record and "order" in record:
+        disk_cache.touch(_order_path(path))
+        return record
+    return None
+
+
+def _save_order(path: str, record: dict):
+    order_path = _order_path(path)
+    try:
+        atomic_dump(record, order_path)
+        model_cache.store(order_path, record)
+        disk_cache.record(order_path)
+    except Exception as e:
+        print(f"[ARIMAForecaster] Warning: could not save order to {order_path}: {e}")
+
+
+def _fit_quality(model_fit) -> tuple:
+    """(AIC per observation, mean |one-step error| over the backtest window)."""
+    res = getattr(model_fit, "arima_res_", model_fit)
+    aic_per_obs = float(res.aic) / max(1, int(res.nobs))
+    resid = np.asarray(res.resid, dtype=float)[-fast_models.BACKTEST_DAYS:]
+    return aic_per_obs, float(np.mean(np.abs(resid))) if len(resid) else 0.0
+
+
+def _order_record(model_fit, **counters) -> dict:
+    res = getattr(model_fit, "arima_res_", model_fit)
+    aic_per_obs, one_step_mae = _fit_quality(model_fit)
+    return {
+        "order":          tuple(res.model.order),
+        "seasonal_order": tuple(res.model.seasonal_order),
+        "aic_per_obs":    aic_per_obs,
+        "one_step_mae":   one_step_mae,
+        "recorded_at":    pd.Timestamp.now(),
+        "reuses":         0,
+        "local_searches": 0,
+        "full_searches":  0,
+        **counters,
+    }
+
+
+def _fit_order(series: pd.Series, order, seasonal_order):
+    timing.count("fits")
+    return SARIMAX(
+        series,
+        order=tuple(order),
+        seasonal_order=tuple(seasonal_order),
+        enforce_stationarity=False,
+        enforce_invertibility=False,
+    ).fit(disp=False)
+
+
+def _usable_fit(model_fit) -> bool:
+    """Reject non-converged or degenerate (zero-variance) candidate fits."""
+    res = getattr(model_fit, "arima_res_", model_fit)
+    converged = (getattr(res, "mle_retvals", None) or {}).get("converged", True)
+    sigma2 = float(getattr(res, "scale", 1.0) or 0.0)
+    if "sigma2" in getattr(res, "param_names", []):
+        sigma2 = float(np.asarray(res.params)[res.param_names.index("sigma2")])
+    return bool(converged) and np.isfinite(res.aic) and sigma2 > 1e-6
+
+
+def _degraded(value: float, baseline: float) -> bool:
+    return value > baseline + ORDER_DEGRADATION_TOLERANCE * max(abs(baseline), 1e-9)
+
+
+def _neighbour_orders(order, seasonal_order) -> list:
+    """Orders one step away from the given one in p, q, P or Q."""
+    p, d, q = order
+    P, D, Q, m = seasonal_order
+    candidates = []
+    for dp, dq, dP, dQ in [(1, 0, 0, 0), (-1, 0, 0, 0), (0, 1, 0, 0), (0, -1, 0, 0),
+                           (0, 0, 1, 0), (0, 0, -1, 0), (0, 0, 0, 1), (0, 0, 0, -1)]:
+        np_, nq, nP, nQ = p + dp, q + dq, P + dP, Q + dQ
+        if (0 <= np_ <= ORDER_BOUNDS["p"] and 0 <= nq <= ORDER_BOUNDS["q"]
+                and 0 <= nP <= ORDER_BOUNDS["P"] and 0 <= nQ <= ORDER_BOUNDS["Q"]):
+            candidates.append(((np_, d, nq), (nP, D, nQ, m)))
+    return candidates[:MAX_LOCAL_SEARCH_FITS]
+
+
+def _estimate_from_order(series: pd.Series, remembered: dict) -> tuple:
+    """
+    Refit the remembered order; if its AIC per observation or recent
+    one-step MAE has degraded beyond ORDER_DEGRADATION_TOLERANCE, fit the
+    neighbouring orders too and keep the lowest-AIC one.
+    Returns (model_fit, updated registry record).
+    """
+    model_fit = _fit_order(series, remembered["order"], remembered["seasonal_order"])
+    aic_per_obs, one_step_mae = _fit_quality(model_fit)
+
+    if not (_degraded(aic_per_obs, remembered["aic_per_obs"])
+            or _degraded(one_step_mae, remembered["one_step_mae"])):
+        # Keep the baseline from when the order was chosen so slow drift adds up
+        return model_fit, {**remembered, "reuses": remembered.get("reuses", 0) + 1}
+
+    best_fit, best_aic = model_fit, aic_per_obs
+    for order, seasonal_order in _neighbour_orders(
+        remembered["order"], remembered["seasonal_order"]
+    ):
+        try:
+            candidate = _fit_order(series, order, seasonal_order)
+        except Exception:
+            continue
+        if not _usable_fit(candidate):
+            continue
+        candidate_aic, _ = _fit_quality(candidate)
+        if candidate_aic < best_aic:
+            best_fit, best_aic = candidate, candidate_aic
+
+    print(
+        f"[ARIMAForecaster] Local order search: {_sarima_order_str(model_fit)} -> "
+        f"{_sarima_order_str(best_fit)}"
+    )
+    return best_fit, _order_record(
+        best_fit,
+        reuses=remembered.get("reuses", 0),
+        local_searches=remembered.get("local_searches", 0) + 1,
+        full_searches=remembered.get("full_searches", 0),
+    )
+
+
+def _sarima_order_str(model_fit) -> str:
+    res = getattr(model_fit, "arima_res_", model_fit)
+    return f"SARIMA{tuple(res.model.order)}x{tuple(res.model.seasonal_order)}"
+
+
+def _history_meta(complete: pd.Series, data_hash: str) -> dict:
+    """
+    Bundle fields that let a later call find the observations it has not
+    seen.  `complete` is the series the model was trained on (complete days
+    only), `data_hash` the fingerprint of the full series.
+    """
+    if len(complete) == 0:
+        return {"data_hash": data_hash}
+    return {
+        "last_date": complete.index[-1],
+        "tail":      complete.iloc[-HISTORY_CHECK_DAYS:].to_numpy(dtype=float),
+        "data_hash": data_hash,
+    }
+
+
+def _update_model(bundle: dict, series: pd.Series):
+    """
+    Extend a cached model with the days it has not seen yet, keeping its
+    estimated parameters — the state filter simply runs over the new
+    observations (see _compact_extend).  `series` holds complete days only
+    (see fingerprint.settled), so neither the history check nor the drift
+    check ever looks at a day that is still being recorded.
+
+    Returns the updated compact model, or None when a full refit is required:
+    history the model was trained on has changed, too many days are new,
+    or the cached model's forecast for the new days shows drift.
+    """
+    last_date = bundle.get("last_date")
+    tail      = bundle.get("tail")
+    if last_date is None or tail is None or last_date not in series.index:
+        return None
+
+    pos  = series.index.get_loc(last_date)
+    seen = series.iloc[max(0, pos + 1 - len(tail)):pos + 1].to_numpy(dtype=float)
+    if len(seen) != len(tail) or not np.array_equal(seen, tail):
+        return None           # back-dated or edited visits — re-estimate
+
+    new_obs = series.iloc[pos + 1:]
+    model   = bundle["model"]
+    if new_obs.empty:
+        return model
+    if len(new_obs) > MAX_INCREMENTAL_DAYS:
+        return None
+
+    # Drift check: how well did the cached model predict the new days?
+    predicted = _compact_forecast(model, len(new_obs))
+    level     = max(1.0, float(series.iloc[:pos + 1].iloc[-4 * SEASONAL_PERIOD:].mean()))
+    if np.mean(np.abs(predicted - new_obs.to_numpy(dtype=float))) / level > DRIFT_THRESHOLD:
+        return None
+
+    return _compact_extend(model, new_obs.to_numpy(dtype=float))
+
+
+def _predict_values(model_fit, steps: int) -> np.ndarray:
+    """Point forecast for the next `steps` days from a compact or full model."""
+    if isinstance(model_fit, dict):
+        return _compact_forecast(model_fit, steps)
+    if PMDARIMA_AVAILABLE:
+        return np.asarray(model_fit.predict(n_periods=steps), dtype=float)
+    return np.asarray(model_fit.get_forecast(steps=steps).predicted_mean, dtype=float)
+
+
+def _path_meta(model: dict) -> dict:
+    """
+    The full-horizon prediction path stored alongside a model version.  It
+    also covers the provisional day(s) between the model's last observation
+    and the first forecast date.
+    """
+    steps = MAX_FORECAST_HORIZON + fingerprint.PROVISIONAL_DAYS
+    with timing.stage("predict"):
+        return {"forecast_path": _compact_forecast(model, steps)}
+
+
+def _slice_forecast(bundle: dict, start: pd.Timestamp, steps: int) -> np.ndarray:
+    """
+    Forecast for `steps` days beginning at `start`, served from the stored
+    prediction path (which begins the day after the model's last
+    observation).  Bundles without a path, or windows running past its
+    end, are predicted from the model directly.
+    """
+    last_date = bundle.get("last_date")
+    offset    = 0 if last_date is None else max(0, (start - last_date).days - 1)
+
+    forecast_path = bundle.get("forecast_path")
+    if forecast_path is not None and last_date is not None and offset + steps <= len(forecast_path):
+        return forecast_path[offset:offset + steps]
+
+    with timing.stage("predict"):
+        return _compact_forecast(bundle["model"], offset + steps)[offset:]
+
+
+def _fit_and_predict(series: pd.Series, path: str, steps: int, start=None,
+                     fast_mae: float = None, fixed_order: bool = False,
+                     settled: bool = False) -> tuple:
+    """
+    Worker entry point: fit (or load) one series and return plain values.
+    Only the forecast crosses the process boundary — the fitted model is
+    written to the on-disk cache by _fit_series, not pickled back.
+
+    `start` is the first forecast date (default: the day after the series).
+    When `fast_mae` (the best fast-tier backtest MAE) is given, SARIMA is
+    only fitted if _select_engine says it beats the fast tier; otherwise
+    (None, "fast") is returned and the caller uses the fast forecast.
+    `fixed_order` and `settled` are passed on to _fit_series.
+    """
+    if fast_mae is not None and _select_engine(series, path, fast_mae) == "fast":
+        return None, "fast"
+
+    if start is None:
+        start = series.index[-1] + timedelta(days=1)
+    bundle = _fit_series(series, path, fixed_order, settled)
+    return _slice_forecast(bundle, start, steps), bundle["order_str"]
+
+
+def _cached_forecast(path: str, series: pd.Series, start: pd.Timestamp, steps: int,
+                     fast_mae: float = None):
+    """
+    First tier of a budgeted forecast: the forecast of a model cached for
+    exactly the current series (same data hash), with no fitting at all.
+    Returns (forecast_values, order_str), or None when there is no such
+    model or the series' engine selection now prefers the fast tier.
+    """
+    bundle = _load_cached_model(path, _series_fingerprint(series))
+    if bundle is None:
+        return None
+    if fast_mae is not None:
+        selection = _load_selection(path)
+        if selection is not None and selection["engine"] == "fast":
+            return None
+    timing.count("cache_hits")
+    return _slice_forecast(bundle, start, steps), bundle.get("order_str", "cached")
+
+
+def _is_stopgap(path: str) -> bool:
+    """True when the model cached at `path` is a budget-time fixed-order stopgap."""
+    try:
+        bundle = model_cache.load(path)
+    except Exception:
+        return False
+    return bool(bundle and bundle.get("fixed_order"))
+
+
+def _select_engine(series: pd.Series, path: str, fast_mae: float) -> str:
+    """
+    Decide between SARIMA and the fast tier for one series: "sarima" only
+    when a quick fixed-order SARIMA backtest beats fast_mae by
+    SARIMA_MIN_IMPROVEMENT.  The decision is cached next to the model and
+    revisited on the full-refit schedule.
+    """
+    record = _load_selection(path)
+    if record is not None:
+        return record["engine"]
+
+    with timing.stage("fit"):
+        # Scored on the same complete days as the fast tier (see _fast_forecast)
+        sarima_mae = _quick_backtest(fingerprint.settled(series))
+    engine = "sarima" if sarima_mae < fast_mae * (1 - SARIMA_MIN_IMPROVEMENT) else "fast"
+
+    record = {
+        "engine":     engine,
+        "sarima_mae": sarima_mae,
+        "fast_mae":   float(fast_mae),
+        "decided_at": pd.Timestamp.now(),
+    }
+    select_path = _selection_path(path)
+    try:
+        atomic_dump(record, select_path)
+        model_cache.store(select_path, record)
+        disk_cache.record(select_path)
+    except Exception as e:
+        print(f"[ARIMAForecaster] Warning: could not cache selection to {select_path}: {e}")
+    return engine
+
+
+def _selection_path(path: str) -> str:
+    return path[:-len(".pkl")] + "_select.pkl"
+
+
+def _load_selection(path: str):
+    """The series' engine selection if made within FULL_REFIT_INTERVAL_HOURS, else None."""
+    try:
+        record = model_cache.load(_selection_path(path))
+    except Exception:
+        return None
+    if record and _age_hours(record["decided_at"]) <= FULL_REFIT_INTERVAL_HOURS:
+        disk_cache.touch(_selection_path(path))
+        return record
+    return None
+
+
+def _fast_forecast(Y, steps: int) -> tuple:
+    """
+    fast_models.select_and_forecast over the complete days of the
+    (series × days) matrix Y.  Like the SARIMA path (see _fit_series) the
+    methods never see the provisional current day: they forecast across it,
+    and the returned forecasts start on the day after it.
+    """
+    Y = np.atleast_2d(np.asarray(Y, dtype=float))
+    provisional = fingerprint.PROVISIONAL_DAYS
+    forecasts, methods, maes = fast_models.select_and_forecast(
+        Y[:, :Y.shape[1] - provisional], steps + provisional
+    )
+    return forecasts[:, provisional:], methods, maes
+
+
+def _fast_tier_history(Y: np.ndarray, recent_days: int) -> np.ndarray:
+    """
+    The fast tier's part of a long (series × days) history: everything from
+    the first day with any visits, but at least the last `recent_days`
+    days.  Earlier days are not zero-visit days — there is no data yet.
+    """
+    active = np.flatnonzero(Y.sum(axis=0) > 0)
+    first  = active[0] if len(active) else Y.shape[1]
+    return Y[:, min(first, max(0, Y.shape[1] - recent_days)):]
+
+
+def _fast_tier_possible(n_days: int) -> bool:
+    """True when a window of n_days (provisional days included) supports the fast-tier backtest."""
+    return n_days - fingerprint.PROVISIONAL_DAYS >= fast_models.BACKTEST_DAYS + 2 * SEASONAL_PERIOD
+
+
+def _quick_backtest(series: pd.Series, holdout: int = fast_models.BACKTEST_DAYS) -> float:
+    """
+    MAE of a fixed-order (1,d,1)(1,1,0,7) SARIMA fitted without the last
+    `holdout` days and scored on them.  No order search — this only has to
+    tell whether SARIMA is worth its cost for the series.
+    """
+    train, test = series.iloc[:-holdout], series.to_numpy(dtype=float)[-holdout:]
+    timing.count("fits")
+    try:
+        model_fit = SARIMAX(
+            train,
+            order=(1, _recommended_d(train), 1),
+            seasonal_order=(1, 1, 0, SEASONAL_PERIOD),
+            enforce_stationarity=False,
+            enforce_invertibility=False,
+        ).fit(disp=False, maxiter=QUICK_BACKTEST_MAXITER)
+        predicted = np.maximum(_compact_forecast(_compact_model(model_fit), holdout), 0)
+        mae = float(np.mean(np.abs(predicted - test)))
+        return mae if np.isfinite(mae) else float("inf")
+    except Exception:
+        return float("inf")
+
+
+class _FitBudget:
+    """
+    Wall-clock budget of one forecast: `total_seconds` for all fitting,
+    handed out in slices of at most `series_seconds` per series.
+    """
+
+    def __init__(self, total_seconds: float, series_seconds: float):
+        self.started        = time.monotonic()
+        self.total_seconds  = total_seconds
+        self.series_seconds = series_seconds
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def remaining(self) -> float:
+        return max(0.0, self.total_seconds - self.elapsed())
+
+    def next_slice(self) -> float:
+        """Seconds the next series may take (0 once the budget is spent)."""
+        return min(self.series_seconds, self.remaining())
+
+
+def _call_with_timeout(func, args: tuple, timeout: float):
+    """
+    Run func(*args) on a daemon thread and wait at most `timeout` seconds.
+    On timeout a TimeoutError is raised while the call carries on in the
+    background — a late fit still saves its model for the next request.
+    """
+    outcome = {}
+    context = contextvars.copy_context()      # keep reporting to the caller's timings
+
+    def target():
+        try:
+            outcome["result"] = context.run(func, *args)
+        except Exception as e:
+            outcome["error"] = e
+        finally:
+            # The fit may have used the DB (shared model store) — release the
+            # thread's connection
+            connections.close_all()
+
+    worker = threading.Thread(target=target, name="arima-budgeted-fit", daemon=True)
+    worker.start()
+    worker.join(timeout)
+    if worker.is_alive():
+        raise TimeoutError(f"fit exceeded its {timeout:.1f}s budget")
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
+
+
+def _fit_budgeted(series: pd.Series, path: str, steps: int, start, fast_mae,
+                  budget: _FitBudget, settled: bool = False) -> tuple:
+    """_fit_and_predict (fixed-order) within the budget's next slice."""
+    timeout = budget.next_slice()
+    if timeout <= 0:
+        raise TimeoutError("forecast time budget exhausted")
+    return _call_with_timeout(
+        _fit_and_predict, (series, path, steps, start, fast_mae, True, settled), timeout
+    )
+
+
+def _fit_sequential(jobs: dict, steps: int, start=None, budget: _FitBudget = None,
+                    settled: bool = False) -> dict:
+    """
+    Fit the series in `jobs` one after another in the calling thread
+    (each within its budget slice when a `budget` is given).
+    """
+    results = {}
+    for key, (series, path, fast_mae) in jobs.items():
+        try:
+            if budget is None:
+                results[key] = _fit_and_predict(
+                    series, path, steps, start, fast_mae, settled=settled
+                )
+            else:
+                results[key] = _fit_budgeted(
+                    series, path, steps, start, fast_mae, budget, settled
+                )
+        except Exception as e:
+            results[key] = e
+    return results
+
+
+def _fit_in_pool(jobs: dict, steps: int, workers: int, start=None,
+                 budget: _FitBudget = None, settled: bool = False) -> dict:
+    """
+    Fit independent series on a bounded process pool.
+
+    jobs maps key → (series, cache_path, fast_mae).  Results are collected in the
+    order of `jobs` and returned as key → (forecast_values, order_str) or
+    key → Exception when the fit failed or exceeded FIT_TIMEOUT_SECONDS.
+    With a `budget` the fits are fixed-order, each wait is capped by the
+    budget's next slice, and the whole collection by its remainder.
+    `settled` series hold complete days only (see _fit_series).
+
+    Worker processes are forked so they inherit the already-configured
+    Django app registry; platforms without fork fit in the calling thread.
+    Workers never touch the shared model store: this process pulls the
+    series' shared bundles beforehand and publishes the results afterwards.
+    """
+    if "fork" not in multiprocessing.get_all_start_methods():
+        return _fit_sequential(jobs, steps, start, budget, settled)
+
+    if model_store.get_model_store() is not None:
+        # Workers do not read the shared store (forked DB connection) — pull for them
+        for series, path, _ in jobs.values():
+            _prefetch_shared(series, path, budget is not None, settled)
+
+    workers = max(1, min(workers, os.cpu_count() or 1, len(jobs)))
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("fork"),
+    )
+    try:
+        futures = {
+            key: pool.submit(
+                _fit_and_predict,
+                series, path, steps, start, fast_mae, budget is not None, settled,
+            )
+            for key, (series, path, fast_mae) in jobs.items()
+        }
+        results = {}
+        timing.count("pooled_fits", len(futures))
+        for key, future in futures.items():
+            timeout = FIT_TIMEOUT_SECONDS if budget is None else budget.next_slice()
+            try:
+                # Worker processes can't report their stages — time the wait
+                with timing.stage("fit"):
+                    results[key] = future.result(timeout=timeout)
+            except FutureTimeoutError:
+                future.cancel()
+                results[key] = TimeoutError(
+                    f"fit exceeded {timeout:.1f}s"
+                )
+            except Exception as e:
+                results[key] = e
+        if model_store.get_model_store() is not None:
+            # Workers skip publishing (forked DB connection) — do it for them
+            for key, (_, path, _) in jobs.items():
+                if not isinstance(results[key], Exception):
+                    _publish_cached(path)
+        return results
+    finally:
+        # Don't block the request on a runaway fit — it finishes (and caches
+        # its model) in the background while we answer with the fallback.
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
 # ---------------------------------------------------------------------------
 # Main forecaster
 # ---------------------------------------------------------------------------
@@ -192,13 +1189,19 @@ class ARIMAForecaster:
     * auto_arima used when pmdarima is installed (AIC/BIC grid search per dept).
     * Hard-coded order (7,1,1) replaced with per-series optimal selection.
     * Deterministic rolling-mean fallback — random noise fallback removed.
-    * Fitted models cached to disk with joblib (24-hour TTL).
+    * Fitted models cached to disk in a compact parameter-only format
+      (order, parameters, state-space matrices, last state), keyed by a
+      fingerprint of the training data; when the data changes they are
+      extended with the new days' observations instead of re-estimated
+      until the weekly full refit (or drift) comes due.
     * Minimum data thresholds raised to 30 days global / 21 days per dept.
     * Confidence score logic corrected and documented.
     """
 
-    def __init__(self, hospital_id):
+    def __init__(self, hospital_id, fit_workers: int = None):
         self.hospital_id = hospital_id
+        # > 0 enables the process-pool fit mode for per-department models
+        self.fit_workers = FIT_POOL_WORKERS if fit_workers is None else fit_workers
 
     # ------------------------------------------------------------------
     # Internal: fit or load a model for a given series
@@ -206,55 +1209,31 @@ class ARIMAForecaster:
 
     def _fit_model(self, series: pd.Series, cache_key: str):
         """
-        Return a fitted SARIMA/ARIMA model result for the given series.
-
-        Order selection strategy:
-          1. If pmdarima is available → auto_arima with seasonal=True, m=7.
-          2. Otherwise → statsmodels SARIMAX with data-driven d from ADF test
-             and fixed (1,d,1)(1,1,0,7) which handles both trend and weekly cycle.
+        Return a fitted SARIMA/ARIMA model for the given series, in the
+        compact parameter-only form (see _compact_model).
+        See _fit_series for the order selection strategy.
 
-        Returns (model_fit, order_str) or raises on failure.
+        Returns (model, order_str) or raises on failure.
         """
-        path = _cache_path(self.hospital_id, cache_key)
-        bundle = _load_cached_model(path)
-        if bundle:
-            return bundle["model_fit"], bundle.get("order_str", "cached")
-
-        if PMDARIMA_AVAILABLE:
-            model_fit = auto_arima(
-                series,
-                start_p=1, start_q=1,
-                max_p=5,   max_q=3,
-                d=None,                    # determined automatically via unit-root tests
-                seasonal=True,
-                m=SEASONAL_PERIOD,         # 7-day weekly cycle
-                start_P=0, start_Q=0,
-                max_P=2,   max_Q=1,
-                D=1,                       # one seasonal difference to capture weekly pattern
-                information_criterion="aic",
-                stepwise=True,             # much faster than exhaustive search
-                suppress_warnings=True,
-                error_action="ignore",
-                trace=False,
-            )
-            order_str = str(model_fit.order) + str(model_fit.seasonal_order)
-        else:
-            # Fallback: SARIMAX with data-driven d
-            d = _recommended_d(series)
-            order          = (1, d, 1)
-            seasonal_order = (1, 1, 0, SEASONAL_PERIOD)
-            model     = SARIMAX(
-                series,
-                order=order,
-                seasonal_order=seasonal_order,
-                enforce_stationarity=False,
-                enforce_invertibility=False,
-            )
-            model_fit = model.fit(disp=False)
-            order_str = f"SARIMA{order}x{seasonal_order}"
+        bundle = _fit_series(series, _cache_path(self.hospital_id, cache_key))
+        return bundle["model"], bundle["order_str"]
 
-        _save_model(path, model_fit, {"order_str": order_str})
-        return model_fit, order_str
+    def _fit_departments(self, fit_jobs: dict, steps: int, start=None,
+                         budget: _FitBudget = None) -> dict:
+        """
+        Fit every department series in fit_jobs
+        (key → (series, cache_path, fast_mae)).
+
+        With fit_workers > 0 the independent series go to a bounded process
+        pool, so a cold cache costs roughly (departments / cores) fits instead
+        of one fit per department.  Returns key → (forecast_values, order_str),
+        key → (None, "fast") when the fast tier won the backtest, or
+        key → Exception for series that should use the fallback.
+        A `budget` bounds the fitting time (see forecast_by_department).
+        """
+        if self.fit_workers > 0 and len(fit_jobs) > 1:
+            return _fit_in_pool(fit_jobs, steps, self.fit_workers, start, budget)
+        return _fit_sequential(fit_jobs, steps, start, budget)
 
     # ------------------------------------------------------------------
     # Public: global hospital-level forecast
@@ -264,12 +1243,12 @@ class ARIMAForecaster:
         end_date   = timezone.now()
         start_date = end_date - timedelta(days=days)
 
-        visits = Visit.objects.filter(
-            hospital_id=self.hospital_id,
-            visit_date__range=(start_date, end_date),
-        ).values("visit_date", "patient_id")
-
-        return _build_daily_series(visits, start_date, end_date)
+        # No department rows requested — every visit lands in the single
+        # catch-all row, which is exactly the hospital-wide daily series.
+        dates, matrix = _load_visit_matrix(
+            self.hospital_id, start_date, end_date, dept_ids=[]
+        )
+        return pd.Series(matrix.sum(axis=0), index=dates, name="count")
 
     def forecast(self, steps: int = 30) -> list[dict]:
         """
@@ -287,16 +1266,12 @@ class ARIMAForecaster:
             return _rolling_mean_fallback(series, steps)
 
         try:
-            model_fit, order_str = self._fit_model(series, cache_key="global")
+            start_date = series.index[-1] + timedelta(days=1)
+            forecast_values, order_str = _fit_and_predict(
+                series, _cache_path(self.hospital_id, "global"), steps, start_date
+            )
             print(f"[ARIMAForecaster] Global model fitted: {order_str}")
 
-            if PMDARIMA_AVAILABLE:
-                forecast_values = model_fit.predict(n_periods=steps)
-            else:
-                forecast_result = model_fit.get_forecast(steps=steps)
-                forecast_values = forecast_result.predicted_mean
-
-            start_date = series.index[-1] + timedelta(days=1)
             dates = pd.date_range(start=start_date, periods=steps, freq="D")
 
             return [
@@ -316,10 +1291,25 @@ class ARIMAForecaster:
     # Public: per-department forecast (feeds the line chart)
     # ------------------------------------------------------------------
 
-    def forecast_by_department(self, steps: int = 7) -> dict:
+    def forecast_by_department(self, steps: int = 7, reconcile: str = None,
+                               budgeted: bool = True) -> dict:
         """
         Forecast patient load per department for the next `steps` days.
 
+        A budgeted forecast (the default, used on the request path) bounds
+        model fitting to FORECAST_BUDGET_SECONDS, at most
+        SERIES_BUDGET_SECONDS per series, and tries each department's tiers
+        in order: cached model → fixed-order SARIMA → fast tier → rolling
+        mean.  budgeted=False (precompute, background jobs) runs the full
+        order search with no limit but FIT_TIMEOUT_SECONDS per pooled fit.
+
+        reconcile (optional) makes the department rows add up to a hospital
+        total, added to every row as "total" (see hierarchy.py):
+            "bottom_up" — total is the sum of the department forecasts
+            "top_down"  — one hospital-level fit split by recent visit shares;
+                          no per-department models are fitted at all
+            "mint"      — MinT-reconciled hospital and department forecasts
+
         Returns:
         {
             "forecast": [{"name": "Apr 01", <dept_id>: int, ...}, ...],
@@ -328,14 +1318,44 @@ class ARIMAForecaster:
                 "is_learning": bool,          # True when confidence < 40
                 "total_visits_analyzed": int,
                 "departments_with_arima": int,
+                "departments_with_fast_tier": int,
                 "departments_with_fallback": int,
+                "dept_models": {<dept_id>: "cached" | "sarima" | "sarima_fixed"
+                                           | "fast:<method>" | "rolling_mean"},
+                "reconciliation": {"method": str, "total_model": str},   # if reconciled
+                "budget": {"seconds": float, "series_seconds": float,
+                           "elapsed_seconds": float,
+                           "timed_out": [<dept_id>, ...],
+                           "stopgap": [<dept_id> | "total", ...]},       # if budgeted
             }
         }
+
+        "sarima_fixed" marks a fixed-order stopgap model fitted by this
+        forecast; a full-search model that was only brought up to date with
+        the new days stays "sarima".  "stopgap" lists the series served by a
+        stopgap model (see _fit_series), fitted now or cached by an earlier
+        budgeted forecast; an unbudgeted forecast replaces them with fully
+        estimated models.  Together with "timed_out" it tells the caller the
+        answer is degraded (services schedules the full forecast as a
+        background job).
         """
         end_date   = timezone.now()
         start_date = end_date - timedelta(days=90)
 
-        departments = Department.objects.filter(hospital_id=self.hospital_id)
+        with timing.stage("db"):
+            departments = list(
+                Department.objects.filter(hospital_id=self.hospital_id).only("id", "name")
+            )
+
+        # One grouped query for every department's daily series, over the
+        # fast tier's longer history; everything else uses the last 90 days
+        history_dates, history = _load_visit_matrix(
+            self.hospital_id, end_date - timedelta(days=FAST_TIER_HISTORY_DAYS), end_date,
+            dept_ids=[dept.id for dept in departments],
+        )
+        recent_days   = (_naive_day(end_date) - _naive_day(start_date)).days + 1
+        dates, matrix = history_dates[-recent_days:], history[:, -recent_days:]
+        fast_history  = _fast_tier_history(history[:-1], len(dates))
 
         forecast_dates = pd.date_range(
             start=pd.Timestamp(end_date).tz_localize(None).floor("D") + timedelta(days=1),
@@ -346,22 +1366,39 @@ class ARIMAForecaster:
         # Initialise result rows — one dict per forecast date
         results = [{"name": d.strftime("%b %d")} for d in forecast_dates]
 
-        overall_total_visits    = 0
+        # Visits by doctors outside any department (last row) are not counted
+        overall_total_visits    = int(matrix[:-1].sum())
         depts_with_arima        = 0
+        depts_with_fast         = 0
         depts_with_fallback     = 0
         dept_visit_counts       = {}
+        dept_models             = {}
 
-        for dept in departments:
-            visits_qs = Visit.objects.filter(
-                hospital_id=self.hospital_id,
-                doctor__department=dept,
-                visit_date__range=(start_date, end_date),
-            ).values("visit_date")
+        if reconcile is not None and reconcile not in RECONCILIATION_METHODS:
+            raise ValueError(f"Unknown reconciliation method: {reconcile}")
 
-            overall_total_visits += visits_qs.count()
+        # Top-down needs only the hospital-level model — skip department fits
+        fit_bottom = reconcile != "top_down"
 
-            series = _build_daily_series(visits_qs, start_date, end_date)
+        # --- Fast tier: backtest + forecast every department in one pass ---
+        fast_available = (
+            fit_bottom
+            and len(departments) > 0
+            and _fast_tier_possible(fast_history.shape[1])
+        )
+        if fast_available:
+            with timing.stage("fast_tier"):
+                fast_forecasts, fast_methods, fast_maes = _fast_forecast(fast_history, steps)
+
+        series_by_dept = {}
+        fast_tier      = set()
+        fit_jobs       = {}
+        sarima_paths   = {}
+
+        for i, dept in enumerate(departments):
+            series = pd.Series(matrix[i], index=dates, name="count")
             active_days = int((series > 0).sum())
+            series_by_dept[str(dept.id)] = series
             
             # --- Progress Tracking (calculating here saves a second loop/query) ---
             dept_visit_counts[str(dept.id)] = {
@@ -370,133 +1407,304 @@ class ARIMAForecaster:
                 "total_visits": int(series.sum()),
             }
 
-            # --- Determine whether to run ARIMA or use rolling-mean fallback ---
+            # --- Determine the tier: SARIMA candidate, fast tier or rolling mean ---
             use_arima = (
                 active_days >= MIN_DEPT_ACTIVE_DAYS
                 and len(series) >= MIN_DEPT_TOTAL_DAYS
             )
 
-            if use_arima:
-                try:
-                    model_fit, order_str = self._fit_model(
-                        series, cache_key=f"dept_{dept.id}"
-                    )
-                    print(
-                        f"[ARIMAForecaster] Dept {dept.name} model: {order_str}"
-                    )
+            if fast_available and active_days >= MIN_FAST_TIER_ACTIVE_DAYS:
+                fast_tier.add(str(dept.id))
 
-                    if PMDARIMA_AVAILABLE:
-                        forecast_values = model_fit.predict(n_periods=steps)
-                    else:
-                        forecast_result = model_fit.get_forecast(steps=steps)
-                        forecast_values = forecast_result.predicted_mean
-
-                    for i, val in enumerate(forecast_values):
-                        # --- Improved robust calculation (Safe Math) ---
-                        v = float(val)
-                        if pd.isna(v) or not np.isfinite(v):
-                            results[i][str(dept.id)] = 0
-                        else:
-                            results[i][str(dept.id)] = max(0, int(round(v)))
-
-                    depts_with_arima += 1
-                    continue          # skip the fallback block below
-
-                except Exception as e:
-                    print(
-                        f"[ARIMAForecaster] Dept {dept.name} ARIMA failed: {e}. "
-                        f"Using rolling-mean fallback."
-                    )
+            if use_arima and fit_bottom:
+                sarima_paths[str(dept.id)] = _cache_path(self.hospital_id, f"dept_{dept.id}")
+                fit_jobs[str(dept.id)] = (
+                    series,
+                    sarima_paths[str(dept.id)],
+                    float(fast_maes[i]) if fast_available else None,
+                )
 
-            # --- Deterministic rolling-mean fallback (no random noise) ---
-            window = min(7, len(series))
-            avg    = float(series.iloc[-window:].mean()) if len(series) > 0 else 0.0
-            
-            # --- Robust check for NaN/Inf in fallback as well ---
-            if pd.isna(avg) or not np.isfinite(avg):
-                avg = 0.0
+        budget = _FitBudget(FORECAST_BUDGET_SECONDS, SERIES_BUDGET_SECONDS) if budgeted else None
+
+        # --- Budgeted: serve every freshly cached model without fitting ---
+        cached = {}
+        if budget is not None:
+            for dept_key, (series, path, fast_mae) in list(fit_jobs.items()):
+                outcome = _cached_forecast(path, series, forecast_dates[0], steps, fast_mae)
+                if outcome is not None:
+                    cached[dept_key] = outcome
+                    del fit_jobs[dept_key]
 
-            for i in range(steps):
-                results[i][str(dept.id)] = max(0, int(round(avg)))
+        # --- Fit every remaining SARIMA candidate (in the thread or on the pool) ---
+        fitted = self._fit_departments(fit_jobs, steps, forecast_dates[0], budget)
+        fitted.update(cached)
 
+        # Unrounded per-department forecasts, one row per department
+        base = np.zeros((len(departments), steps))
+
+        for i, dept in enumerate(departments):
+            if not fit_bottom:
+                break
+
+            dept_key = str(dept.id)
+            outcome  = fitted.get(dept_key)
+
+            if isinstance(outcome, Exception):
+                print(
+                    f"[ARIMAForecaster] Dept {dept.name} ARIMA failed: {outcome}. "
+                    f"Using fallback."
+                )
+            elif outcome is not None and outcome[0] is not None:
+                forecast_values, order_str = outcome
+                print(f"[ARIMAForecaster] Dept {dept.name} model: {order_str}")
+                base[i] = forecast_values
+                if dept_key in cached:
+                    dept_models[dept_key] = "cached"
+                elif budget is not None and _is_stopgap(sarima_paths[dept_key]):
+                    dept_models[dept_key] = "sarima_fixed"
+                else:
+                    dept_models[dept_key] = "sarima"      # incl. updated full-search models
+                depts_with_arima += 1
+                continue          # skip the fallback blocks below
+
+            # --- Vectorised fast tier (backtest-selected method) ---
+            if dept_key in fast_tier:
+                base[i] = fast_forecasts[i]
+                dept_models[dept_key] = f"fast:{fast_methods[i]}"
+                depts_with_fast += 1
+                continue
+
+            # --- Deterministic rolling-mean fallback (no random noise) ---
+            base[i] = _recent_mean(series_by_dept[dept_key])
+            dept_models[dept_key] = "rolling_mean"
             depts_with_fallback += 1
 
+        # --- Optional hierarchical reconciliation with the hospital total ---
+        reconciliation = None
+        if reconcile is not None and departments:
+            with timing.stage("reconcile"):
+                base, total_model = self._reconcile(
+                    reconcile, matrix[:-1], dates, base, steps, forecast_dates[0], budget,
+                    fast_history,
+                )
+            reconciliation = {"method": reconcile, "total_model": total_model}
+
+            if not fit_bottom:
+                # Every department inherits the hospital-level model
+                dept_models = {str(dept.id): "top_down" for dept in departments}
+                if total_model in ("cached", "sarima", "sarima_fixed"):
+                    depts_with_arima = len(departments)
+                elif total_model.startswith("fast:"):
+                    depts_with_fast = len(departments)
+                else:
+                    depts_with_fallback = len(departments)
+
+        # --- Improved robust calculation (Safe Math) ---
+        base = np.where(np.isfinite(base), base, 0.0)
+        counts = np.maximum(0, np.round(base)).astype(int)
+        for i, dept in enumerate(departments):
+            dept_key = str(dept.id)
+            for day, value in enumerate(counts[i]):
+                results[day][dept_key] = int(value)
+
+        if reconciliation is not None:
+            for day, total in enumerate(counts.sum(axis=0)):
+                results[day]["total"] = int(total)
+
         # --- Final Metadata and Progress Tracking ---
         # (calculated during the loop above now to save database hits)
         
-        if depts_with_arima == 0 and depts_with_fallback == 0:
+        total_depts = depts_with_arima + depts_with_fast + depts_with_fallback
+        if total_depts == 0:
             confidence = 0.0
         else:
             confidence = min(100.0, (overall_total_visits / 500) * 100)
-            total_depts = depts_with_arima + depts_with_fallback
-            if total_depts > 0:
-                arima_ratio = depts_with_arima / total_depts
-                confidence  = round(confidence * (0.5 + 0.5 * arima_ratio), 1)
-
-        return {
-            "forecast": results,
-            "metadata": {
-                "confidence":                round(confidence, 1),
-                "is_learning":               confidence < 40,
-                "total_visits_analyzed":     overall_total_visits,
-                "departments_with_arima":    depts_with_arima,
-                "departments_with_fallback": depts_with_fallback,
-
-                "min_visits_required":       MIN_GLOBAL_DAYS,
-                "max_forecast_range":        steps,
-                "min_dept_days_required":    MIN_DEPT_ACTIVE_DAYS,
-                "dept_progress":             dept_visit_counts, 
-            },
+            # Both SARIMA and the backtested fast tier count as model-based
+            model_ratio = (depts_with_arima + depts_with_fast) / total_depts
+            confidence  = round(confidence * (0.5 + 0.5 * model_ratio), 1)
+
+        metadata = {
+            "confidence":                round(confidence, 1),
+            "is_learning":               confidence < 40,
+            "total_visits_analyzed":     overall_total_visits,
+            "departments_with_arima":    depts_with_arima,
+            "departments_with_fast_tier": depts_with_fast,
+            "departments_with_fallback": depts_with_fallback,
+            "dept_models":               dept_models,
+
+            "min_visits_required":       MIN_GLOBAL_DAYS,
+            "max_forecast_range":        steps,
+            "min_dept_days_required":    MIN_DEPT_ACTIVE_DAYS,
+            "dept_progress":             dept_visit_counts, 
         }
+        if reconciliation is not None:
+            metadata["reconciliation"] = reconciliation
+        if budget is not None:
+            stopgap = [
+                key for key, label in dept_models.items()
+                if label in ("cached", "sarima_fixed") and _is_stopgap(sarima_paths[key])
+            ]
+            if (reconciliation is not None
+                    and reconciliation["total_model"] in ("cached", "sarima_fixed")
+                    and _is_stopgap(_cache_path(self.hospital_id, "hierarchy_total"))):
+                stopgap.append("total")
+            metadata["budget"] = {
+                "seconds":         FORECAST_BUDGET_SECONDS,
+                "series_seconds":  SERIES_BUDGET_SECONDS,
+                "elapsed_seconds": round(budget.elapsed(), 2),
+                "timed_out": [
+                    key for key, outcome in fitted.items()
+                    if isinstance(outcome, TimeoutError)
+                ],
+                "stopgap": stopgap,
+            }
+
+        return {"forecast": results, "metadata": metadata}
+
+    def _reconcile(self, method, Y, dates, base, steps, start, budget=None, history=None):
+        """
+        Reconcile the department base forecasts `base` (departments × steps)
+        with a hospital-level forecast.  Y is the departments × days history,
+        `history` the departments' longer fast-tier history (default Y).
+        Returns (reconciled department forecasts, hospital-level model label).
+        """
+        if method == "bottom_up":
+            _, bottom = hierarchy.bottom_up(base)
+            return bottom, "bottom_up"
+
+        total_series = pd.Series(Y.sum(axis=0), index=dates, name="count")
+        total_base, total_model = self._total_base_forecast(
+            total_series, steps, start, budget,
+            history=None if history is None else history.sum(axis=0),
+        )
+
+        # Shares and residuals from complete days only (see fingerprint.settled)
+        complete = Y[:, :Y.shape[1] - fingerprint.PROVISIONAL_DAYS]
+        if method == "top_down":
+            _, bottom = hierarchy.top_down(total_base, hierarchy.historical_proportions(complete))
+        else:
+            residuals = hierarchy.seasonal_naive_residuals(
+                np.vstack([complete.sum(axis=0), complete]), m=SEASONAL_PERIOD
+            )
+            _, bottom = hierarchy.mint(total_base, base, residuals)
+
+        print(f"[ARIMAForecaster] {method} reconciliation (hospital model: {total_model})")
+        return np.maximum(bottom, 0), total_model
+
+    def _total_base_forecast(self, series: pd.Series, steps: int, start, budget=None,
+                             history=None):
+        """
+        Hospital-level base forecast for reconciliation, using the same tiers
+        as a department: SARIMA (if it beats the fast tier), fast tier, then
+        rolling mean — with the cached and fixed-order SARIMA tiers when a
+        `budget` is given.  The fast tier runs on `history`, the total's
+        longer fast-tier history (default: the series itself).
+        Returns (values, model label).
+        """
+        history  = series.to_numpy() if history is None else history
+        fast_mae = None
+        if _fast_tier_possible(len(history)):
+            fast_forecast, fast_method, fast_mae = _fast_forecast(history, steps)
+            fast_mae = float(fast_mae[0])
+
+        if len(series) >= MIN_GLOBAL_DAYS and int((series > 0).sum()) >= MIN_DEPT_ACTIVE_DAYS:
+            path = _cache_path(self.hospital_id, "hierarchy_total")
+            try:
+                label = "sarima"
+                if budget is None:
+                    values, order_str = _fit_and_predict(series, path, steps, start, fast_mae)
+                else:
+                    outcome, label = _cached_forecast(path, series, start, steps, fast_mae), "cached"
+                    if outcome is None:
+                        outcome = _fit_budgeted(series, path, steps, start, fast_mae, budget)
+                        label = "sarima_fixed" if _is_stopgap(path) else "sarima"
+                    values, order_str = outcome
+                if values is not None:
+                    print(f"[ARIMAForecaster] Hospital total model: {order_str}")
+                    return np.asarray(values, dtype=float), label
+            except Exception as e:
+                print(f"[ARIMAForecaster] Hospital total ARIMA failed: {e}. Using fallback.")
+
+        if fast_mae is not None:
+            return fast_forecast[0], f"fast:{fast_method[0]}"
+
+        return np.full(steps, _recent_mean(series)), "rolling_mean"
 
     # ------------------------------------------------------------------
-    # Public: department load status (capacity % for tomorrow)
+    # Public: department load status (capacity % per forecast day)
     # ------------------------------------------------------------------
 
     def get_department_load_status(self, forecast_data: dict = None) -> list[dict]:
         """
-        Return capacity status for each department based on tomorrow's forecast.
+        Return capacity status for each department based on the forecast.
         Accepts pre-calculated forecast_data to avoid redundant execution.
-        """
-        from users.models import Profile
 
+        Active doctor counts for all departments come from one aggregate
+        query; utilisation for every forecast day is computed as a single
+        (departments × days) array operation.  The top-level fields describe
+        tomorrow, "days" holds the per-day bands for a capacity heatmap:
+
+        [{"name", "status", "percent", "color", "dot",
+          "days": [{"name": "Apr 01", "percent": int, "status": str}, ...]}, ...]
+        """
         if not forecast_data:
             forecast_data = self.forecast_by_department(steps=1)
             
         if not forecast_data or not forecast_data.get("forecast") or len(forecast_data["forecast"]) == 0:
             return []
 
-        tomorrow_data = forecast_data["forecast"][0]
-        departments   = Department.objects.filter(hospital_id=self.hospital_id)
-        status_results = []
-
-        for dept in departments:
-            count = tomorrow_data.get(str(dept.id), 0)
-
-            # Use actual active doctor count; fall back to 1 to avoid ZeroDivisionError
-            doctor_count = Profile.objects.filter(
-                department=dept, role="doctor", is_active=True
-            ).count()
-
-            # Allow departments to override the default patients-per-doctor figure
-            patients_per_doctor = getattr(dept, "patients_per_doctor_per_day", DEFAULT_PATIENTS_PER_DOCTOR)
-            capacity = max(1, doctor_count * patients_per_doctor)
+        forecast_rows = forecast_data["forecast"]
+        with timing.stage("db"):
+            departments = list(
+                Department.objects.filter(hospital_id=self.hospital_id).annotate(
+                    active_doctors=Count(
+                        "profiles",
+                        filter=Q(profiles__role="doctor", profiles__is_active=True),
+                    )
+                )
+            )
+        if not departments:
+            return []
 
-            percent = min(100, int(round((count / capacity) * 100)))
+        # Expected visits: departments × forecast days
+        expected = np.array(
+            [[row.get(str(dept.id), 0) for row in forecast_rows] for dept in departments],
+            dtype=float,
+        )
 
-            if percent > 80:
-                status, color, dot = "High",     "text-red-500",    "🔴"
-            elif percent > 60:
-                status, color, dot = "Moderate", "text-orange-500", "🟡"
-            else:
-                status, color, dot = "Normal",   "text-green-500",  "🟢"
+        # Use actual active doctor count; fall back to 1 to avoid ZeroDivisionError.
+        # Departments may override the default patients-per-doctor figure.
+        capacity = np.maximum(1, np.array([
+            dept.active_doctors
+            * getattr(dept, "patients_per_doctor_per_day", DEFAULT_PATIENTS_PER_DOCTOR)
+            for dept in departments
+        ], dtype=float))
+
+        percent = np.minimum(100, np.round(expected / capacity[:, None] * 100)).astype(int)
+        band    = np.select(
+            [percent > threshold for threshold, *_ in LOAD_STATUS_BANDS],
+            np.arange(len(LOAD_STATUS_BANDS)),
+            default=len(LOAD_STATUS_BANDS),
+        )
+        bands = LOAD_STATUS_BANDS + [(None, *NORMAL_LOAD_STATUS)]
 
+        status_results = []
+        for i, dept in enumerate(departments):
+            _, status, color, dot = bands[band[i, 0]]
             status_results.append({
                 "name":    dept.name,
                 "status":  status,
-                "percent": percent,
+                "percent": int(percent[i, 0]),
                 "color":   color,
                 "dot":     dot,
+                "days": [
+                    {
+                        "name":    row.get("name"),
+                        "percent": int(percent[i, j]),
+                        "status":  bands[band[i, j]][1],
+                    }
+                    for j, row in enumerate(forecast_rows)
+                ],
             })
 
         return status_results
@@ -505,17 +1713,33 @@ class ARIMAForecaster:
     # Public: model evaluation (train / test split + walk-forward)
     # ------------------------------------------------------------------
 
-    def evaluate(self, test_days: int = 14) -> dict:
+    def evaluate(
+        self,
+        test_days: int = 14,
+        origins: int = EVAL_ORIGINS,
+        stride_days: int = EVAL_ORIGIN_STRIDE_DAYS,
+        history_days: int = 90,
+        workers: int = None,
+    ) -> dict:
         """
-        Evaluate the ARIMA model using a walk-forward (rolling-origin) split.
-
-        Walk-forward is more reliable than a single 80/20 split for time-series
-        because it respects the temporal ordering of observations — the model
-        is never trained on data that comes after the test window.
-
-        Returns MAE, RMSE, MAPE, and the SARIMA order string used.
+        Evaluate the ARIMA model with a multi-fold walk-forward (rolling-origin)
+        backtest.
+
+        Each fold trains on everything before its origin and forecasts the
+        next `test_days` days; origins step back `stride_days` at a time from
+        the end of the history.  Folds are independent, so they are fitted on
+        a process pool (EVAL_POOL_WORKERS).  Every fold's model is cached under
+        a hash of its training data, so a cached model is only ever reused
+        for exactly the data it was fitted on and concurrent evaluations
+        cannot overwrite each other's models.  Fold models stay in this
+        node's cache; they are never published to the shared store.
+
+        Returns MAE, RMSE, MAPE and directional accuracy averaged over the
+        folds, the SARIMA order of the most recent fold, and per-fold metrics.
         """
-        series = self.get_historical_data(days=90)
+        # Folds are cut from complete days only: each training window is then
+        # used as a whole (settled) and its holdout starts the next day
+        series = fingerprint.settled(self.get_historical_data(days=history_days))
 
         if len(series) < test_days + MIN_GLOBAL_DAYS:
             return {
@@ -526,57 +1750,103 @@ class ARIMAForecaster:
                 ),
             }
 
-        train  = series.iloc[:-test_days]
-        test   = series.iloc[-test_days:]
-        actual = test.values.astype(float)
+        # Training-window ends, most recent first; keep folds with enough history
+        train_ends = [
+            end for end in (
+                len(series) - test_days - k * stride_days for k in range(max(1, origins))
+            )
+            if end >= MIN_GLOBAL_DAYS
+        ]
 
-        try:
-            # Fit on training portion only
-            model_fit, order_str = self._fit_model(train, cache_key="eval_tmp")
+        jobs = {}
+        for end in train_ends:
+            train = series.iloc[:end]
+            jobs[end] = (train, _cache_path(self.hospital_id, _eval_cache_key(train)), None)
 
-            if PMDARIMA_AVAILABLE:
-                predictions = model_fit.predict(n_periods=test_days).astype(float)
-            else:
-                predictions = (
-                    model_fit.get_forecast(steps=test_days)
-                    .predicted_mean
-                    .values
-                    .astype(float)
-                )
+        workers = EVAL_POOL_WORKERS if workers is None else workers
+        if workers > 0 and len(jobs) > 1:
+            fitted = _fit_in_pool(jobs, test_days, workers, settled=True)
+        else:
+            fitted = _fit_sequential(jobs, test_days, settled=True)
 
-            predictions = np.maximum(predictions, 0)
+        folds = []
+        for end in train_ends:
+            fold = {
+                "origin":     series.index[end].strftime("%Y-%m-%d"),
+                "train_days": end,
+            }
+            outcome = fitted[end]
+            if isinstance(outcome, Exception):
+                folds.append({**fold, "status": "failed", "error": str(outcome)})
+                continue
+
+            predictions, order_str = outcome
+            actual = series.iloc[end:end + test_days].values.astype(float)
+            metrics = _error_metrics(actual, np.maximum(predictions, 0))
+            folds.append({
+                **fold,
+                "status":      "success",
+                "model_order": order_str,
+                **{name: round(value, 2) for name, value in metrics.items()},
+            })
 
-            mae  = float(np.mean(np.abs(predictions - actual)))
-            rmse = float(np.sqrt(np.mean((predictions - actual) ** 2)))
+        scored = [f for f in folds if f["status"] == "success"]
+        if not scored:
+            return {
+                "status": "failed",
+                "error":  folds[0]["error"] if folds else "no evaluation folds",
+                "folds":  folds,
+            }
 
-            # MAPE: skip zero-actual days to avoid division by zero
-            mask = actual != 0
-            mape = (
-                float(np.mean(np.abs((actual[mask] - predictions[mask]) / actual[mask])) * 100)
-                if mask.any()
-                else 0.0
-            )
+        def mean_of(name):
+            return float(np.mean([f[name] for f in scored]))
 
-            # Directional accuracy: did the model predict up/down correctly?
-            actual_diff     = np.diff(actual)
-            predicted_diff  = np.diff(predictions)
-            dir_accuracy    = float(
-                np.mean(np.sign(actual_diff) == np.sign(predicted_diff)) * 100
-            ) if len(actual_diff) > 0 else 0.0
+        return {
+            "status":              "success",
+            "model_order":         scored[0]["model_order"],
+            "test_days":           test_days,
+            "origins":             len(folds),
+            "folds_failed":        len(folds) - len(scored),
+            "mae":                 round(mean_of("mae"),  2),
+            "rmse":                round(mean_of("rmse"), 2),
+            "mape":                f"{round(mean_of('mape'), 2)}%",
+            "directional_accuracy": f"{round(mean_of('directional_accuracy'), 1)}%",
+            "folds":               folds,
+            "note": (
+                f"Rolling-origin evaluation over {len(folds)} origin(s) "
+                f"{stride_days} days apart: each fold is trained only on data before "
+                f"its origin, then forecasts the next {test_days} days."
+            ),
+        }
 
-            return {
-                "status":              "success",
-                "model_order":         order_str,
-                "test_days":           test_days,
-                "mae":                 round(mae,          2),
-                "rmse":                round(rmse,         2),
-                "mape":                f"{round(mape, 2)}%",
-                "directional_accuracy": f"{round(dir_accuracy, 1)}%",
-                "note": (
-                    "Walk-forward evaluation: model trained on all data except "
-                    f"the final {test_days} days, then forecasted forward."
-                ),
-            }
 
-        except Exception as e:
-            return {"status": "failed", "error": str(e)}
\ No newline at end of file
+def _eval_cache_key(train: pd.Series) -> str:
+    """Cache key derived from the training data itself (dates and values)."""
+    digest = hashlib.sha1()
+    digest.update(str(train.index[0].date()).encode())
+    digest.update(str(train.index[-1].date()).encode())
+    digest.update(np.ascontiguousarray(train.values, dtype=float).tobytes())
+    return f"{EVAL_CACHE_PREFIX}{digest.hexdigest()[:16]}"
+
+
+def _error_metrics(actual: np.ndarray, predictions: np.ndarray) -> dict:
+    """MAE, RMSE, MAPE (%) and directional accuracy (%) of one forecast."""
+    mae  = float(np.mean(np.abs(predictions - actual)))
+    rmse = float(np.sqrt(np.mean((predictions - actual) ** 2)))
+
+    # MAPE: skip zero-actual days to avoid division by zero
+    mask = actual != 0
+    mape = (
+        float(np.mean(np.abs((actual[mask] - predictions[mask]) / actual[mask])) * 100)
+        if mask.any()
+        else 0.0
+    )
+
+    # Directional accuracy: did the model predict up/down correctly?
+    actual_diff    = np.diff(actual)
+    predicted_diff = np.diff(predictions)
+    dir_accuracy   = float(
+        np.mean(np.sign(actual_diff) == np.sign(predicted_diff)) * 100
+    ) if len(actual_diff) > 0 else 0.0
+
+    return {"mae": mae, "rmse": rmse, "mape": mape, "directional_accuracy": dir_accuracy}
@@ -0,0 +1,11 @@
+"""
+Constants that request handling needs without loading the ML stack.
+Kept free of NumPy/pandas imports so `analytics.ml_models` stays cheap to import.
+"""
+
+# Longest forecast range served; the forecaster computes and caches a
+# prediction path this long so shorter ranges are just slices
+MAX_FORECAST_HORIZON = 365
+
+# Hierarchical reconciliation modes (see hierarchy.py)
+RECONCILIATION_METHODS = ("bottom_up", "top_down", "mint")
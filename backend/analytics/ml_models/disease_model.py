@@ -1,9 +1,9 @@
 import os
-import joblib
 import numpy as np
 import pandas as pd
 
 from datetime import timedelta
+from django.db.models import Count, Q, Sum
 from django.utils import timezone
 
 from sklearn.ensemble import RandomForestClassifier
@@ -11,6 +11,11 @@ from sklearn.model_selection import StratifiedKFold, cross_validate
 from sklearn.metrics import accuracy_score, f1_score
 from sklearn.preprocessing import LabelEncoder
 
+from analytics import timing
+from . import fingerprint, model_store
+from .disk_cache import disk_cache_for
+from .model_cache import model_cache, atomic_dump
+
 
 # ---------------------------------------------------------------------------
 # Constants
@@ -25,12 +30,29 @@ MIN_RECORDS_FOR_ML = 50
 # How many top diagnoses to return in the distribution output
 TOP_N_DIAGNOSES = 5
 
-# Cache TTL: models are re-trained at most once per day per (hospital, dept)
-MODEL_CACHE_TTL_HOURS = 24
+# Visit fields loaded for ML training (no patient PII)
+VISIT_COLUMNS = (
+    "visit_date",
+    "diagnosis",
+    "patient__age",
+    "patient__gender",
+    "doctor__department_id",
+)
+
+# Rows fetched per round trip when streaming visits for training
+VISIT_CHUNK_SIZE = 2000
 
 # Path where serialised models are stored
 MODEL_CACHE_DIR = "/tmp/smartaid_models"
 
+# Size cap, LRU/TTL eviction and background GC of MODEL_CACHE_DIR
+disk_cache = disk_cache_for(MODEL_CACHE_DIR)
+
+# Version of the bundle format and training code, recorded in every bundle
+# and part of every shared model's address (see model_store) — bump to stop
+# serving older bundles
+RF_CODE_VERSION = "rf-1"
+
 
 # ---------------------------------------------------------------------------
 # Feature engineering helpers
@@ -119,34 +141,65 @@ def _feature_columns(df: pd.DataFrame) -> list[str]:
 # Model cache helpers
 # ---------------------------------------------------------------------------
 
-def _cache_path(hospital_id, dept_key: str) -> str:
+def _cache_path(hospital_id, dept_key: str, days: int) -> str:
     os.makedirs(MODEL_CACHE_DIR, exist_ok=True)
-    return os.path.join(MODEL_CACHE_DIR, f"rf_{hospital_id}_{dept_key}.pkl")
+    return os.path.join(MODEL_CACHE_DIR, f"rf_{hospital_id}_{dept_key}_{days}d.pkl")
 
 
-def _load_cached_model(path: str):
-    """Load a cached (model, label_encoder, trained_at) tuple, or None."""
+def _load_cached_model(path: str, data_hash: str):
+    """
+    Load the cached bundle at `path` if it was trained on exactly the data
+    with this hash (see fingerprint.py) by the current code version, else None.
+    """
     if not os.path.exists(path):
         return None
     try:
-        bundle = joblib.load(path)
-        trained_at: pd.Timestamp = bundle.get("trained_at")
-        age_hours = (pd.Timestamp.now() - trained_at).total_seconds() / 3600
-        if age_hours > MODEL_CACHE_TTL_HOURS:
-            return None          # stale — retrain
+        with timing.stage("model_load"):
+            bundle = model_cache.load(path)
+        if bundle is None:
+            return None
+        disk_cache.touch(path)
+        if bundle.get("code_version") != RF_CODE_VERSION or bundle.get("data_hash") != data_hash:
+            return None          # data or code changed — retrain
         return bundle
     except Exception:
         return None
 
 
-def _save_model(path: str, rf, le, feature_cols):
+def _save_model(path: str, rf, le, feature_cols, data_hash: str = None):
     bundle = {
         "model": rf,
         "label_encoder": le,
         "feature_cols": feature_cols,
         "trained_at": pd.Timestamp.now(),
+        "data_hash": data_hash,
+        "code_version": RF_CODE_VERSION,
     }
-    joblib.dump(bundle, path)
+    atomic_dump(bundle, path)
+    model_cache.store(path, bundle)
+    disk_cache.record(path)
+    model_store.publish(model_store.key_for_path(path, data_hash, RF_CODE_VERSION), bundle)
+    return bundle
+
+
+def _pull_shared_model(path: str, data_hash: str):
+    """
+    The bundle another node published for the same visits (same data hash
+    and code version), copied into the local cache, or None.
+    """
+    shared = model_store.fetch(
+        model_store.key_for_path(path, data_hash, RF_CODE_VERSION), latest=False
+    )
+    if not shared or "model" not in shared:
+        return None
+    try:
+        atomic_dump(shared, path)
+        model_cache.store(path, shared)
+        disk_cache.record(path)
+    except Exception as e:
+        print(f"[DiseaseClassifier] Warning: could not cache shared model to {path}: {e}")
+    timing.count("shared_model_hits")
+    return shared
 
 
 # ---------------------------------------------------------------------------
@@ -159,13 +212,15 @@ class DiseaseClassifier:
 
     Strategy
     --------
-    1. PRIMARY PATH — value_counts (always computed):
-       Aggregate actual diagnosis frequencies from the filtered visit records.
-       This is the ground truth distribution and is always returned.
+    1. PRIMARY PATH — historical counts (always computed):
+       Aggregate actual diagnosis frequencies from the filtered visit records
+       in the database (top-N only).  This is the ground truth distribution
+       and is always returned.
 
     2. SECONDARY PATH — Random Forest (when enough data exists):
        Train an RF to predict *which diagnosis is most likely* for a given
-       patient context (season, age group, department, etc.).  The model's
+       patient context (season, age group, department, etc.).  Full visit
+       rows are loaded only to train it.  The model's
        class probabilities are blended with the historical counts to produce
        a context-aware distribution that is slightly forward-looking.
 
@@ -180,11 +235,8 @@ class DiseaseClassifier:
     # Data loading
     # ------------------------------------------------------------------
 
-    def _load_visits(self, days: int, department_id=None) -> pd.DataFrame:
-        """
-        Fetch visit records from the database and return a raw DataFrame.
-        Only aggregated / anonymised fields are selected — no patient PII.
-        """
+    def _visits(self, days: int, department_id=None):
+        """Visits of the hospital in the last `days` days (optionally one department's)."""
         from clinical.models import Visit
 
         end_date   = timezone.now()
@@ -198,64 +250,117 @@ class DiseaseClassifier:
         if department_id and str(department_id) != "all":
             filters["doctor__department_id"] = department_id
 
-        qs = Visit.objects.filter(**filters).values(
-            "visit_date",
-            "diagnosis",
-            "patient__age",
-            "patient__gender",
-            "doctor__department_id",
-        )
+        return Visit.objects.filter(**filters)
 
-        if not qs.exists():
-            return pd.DataFrame()
+    def _load_visits(self, days: int, department_id=None, expected_rows: int = None) -> pd.DataFrame:
+        """
+        Fetch visit records from the database and return a raw DataFrame.
+        Only aggregated / anonymised fields are selected — no patient PII.
 
-        return pd.DataFrame(list(qs))
+        Rows are streamed with .iterator() straight into pre-allocated column
+        arrays (sized by `expected_rows` when the caller already counted
+        them), so no list of per-row dicts is ever materialised.
+        """
+        qs = self._visits(days, department_id).values_list(*VISIT_COLUMNS)
+
+        with timing.stage("db"):
+            capacity = qs.count() if expected_rows is None else expected_rows
+            if not capacity:
+                return pd.DataFrame()
+
+            columns = {name: np.empty(capacity, dtype=object) for name in VISIT_COLUMNS}
+            arrays = [columns[name] for name in VISIT_COLUMNS]
+
+            n = 0
+            for row in qs.iterator(chunk_size=VISIT_CHUNK_SIZE):
+                if n == capacity:            # rows added since the count
+                    capacity *= 2
+                    for name in VISIT_COLUMNS:
+                        columns[name] = np.resize(columns[name], capacity)
+                    arrays = [columns[name] for name in VISIT_COLUMNS]
+                for array, value in zip(arrays, row):
+                    array[n] = value
+                n += 1
+        timing.count("rows_loaded", n)
+
+        if not n:
+            return pd.DataFrame()
+        with timing.stage("aggregate"):
+            df = pd.DataFrame({name: array[:n] for name, array in columns.items()})
+            df["patient__age"] = pd.to_numeric(df["patient__age"])     # None → NaN
+            return df
 
     # ------------------------------------------------------------------
     # Core distribution logic
     # ------------------------------------------------------------------
 
-    def _historical_distribution(self, df: pd.DataFrame) -> list[dict]:
+    def _visit_stats(self, days: int, department_id=None) -> tuple:
+        """(visit count, distinct diagnoses) of the window, counted in the database."""
+        with timing.stage("db"):
+            stats = self._visits(days, department_id).aggregate(
+                total=Count("id"),
+                unique=Count("diagnosis", distinct=True),
+            )
+        return stats["total"], stats["unique"]
+
+    def _historical_distribution(self, days: int, department_id, total_records: int) -> list[dict]:
         """
-        Pure value_counts distribution — the ground truth.
-        Always accurate, zero ML involved.
+        Pure historical counts distribution — the ground truth.
+        Always accurate, zero ML involved: the top diagnoses are counted
+        and ranked in the database, so only TOP_N_DIAGNOSES rows come back.
         """
-        counts = (
-            df["diagnosis"]
-            .value_counts(normalize=True)
-            .head(TOP_N_DIAGNOSES)
-            * 100
-        )
+        with timing.stage("db"):
+            counts = list(
+                self._visits(days, department_id)
+                .values("diagnosis")
+                .annotate(visits=Count("id"))
+                .order_by("-visits", "diagnosis")[:TOP_N_DIAGNOSES]
+            )
+        timing.count("rows_loaded", len(counts))
         return [
             {
-                "name":  name,
-                "value": round(float(pct), 1),
+                "name":  row["diagnosis"],
+                "value": round(row["visits"] / total_records * 100, 1),
                 "color": COLORS[i % len(COLORS)],
             }
-            for i, (name, pct) in enumerate(counts.items())
+            for i, row in enumerate(counts)
         ]
 
     def _train_or_load_rf(
         self,
-        df: pd.DataFrame,
+        days: int,
+        department_id,
         dept_key: str,
+        data_hash: str,
+        total_records: int,
     ):
         """
-        Return a cached RF bundle if fresh, otherwise train a new one.
+        Return the cached RF bundle trained on this data (`data_hash`, the
+        fingerprint of the window's visits) from the local cache, else from
+        the shared model store; otherwise load the visits and train a new one.
         Returns None if training is not possible (insufficient data / classes).
         """
-        cache_path = _cache_path(self.hospital_id, dept_key)
-        bundle = _load_cached_model(cache_path)
+        cache_path = _cache_path(self.hospital_id, dept_key, days)
+        bundle = _load_cached_model(cache_path, data_hash)
         if bundle:
+            timing.count("cache_hits")
             return bundle
 
+        bundle = _pull_shared_model(cache_path, data_hash)
+        if bundle:
+            return bundle
+        timing.count("cache_misses")
+
+        # Full rows are only needed here, to train
+        df = self._load_visits(days, department_id, expected_rows=total_records)
+
         # Need enough records and at least 2 diagnosis classes to train
-        unique_diagnoses = df["diagnosis"].nunique()
-        if len(df) < MIN_RECORDS_FOR_ML or unique_diagnoses < 2:
+        if len(df) < MIN_RECORDS_FOR_ML or df["diagnosis"].nunique() < 2:
             return None
 
-        df_feat = _build_features(df)
-        feat_cols = _feature_columns(df_feat)
+        with timing.stage("features"):
+            df_feat = _build_features(df)
+            feat_cols = _feature_columns(df_feat)
 
         # Align columns (get_dummies can produce different sets per call)
         X = df_feat[feat_cols].fillna(0).values
@@ -271,21 +376,15 @@ class DiseaseClassifier:
             random_state=42,
             n_jobs=-1,
         )
-        rf.fit(X, y)
+        with timing.stage("fit"):
+            rf.fit(X, y)
+        timing.count("fits")
 
-        _save_model(cache_path, rf, le, feat_cols)
-
-        return {
-            "model": rf,
-            "label_encoder": le,
-            "feature_cols": feat_cols,
-            "trained_at": pd.Timestamp.now(),
-        }
+        return _save_model(cache_path, rf, le, feat_cols, data_hash)
 
     def _context_distribution(
         self,
         bundle: dict,
-        df_feat: pd.DataFrame,
         target_date,
         context_age: float,
         context_gender: str,
@@ -333,7 +432,8 @@ class DiseaseClassifier:
         # Align to training feature columns (fill unseen columns with 0)
         x_vec = np.array([[row.get(col, 0.0) for col in feat_cols]])
 
-        proba  = rf.predict_proba(x_vec)[0]
+        with timing.stage("predict"):
+            proba = rf.predict_proba(x_vec)[0]
         labels = le.inverse_transform(np.arange(len(proba)))
 
         dist = (
@@ -394,13 +494,10 @@ class DiseaseClassifier:
             target_date = timezone.now()
 
         dept_key = str(department_id) if department_id else "all"
-        df_raw   = self._load_visits(days=days, department_id=department_id)
-
-        total_records    = len(df_raw)
-        unique_diagnoses = df_raw["diagnosis"].nunique() if not df_raw.empty else 0
+        total_records, unique_diagnoses = self._visit_stats(days, department_id)
 
         # --- Insufficient data guard ---
-        if df_raw.empty or total_records < 5:
+        if total_records < 5:
             return {
                 "distribution": [],
                 "metadata": {
@@ -420,17 +517,22 @@ class DiseaseClassifier:
             }
 
         # --- Always compute historical distribution first ---
-        historical_dist = self._historical_distribution(df_raw)
+        historical_dist = self._historical_distribution(days, department_id, total_records)
         top_diagnosis   = historical_dist[0]["name"] if historical_dist else None
 
         # --- Attempt ML context-aware distribution ---
-        bundle = self._train_or_load_rf(df_raw, dept_key)
+        bundle = None
+        if total_records >= MIN_RECORDS_FOR_ML and unique_diagnoses >= 2:
+            with timing.stage("fingerprint"):
+                data_hash = fingerprint.for_visits(self.hospital_id, days, department_id).digest
+            bundle = self._train_or_load_rf(
+                days, department_id, dept_key, data_hash, total_records
+            )
 
         if bundle is not None:
             try:
-                df_feat = _build_features(df_raw)
                 context_dist = self._context_distribution(
-                    bundle, df_feat, target_date,
+                    bundle, target_date,
                     context_age, context_gender,
                     dept_id=int(str(department_id).split("-")[0], 16) if department_id and str(department_id) != "all" else -1,
                 )
@@ -486,22 +588,38 @@ class DiseaseClassifier:
 
         Returns a list of diagnoses sorted by growth rate (descending).
         """
-        df = self._load_visits(days=days)
-        if df.empty:
-            return []
-
-        df["visit_date"] = pd.to_datetime(df["visit_date"])
-        cutoff           = pd.Timestamp.now(tz="UTC") - pd.Timedelta(days=7)
+        from analytics.models import VisitDailyRollup
 
-        # Handle timezone-naive datetimes coming from the DB
-        if df["visit_date"].dt.tz is None:
-            cutoff = cutoff.tz_localize(None)
+        today  = timezone.localdate()
+        cutoff = today - timedelta(days=7)
 
-        recent = df[df["visit_date"] >= cutoff]["diagnosis"].value_counts()
-        prior  = df[df["visit_date"] <  cutoff]["diagnosis"].value_counts()
+        # Recent vs prior counts per diagnosis, summed in the database
+        rows = (
+            VisitDailyRollup.objects.filter(
+                hospital_id=self.hospital_id,
+                day__range=(today - timedelta(days=days), today),
+            )
+            .values("diagnosis")
+            .annotate(
+                recent=Sum("visit_count", filter=Q(day__gte=cutoff)),
+                prior=Sum("visit_count", filter=Q(day__lt=cutoff)),
+            )
+            .order_by()
+        )
+        with timing.stage("db"):
+            rows = list(rows)
+        timing.count("rows_loaded", len(rows))
+
+        # Most frequent recent diagnoses first (stable tie order for the sort below)
+        recent = {
+            r["diagnosis"]: r["recent"]
+            for r in sorted(rows, key=lambda r: r["recent"] or 0, reverse=True)
+            if r["recent"]
+        }
+        prior  = {r["diagnosis"]: r["prior"] or 0 for r in rows}
 
         results = []
-        for diagnosis in recent.index:
+        for diagnosis in recent:
             recent_count = int(recent.get(diagnosis, 0))
             prior_count  = int(prior.get(diagnosis, 0))
 
@@ -552,8 +670,9 @@ class DiseaseClassifier:
             }
 
         try:
-            df_feat   = _build_features(df_raw)
-            feat_cols = _feature_columns(df_feat)
+            with timing.stage("features"):
+                df_feat   = _build_features(df_raw)
+                feat_cols = _feature_columns(df_feat)
             X = df_feat[feat_cols].fillna(0).values
 
             le = LabelEncoder()
@@ -570,12 +689,14 @@ class DiseaseClassifier:
             n_splits = min(5, unique_classes)   # can't have more folds than classes
             cv = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=42)
 
-            scores = cross_validate(
-                rf, X, y,
-                cv=cv,
-                scoring={"accuracy": "accuracy", "f1": "f1_weighted"},
-                return_train_score=False,
-            )
+            with timing.stage("fit"):
+                scores = cross_validate(
+                    rf, X, y,
+                    cv=cv,
+                    scoring={"accuracy": "accuracy", "f1": "f1_weighted"},
+                    return_train_score=False,
+                )
+            timing.count("fits", n_splits)
 
             return {
                 "status": "success",
@@ -0,0 +1,258 @@
+"""
+Size-capped, evicting manager for the on-disk model cache directories.
+
+The forecaster (MODEL_CACHE_DIR = /tmp/smartaid_arima) and the classifier
+(/tmp/smartaid_models) write one joblib file per hospital and series key.
+Without a bound those directories only ever grow.  A DiskCache keeps an
+in-process index of the files in one directory — size and last use — and a
+background thread garbage-collects it:
+
+* bundles unused for longer than the TTL are deleted, then
+* the least recently used bundles are deleted until the directory fits
+  under its byte cap.
+
+Last use is shared between processes through the file's atime, which
+touch() sets explicitly (the mtime is left alone — the in-memory
+ModelLRUCache keys on it).  The request path never scans the directory:
+record() and touch() update the index in O(1), and only the GC thread
+rescans, on an interval, a directory whose size the cap keeps bounded.
+"""
+import os
+import threading
+import time
+
+from .model_cache import model_cache
+
+
+# Byte cap per cache directory (MB)
+DISK_CACHE_MAX_MB = float(os.getenv("ANALYTICS_DISK_CACHE_MB", "512"))
+
+# Bundles not used for this long are deleted (hours).  Must exceed the
+# forecaster's full-refit interval, since older bundles are still updated
+# incrementally rather than refit.
+DISK_CACHE_TTL_HOURS = float(os.getenv("ANALYTICS_DISK_CACHE_TTL_HOURS", str(14 * 24)))
+
+# Seconds between background garbage collections
+DISK_CACHE_GC_SECONDS = float(os.getenv("ANALYTICS_DISK_CACHE_GC_SECONDS", "600"))
+
+# Last-use updates of one file are written to disk at most this often (seconds)
+TOUCH_INTERVAL_SECONDS = 60
+
+# Temporary files left behind by an interrupted atomic_dump are removed after this (seconds)
+ORPHAN_TMP_SECONDS = 3600
+
+
+class DiskCache:
+    """Index, LRU/TTL eviction and background GC for one cache directory."""
+
+    def __init__(self, directory: str, max_bytes: int, ttl_hours: float,
+                 gc_interval: float = DISK_CACHE_GC_SECONDS):
+        self.directory   = directory
+        self.max_bytes   = int(max_bytes)
+        self.ttl_seconds = ttl_hours * 3600
+        self.gc_interval = gc_interval
+        self._index      = {}                # path → [size, last_used]
+        self._bytes      = 0
+        self._scanned    = False
+        self._lock       = threading.Lock()
+        self._wake       = threading.Event()
+        self._gc_pid     = None              # process that owns the GC thread
+        self.evictions   = 0
+        self.expirations = 0
+        self.last_gc     = None
+
+    # ------------------------------------------------------------------
+    # Request path
+    # ------------------------------------------------------------------
+
+    def record(self, path: str):
+        """Register a bundle that was just written to `path`."""
+        try:
+            size = os.stat(path).st_size
+        except OSError:
+            return
+        with self._lock:
+            self._set(path, size, time.time())
+            over = self._bytes > self.max_bytes
+        self._ensure_gc_thread()
+        if over:
+            self._wake.set()
+
+    def touch(self, path: str):
+        """Mark the bundle at `path` as used now (it was just loaded)."""
+        now = time.time()
+        with self._lock:
+            entry = self._index.get(path)
+            if entry is not None and now - entry[1] < TOUCH_INTERVAL_SECONDS:
+                return
+            if entry is not None:
+                entry[1] = now
+        try:
+            st = os.stat(path)
+            os.utime(path, ns=(int(now * 1e9), st.st_mtime_ns))
+        except OSError:
+            return
+        if entry is None:
+            with self._lock:
+                self._set(path, st.st_size, now)
+        self._ensure_gc_thread()
+
+    def _set(self, path: str, size: int, last_used: float):
+        old = self._index.get(path)
+        if old is not None:
+            self._bytes -= old[0]
+        self._index[path] = [size, last_used]
+        self._bytes += size
+
+    # ------------------------------------------------------------------
+    # Garbage collection
+    # ------------------------------------------------------------------
+
+    def collect(self) -> dict:
+        """Rescan the directory, then apply TTL and size-cap eviction."""
+        now = time.time()
+        self._rescan(now)
+
+        with self._lock:
+            expired = {p for p, (_, used) in self._index.items()
+                       if now - used > self.ttl_seconds}
+            lru = sorted(
+                (p for p in self._index if p not in expired),
+                key=lambda p: self._index[p][1],
+            )
+
+        removed_bytes = 0
+        for path in expired:
+            removed_bytes += self._remove(path)
+            self.expirations += 1
+
+        evicted = 0
+        for path in lru:
+            with self._lock:
+                if self._bytes <= self.max_bytes:
+                    break
+            removed_bytes += self._remove(path)
+            evicted += 1
+        self.evictions += evicted
+        self.last_gc = now
+
+        return {"expired": len(expired), "evicted": evicted, "freed_bytes": removed_bytes}
+
+    def _rescan(self, now: float):
+        """Merge the directory listing (other processes' writes) into the index."""
+        seen = {}
+        try:
+            entries = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            entries = []
+        for entry in entries:
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            if entry.name.endswith(".tmp"):
+                if now - st.st_mtime > ORPHAN_TMP_SECONDS:
+                    self._unlink(entry.path)
+                continue
+            if entry.name.endswith(".pkl"):
+                seen[entry.path] = (st.st_size, max(st.st_atime, st.st_mtime))
+
+        with self._lock:
+            index = {}
+            for path, (size, used) in seen.items():
+                known = self._index.get(path)
+                index[path] = [size, max(used, known[1]) if known else used]
+            self._index = index
+            self._bytes = sum(size for size, _ in index.values())
+            self._scanned = True
+
+    def _remove(self, path: str) -> int:
+        with self._lock:
+            entry = self._index.pop(path, None)
+            if entry is None:
+                return 0
+            self._bytes -= entry[0]
+        self._unlink(path)
+        model_cache.discard(path)
+        return entry[0]
+
+    @staticmethod
+    def _unlink(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass                     # removed by another worker's GC
+        except OSError as e:
+            print(f"[DiskCache] Warning: could not remove {path}: {e}")
+
+    def _ensure_gc_thread(self):
+        # Started lazily, and again in a forked child (threads do not survive fork)
+        pid = os.getpid()
+        if self._gc_pid == pid:
+            return
+        with self._lock:
+            if self._gc_pid == pid:
+                return
+            self._gc_pid = pid
+        threading.Thread(
+            target=self._gc_loop, name=f"disk-cache-gc:{self.directory}", daemon=True
+        ).start()
+
+    def _gc_loop(self):
+        while True:
+            try:
+                result = self.collect()
+                if result["expired"] or result["evicted"]:
+                    print(
+                        f"[DiskCache] {self.directory}: expired {result['expired']}, "
+                        f"evicted {result['evicted']}, freed {result['freed_bytes']} bytes"
+                    )
+            except Exception as e:
+                print(f"[DiskCache] GC of {self.directory} failed: {e}")
+            self._wake.wait(self.gc_interval)
+            self._wake.clear()
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def stats(self) -> dict:
+        if not self._scanned:
+            self._rescan(time.time())
+        with self._lock:
+            oldest = min((used for _, used in self._index.values()), default=None)
+            return {
+                "directory":     self.directory,
+                "files":         len(self._index),
+                "bytes":         self._bytes,
+                "max_bytes":     self.max_bytes,
+                "ttl_hours":     self.ttl_seconds / 3600,
+                "oldest_use_hours": round((time.time() - oldest) / 3600, 1) if oldest else None,
+                "evictions":     self.evictions,
+                "expirations":   self.expirations,
+                "last_gc":       self.last_gc,
+            }
+
+
+def disk_cache_for(directory: str) -> DiskCache:
+    """The shared DiskCache of `directory` (created with the configured limits)."""
+    with _registry_lock:
+        cache = _registry.get(directory)
+        if cache is None:
+            cache = DiskCache(
+                directory,
+                max_bytes=DISK_CACHE_MAX_MB * 1024 * 1024,
+                ttl_hours=DISK_CACHE_TTL_HOURS,
+            )
+            _registry[directory] = cache
+        return cache
+
+
+def model_disk_caches() -> list:
+    """The DiskCaches of the forecaster and classifier model directories."""
+    from . import arima_model, disease_model
+    return [arima_model.disk_cache, disease_model.disk_cache]
+
+
+_registry = {}
+_registry_lock = threading.Lock()
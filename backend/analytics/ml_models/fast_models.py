@@ -0,0 +1,144 @@
+"""
+Vectorised fast-tier forecasters.
+
+Every function here takes a (series × days) matrix of daily counts and
+forecasts all rows at once with NumPy array operations — no per-series
+model objects, no optimiser.  They cover departments that have too little
+history for SARIMA and, when a quick backtest shows they are as accurate,
+departments that would otherwise pay for a full SARIMA fit.
+
+Methods
+-------
+seasonal_naive   : repeat the last observed week
+weekly_profile   : recent level × average day-of-week profile
+holt_winters     : additive Holt-Winters (damped trend, m=7) with fixed
+                   smoothing constants, filtered across all rows in step
+fourier          : trend + weekly/annual harmonic regression, every row
+                   solved by one batched least-squares call (fourier_model)
+"""
+import numpy as np
+
+from . import fourier_model
+from .seasonal import SEASONAL_PERIOD, as_matrix, season_index, seasonal_naive
+
+
+# Trailing days used for the level / profile estimate (whole weeks)
+PROFILE_WINDOW_DAYS = 28
+
+# Fixed Holt-Winters smoothing constants (level, trend, season) and damping
+HW_ALPHA = 0.3
+HW_BETA  = 0.05
+HW_GAMMA = 0.2
+HW_PHI   = 0.9
+
+# Days held out when backtesting the methods against each other
+BACKTEST_DAYS = 14
+
+FAST_METHODS = ("seasonal_naive", "weekly_profile", "holt_winters", "fourier")
+
+
+# ---------------------------------------------------------------------------
+# Methods (seasonal_naive: see seasonal.py)
+# ---------------------------------------------------------------------------
+
+def weekly_profile(Y, steps: int, m: int = SEASONAL_PERIOD,
+                   window: int = PROFILE_WINDOW_DAYS) -> np.ndarray:
+    """Recent mean level multiplied by the average day-of-week profile."""
+    Y = as_matrix(Y)
+    n_days = Y.shape[1]
+    window = min(window - window % m, n_days - n_days % m) or min(m, n_days)
+
+    recent = Y[:, -window:]
+    level  = recent.mean(axis=1)
+
+    positions = (n_days - window + np.arange(window)) % m
+    profile = np.zeros((Y.shape[0], m))
+    for p in range(m):
+        cols = positions == p
+        if cols.any():
+            profile[:, p] = recent[:, cols].mean(axis=1)
+
+    safe_level = np.where(level > 0, level, 1.0)
+    factors = np.where(level[:, None] > 0, profile / safe_level[:, None], 1.0)
+    return level[:, None] * factors[:, season_index(n_days, steps, m)]
+
+
+def holt_winters(Y, steps: int, m: int = SEASONAL_PERIOD,
+                 alpha: float = HW_ALPHA, beta: float = HW_BETA,
+                 gamma: float = HW_GAMMA, phi: float = HW_PHI) -> np.ndarray:
+    """
+    Additive damped-trend Holt-Winters.  The recursion runs over time once,
+    updating the level/trend/season of every row simultaneously.
+    Needs at least two full cycles; shorter input falls back to seasonal naive.
+    """
+    Y = as_matrix(Y)
+    n_series, n_days = Y.shape
+    if n_days < 2 * m:
+        return seasonal_naive(Y, steps, m)
+
+    first, second = Y[:, :m], Y[:, m:2 * m]
+    level  = first.mean(axis=1)
+    trend  = (second.mean(axis=1) - level) / m
+    season = first - level[:, None]          # indexed by cycle position t % m
+
+    for t in range(m, n_days):
+        s_idx = t % m
+        y = Y[:, t]
+        prev_level = level
+        level  = alpha * (y - season[:, s_idx]) + (1 - alpha) * (prev_level + phi * trend)
+        trend  = beta * (level - prev_level) + (1 - beta) * phi * trend
+        season[:, s_idx] = gamma * (y - level) + (1 - gamma) * season[:, s_idx]
+
+    damping = np.cumsum(phi ** np.arange(1, steps + 1))
+    return (
+        level[:, None]
+        + trend[:, None] * damping[None, :]
+        + season[:, season_index(n_days, steps, m)]
+    )
+
+
+_METHOD_FUNCS = {
+    "seasonal_naive": seasonal_naive,
+    "weekly_profile": weekly_profile,
+    "holt_winters":   holt_winters,
+    "fourier":        fourier_model.forecast,
+}
+
+
+# ---------------------------------------------------------------------------
+# Backtest-based selection
+# ---------------------------------------------------------------------------
+
+def backtest(Y, holdout: int = BACKTEST_DAYS) -> dict:
+    """
+    Fit every method on all but the last `holdout` days and score it on them.
+    Returns method → per-row MAE array.
+    """
+    Y = as_matrix(Y)
+    train, test = Y[:, :-holdout], Y[:, -holdout:]
+    return {
+        name: np.abs(np.maximum(func(train, holdout), 0) - test).mean(axis=1)
+        for name, func in _METHOD_FUNCS.items()
+    }
+
+
+def select_and_forecast(Y, steps: int, holdout: int = BACKTEST_DAYS) -> tuple:
+    """
+    Pick the best fast method per row by backtest MAE and forecast with it.
+
+    Returns (forecasts, methods, maes):
+        forecasts : (rows × steps) array, clipped at 0
+        methods   : list of the chosen method name per row
+        maes      : (rows,) backtest MAE of the chosen method
+    """
+    Y = as_matrix(Y)
+    scores = backtest(Y, holdout)
+    names  = list(scores)
+    table  = np.vstack([scores[name] for name in names])      # methods × rows
+    best   = table.argmin(axis=0)
+
+    all_forecasts = np.stack([_METHOD_FUNCS[name](Y, steps) for name in names])
+    rows = np.arange(Y.shape[0])
+    forecasts = np.maximum(all_forecasts[best, rows], 0)
+
+    return forecasts, [names[i] for i in best], table[best, rows]
@@ -0,0 +1,103 @@
+"""
+Cheap fingerprints of the data a model is trained on.
+
+Cached models are content-addressed: a bundle records the fingerprint of
+its training input, and it is served exactly while the current input has
+the same fingerprint (and the engine's code version is unchanged).  When
+the data changes the model is updated or refit, whatever its age.
+
+A fingerprint is (row count, most recent day with visits, checksum of the
+daily counts).  It is computed from data that is already aggregated: the
+forecaster's daily series, which it has loaded anyway, or one grouped
+query on VisitDailyRollup for the classifier.  Either way the cost is a
+small fraction of a fit (see `benchmark_analytics`, operations
+*_fingerprint).
+
+The current day is still filling up with visits, so it is provisional and
+is left out of the fingerprint.  Otherwise every new visit would force a
+refit.  A day counts as changed data once it is complete.
+"""
+import hashlib
+from datetime import timedelta
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+from django.db.models import Sum
+from django.utils import timezone
+
+from analytics.models import VisitDailyRollup
+
+
+# Trailing days of a window that are still being recorded (excluded)
+PROVISIONAL_DAYS = 1
+
+
+class Fingerprint(NamedTuple):
+    rows:      int        # visits in the window
+    last_date: str        # most recent day with visits (ISO), or ""
+    checksum:  str        # digest of the daily counts and their dates
+
+    @property
+    def digest(self) -> str:
+        """The fingerprint as one short string (a model's data hash)."""
+        return hashlib.blake2b(
+            f"{self.rows}|{self.last_date}|{self.checksum}".encode(), digest_size=16
+        ).hexdigest()
+
+
+def settled(series: pd.Series, provisional_days: int = PROVISIONAL_DAYS) -> pd.Series:
+    """A daily series ending with the current day, without its provisional days."""
+    return series.iloc[:-provisional_days] if provisional_days else series
+
+
+def of_series(series: pd.Series, provisional_days: int = PROVISIONAL_DAYS) -> Fingerprint:
+    """
+    Fingerprint of a gap-free daily count series ending with the current day.
+    provisional_days=0 for a series of complete days (e.g. a backtest window).
+    """
+    complete = settled(series, provisional_days)
+    counts   = np.ascontiguousarray(complete.to_numpy(dtype=float))
+    active   = complete.index[counts > 0]
+
+    checksum = hashlib.blake2b(digest_size=16)
+    checksum.update(np.ascontiguousarray(complete.index.asi8).tobytes())
+    checksum.update(counts.tobytes())
+    return Fingerprint(
+        rows=int(counts.sum()),
+        last_date=active[-1].date().isoformat() if len(active) else "",
+        checksum=checksum.hexdigest(),
+    )
+
+
+def for_visits(hospital_id, days: int, department_id=None) -> Fingerprint:
+    """
+    Fingerprint of a hospital's visits over the last `days` days (optionally
+    one department's), from per-day, per-diagnosis rollup counts — so a
+    re-labelled diagnosis changes it as well as a new or deleted visit.
+    """
+    today = timezone.localdate()
+    rows = VisitDailyRollup.objects.filter(
+        hospital_id=hospital_id,
+        day__range=(today - timedelta(days=days), today - timedelta(days=PROVISIONAL_DAYS)),
+    )
+    if department_id and str(department_id) != "all":
+        rows = rows.filter(department_id=department_id)
+    rows = (
+        rows.values("day", "diagnosis")
+        .annotate(visits=Sum("visit_count"))
+        .order_by("day", "diagnosis")
+        .values_list("day", "diagnosis", "visits")
+    )
+
+    checksum = hashlib.blake2b(digest_size=16)
+    total, last_day = 0, None
+    for day, diagnosis, visits in rows:
+        checksum.update(f"{day.isoformat()}|{diagnosis}|{visits}\n".encode())
+        total += visits
+        last_day = day if visits else last_day
+    return Fingerprint(
+        rows=int(total),
+        last_date=last_day.isoformat() if last_day else "",
+        checksum=checksum.hexdigest(),
+    )
@@ -0,0 +1,101 @@
+"""
+Fourier-regression forecaster: trend + weekly (+ annual) harmonics.
+
+Each series is modelled as a linear regression on a shared design matrix
+
+    y_t = b0 + b1·t + Σ_k [c_k sin(2πkt/7)   + d_k cos(2πkt/7)]
+                    + Σ_j [e_j sin(2πjt/365.25) + f_j cos(2πjt/365.25)]
+
+All series share the design matrix.  One numpy.linalg.lstsq call solves
+every department at once: the (days × departments) count matrix is the
+right-hand side.  The cost is one small SVD plus a matrix product, so
+hundreds of departments take milliseconds.  There is no per-series
+optimiser as in SARIMA.
+
+The annual terms are included only when the history covers at least
+ANNUAL_MIN_DAYS, since shorter windows cannot tell them from the trend.
+The forecaster therefore hands the fast tier a longer history than its
+SARIMA models (arima_model.FAST_TIER_HISTORY_DAYS) once a hospital has
+that much data.
+The trend is damped when extrapolated (like holt_winters in fast_models),
+so a short-window slope does not run away over long horizons.
+
+The engine competes in the fast tier as the "fourier" method (see
+fast_models.select_and_forecast).  There the backtest picks it per series
+wherever it beats the other fast methods.
+"""
+import numpy as np
+
+from .seasonal import SEASONAL_PERIOD, as_matrix, seasonal_naive
+
+
+ANNUAL_PERIOD = 365.25
+
+# Harmonics per cycle (3 weekly harmonics can represent any day-of-week profile)
+WEEKLY_HARMONICS = 3
+ANNUAL_HARMONICS = 2
+
+# History needed before annual terms are fitted (days)
+ANNUAL_MIN_DAYS = 365
+
+# Per-day damping of the extrapolated trend (cf. fast_models.HW_PHI)
+TREND_DAMPING = 0.98
+
+
+def _fourier_columns(t: np.ndarray, period: float, harmonics: int) -> list:
+    cols = []
+    for k in range(1, harmonics + 1):
+        angle = 2 * np.pi * k * t / period
+        cols += [np.sin(angle), np.cos(angle)]
+    return cols
+
+
+def design_matrix(t: np.ndarray, annual: bool, trend: np.ndarray = None) -> np.ndarray:
+    """
+    Regressors for day indices `t`.  `trend` overrides the trend column
+    (the damped extrapolation when forecasting); it defaults to t itself.
+    """
+    t = np.asarray(t, dtype=float)
+    cols = [np.ones_like(t), t if trend is None else trend]
+    cols += _fourier_columns(t, SEASONAL_PERIOD, WEEKLY_HARMONICS)
+    if annual:
+        cols += _fourier_columns(t, ANNUAL_PERIOD, ANNUAL_HARMONICS)
+    return np.column_stack(cols)
+
+
+def fit(Y) -> tuple:
+    """
+    Least-squares coefficients for every row of the (series × days) matrix Y.
+    Returns (coefficients, annual) — coefficients has shape (regressors × series).
+    """
+    Y = as_matrix(Y)
+    n_days = Y.shape[1]
+    annual = n_days >= ANNUAL_MIN_DAYS
+    X = design_matrix(np.arange(n_days), annual)
+    coefficients, *_ = np.linalg.lstsq(X, Y.T, rcond=None)
+    return coefficients, annual
+
+
+def min_days(annual: bool = False) -> int:
+    """Shortest history with more observations than regressors, plus a week."""
+    regressors = 2 + 2 * WEEKLY_HARMONICS + (2 * ANNUAL_HARMONICS if annual else 0)
+    return regressors + SEASONAL_PERIOD
+
+
+def forecast(Y, steps: int) -> np.ndarray:
+    """
+    Forecast `steps` days for every row of Y at once.  Returns a
+    (series × steps) array (not clipped).  Input shorter than min_days()
+    falls back to the seasonal naive forecast.
+    """
+    Y = as_matrix(Y)
+    n_days = Y.shape[1]
+    if n_days < min_days():
+        return seasonal_naive(Y, steps)
+
+    coefficients, annual = fit(Y)
+
+    future = n_days + np.arange(steps)
+    damped = (n_days - 1) + np.cumsum(TREND_DAMPING ** np.arange(1, steps + 1))
+    X_future = design_matrix(future, annual, trend=damped)
+    return (X_future @ coefficients).T
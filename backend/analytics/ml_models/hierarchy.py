@@ -0,0 +1,120 @@
+"""
+Forecast reconciliation for the two-level hospital → department hierarchy.
+
+Independent hospital and department forecasts generally do not add up.
+The functions here turn base forecasts into a coherent set (department
+rows summing exactly to the hospital total) with plain NumPy algebra.
+
+Shapes follow the visit matrix used by the forecaster: bottom-level
+series are rows, days are columns.  The hierarchy's summing matrix is
+
+    S = [ 1 1 … 1 ]     (total)
+        [    I    ]     (one row per bottom series)
+
+Methods
+-------
+bottom_up : sum the bottom-level forecasts; only the total changes
+top_down  : split one total forecast by historical proportions — needs
+            no bottom-level models at all
+mint      : MinT (minimum trace) with a shrunk residual covariance —
+            y_tilde = S (S' W⁻¹ S)⁻¹ S' W⁻¹ y_hat over all levels
+"""
+import numpy as np
+
+
+# Trailing days whose visit shares define the top-down proportions
+PROPORTION_WINDOW_DAYS = 28
+
+
+def summing_matrix(n_bottom: int) -> np.ndarray:
+    """(n_bottom + 1) × n_bottom matrix mapping bottom series to all levels."""
+    return np.vstack([np.ones((1, n_bottom)), np.eye(n_bottom)])
+
+
+def bottom_up(bottom_forecasts) -> tuple:
+    """Returns (total, bottom) with total = column sums of bottom."""
+    bottom = np.asarray(bottom_forecasts, dtype=float)
+    return bottom.sum(axis=0), bottom
+
+
+def historical_proportions(Y, window: int = PROPORTION_WINDOW_DAYS) -> np.ndarray:
+    """
+    Share of the total contributed by each bottom row over the trailing
+    `window` days (proportions of the historical averages).  Rows share
+    equally when there is no recent history at all.
+    """
+    Y = np.asarray(Y, dtype=float)
+    recent = Y[:, -window:].sum(axis=1)
+    total  = recent.sum()
+    if total <= 0:
+        return np.full(Y.shape[0], 1.0 / Y.shape[0])
+    return recent / total
+
+
+def top_down(total_forecast, proportions) -> tuple:
+    """Returns (total, bottom) with bottom = proportions ⊗ total."""
+    total = np.asarray(total_forecast, dtype=float)
+    return total, np.outer(proportions, total)
+
+
+def shrunk_covariance(residuals) -> np.ndarray:
+    """
+    Covariance of the (levels × days) residual matrix, shrunk towards its
+    diagonal with the Schäfer–Strimmer intensity.  Keeps W well
+    conditioned when there are many series and only a few weeks of history.
+    """
+    E = np.asarray(residuals, dtype=float)
+    E = E - E.mean(axis=1, keepdims=True)
+    n_series, n_obs = E.shape
+
+    sample = E @ E.T / n_obs
+    variances = np.diag(sample).copy()
+    if n_series == 1 or n_obs < 2:
+        return np.diag(np.maximum(variances, 1e-9))
+
+    std = np.sqrt(np.maximum(variances, 1e-12))
+    Z = E / std[:, None]
+    corr = Z @ Z.T / n_obs
+
+    # Variance of each sample correlation, estimated from the standardised
+    # residuals: Σ_t (z_it z_jt − r_ij)² = Σ_t z_it² z_jt² − T r_ij², so only
+    # n × n matrices are ever formed
+    Z2 = Z ** 2
+    var_corr = n_obs / (n_obs - 1) ** 3 * (Z2 @ Z2.T - n_obs * corr ** 2)
+
+    off = ~np.eye(n_series, dtype=bool)
+    denom = (corr[off] ** 2).sum()
+    intensity = 1.0 if denom == 0 else float(np.clip(var_corr[off].sum() / denom, 0.0, 1.0))
+
+    shrunk = (1 - intensity) * sample
+    shrunk[np.diag_indices(n_series)] = variances
+    return shrunk + np.eye(n_series) * 1e-9
+
+
+def mint(total_forecast, bottom_forecasts, residuals) -> tuple:
+    """
+    MinT-shrink reconciliation of base forecasts at both levels.
+
+    residuals : (bottom rows + 1) × days in-sample errors, total first,
+                in the same row order as [total; bottom].
+    Returns (total, bottom) with total = column sums of bottom.
+    """
+    bottom = np.asarray(bottom_forecasts, dtype=float)
+    y_hat  = np.vstack([np.asarray(total_forecast, dtype=float)[None, :], bottom])
+    S      = summing_matrix(bottom.shape[0])
+
+    W_inv = np.linalg.pinv(shrunk_covariance(residuals))
+    G = np.linalg.solve(S.T @ W_inv @ S, S.T @ W_inv)     # bottom × levels
+
+    reconciled_bottom = G @ y_hat
+    return reconciled_bottom.sum(axis=0), reconciled_bottom
+
+
+def seasonal_naive_residuals(Y, m: int = 7) -> np.ndarray:
+    """
+    In-sample one-step seasonal-naive errors (y_t − y_{t−m}) of every row:
+    a cheap, model-independent proxy for the base forecasts' error scale
+    and cross-series correlation.
+    """
+    Y = np.asarray(Y, dtype=float)
+    return Y[:, m:] - Y[:, :-m]
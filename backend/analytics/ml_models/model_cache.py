@@ -0,0 +1,157 @@
+"""
+Process-wide in-memory cache of model bundles loaded from disk.
+
+Both forecasters and classifiers keep their fitted models as joblib files;
+unpickling them (a 150-tree RandomForest in particular) is far more
+expensive than the lookup that follows.  This LRU keeps recently used
+bundles in memory, keyed by (path, mtime) so a rewritten file is never
+served stale, and evicts by approximate byte size.
+
+With `gunicorn --preload` and ANALYTICS_PRELOAD_MODELS=1 the master
+process warms the cache before forking (see sih_backend/wsgi.py), so the
+loaded models start out shared copy-on-write between workers.
+"""
+import glob
+import os
+import threading
+from collections import OrderedDict
+
+import joblib
+
+
+# Upper bound on the (approximate) bytes of bundles kept in memory per process
+MODEL_MEMORY_CACHE_MB = float(os.getenv("ANALYTICS_MODEL_CACHE_MB", "256"))
+
+
+class ModelLRUCache:
+    """
+    Size-bounded LRU of loaded model bundles.
+
+    An entry's size is the size of the file it was loaded from — a cheap
+    and stable stand-in for its in-memory footprint.  Entries larger than
+    the whole budget are returned but never cached.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes   = int(max_bytes)
+        self._entries    = OrderedDict()     # (path, mtime_ns) → (value, nbytes)
+        self._bytes      = 0
+        self._lock       = threading.Lock()
+        self.hits        = 0
+        self.misses      = 0
+        self.evictions   = 0
+
+    def load(self, path: str, loader=joblib.load):
+        """
+        Return the bundle stored at `path`, from memory when the file has not
+        changed since it was cached.  Returns None if the file is missing.
+        Loader errors propagate to the caller.
+        """
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+
+        key = (path, st.st_mtime_ns)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        value = loader(path)
+        self._put(key, value, st.st_size)
+        return value
+
+    def store(self, path: str, value):
+        """Cache a bundle that was just written to `path` (saves a reload)."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        self._put((path, st.st_mtime_ns), value, st.st_size)
+
+    def _put(self, key, value, nbytes: int):
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            # Drop older versions of the same file
+            for old_key in [k for k in self._entries if k[0] == key[0] and k != key]:
+                self._bytes -= self._entries.pop(old_key)[1]
+
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, nbytes)
+            self._bytes += nbytes
+
+            while self._bytes > self.max_bytes and self._entries:
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self._bytes -= evicted_bytes
+                self.evictions += 1
+
+    def discard(self, path: str):
+        """Drop every cached version of `path` (its file was deleted)."""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == path]:
+                self._bytes -= self._entries.pop(key)[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries":   len(self._entries),
+                "bytes":     self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits":      self.hits,
+                "misses":    self.misses,
+                "evictions": self.evictions,
+                "hit_rate":  round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+    def warm(self, directories) -> int:
+        """Load every bundle in `directories` (most recently written first)."""
+        paths = [p for d in directories for p in glob.glob(os.path.join(d, "*.pkl"))]
+        paths.sort(key=lambda p: os.path.getmtime(p), reverse=True)
+
+        loaded = 0
+        for path in paths:
+            if self._bytes >= self.max_bytes:
+                break
+            try:
+                self.load(path)
+                loaded += 1
+            except Exception as e:
+                print(f"[ModelLRUCache] Skipping unreadable bundle {path}: {e}")
+        return loaded
+
+
+def atomic_dump(value, path: str):
+    """
+    joblib.dump to a temporary file in the same directory, then rename it
+    over `path` — readers in other threads/workers never see a partial file.
+    """
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        joblib.dump(value, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+# Shared by every forecaster/classifier in this process
+model_cache = ModelLRUCache(max_bytes=MODEL_MEMORY_CACHE_MB * 1024 * 1024)
+
+
+def warm_model_cache() -> int:
+    """Preload all on-disk forecaster and classifier bundles into memory."""
+    from . import arima_model, disease_model
+    return model_cache.warm([arima_model.MODEL_CACHE_DIR, disease_model.MODEL_CACHE_DIR])
@@ -0,0 +1,361 @@
+"""
+Shared model store: fitted bundles reused across workers, nodes and restarts.
+
+The on-disk caches in MODEL_CACHE_DIR are private to one node and are
+lost when the node restarts.  With a shared store configured, every
+bundle written to the local cache is also published to the store, and a
+node that has no usable local bundle pulls one from the store before it
+fits anything.  That way a model fitted once serves the whole deployment.
+
+Bundles are addressed by ModelKey(hospital, series key, data hash, code
+version):
+    series key    the local cache name of the series, e.g. "dept_<uuid>"
+    data hash     fingerprint digest of the training input (see fingerprint.py)
+    code version  the engine's bundle/fitting version.  Bump it and older
+                  bundles are never served.
+A lookup prefers the exact key (a peer fitted the same data) and
+otherwise falls back to the series' most recent bundle of the same code
+version.  The callers then apply their usual age rules to that bundle.
+
+Backends (ANALYTICS_MODEL_STORE):
+    none        node-local caches only (default)
+    filesystem  a directory shared by the nodes (NFS, a mounted volume),
+                ANALYTICS_MODEL_STORE_PATH
+    database    the analytics_model_blobs table (ModelBlob)
+    s3          an S3-compatible bucket, e.g. MinIO as a local stand-in;
+                ANALYTICS_MODEL_STORE_BUCKET, ANALYTICS_MODEL_STORE_ENDPOINT
+                and the usual AWS_* credentials (requires boto3)
+"""
+import io
+import multiprocessing
+import os
+import threading
+from typing import NamedTuple
+
+import joblib
+
+
+# Which backend holds the shared models (see module docstring)
+MODEL_STORE_BACKEND = os.getenv("ANALYTICS_MODEL_STORE", "none").lower()
+
+# Root directory of the filesystem backend
+MODEL_STORE_PATH = os.getenv("ANALYTICS_MODEL_STORE_PATH", "/tmp/smartaid_model_store")
+
+# Bucket, endpoint (empty = AWS) and key prefix of the s3 backend
+MODEL_STORE_BUCKET   = os.getenv("ANALYTICS_MODEL_STORE_BUCKET", "smartaid-models")
+MODEL_STORE_ENDPOINT = os.getenv("ANALYTICS_MODEL_STORE_ENDPOINT") or None
+MODEL_STORE_PREFIX   = os.getenv("ANALYTICS_MODEL_STORE_PREFIX", "models/")
+
+# Bundles kept per series; older data versions are pruned on publish
+MAX_VERSIONS_PER_SERIES = 2
+
+
+class ModelKey(NamedTuple):
+    hospital_id:  str
+    series_key:   str
+    data_hash:    str
+    code_version: str
+
+    @property
+    def series_prefix(self) -> str:
+        return f"{self.hospital_id}/{self.series_key}/"
+
+    @property
+    def name(self) -> str:
+        return f"{self.series_prefix}{self.code_version}/{self.data_hash}.pkl"
+
+
+def key_for_path(path: str, data_hash: str, code_version: str) -> ModelKey:
+    """
+    ModelKey of the bundle cached locally at `path`.  Cache files are named
+    <engine>_<hospital id>_<series key>.pkl (hospital ids are UUIDs, which
+    contain no underscore).
+    """
+    name = os.path.basename(path)[:-len(".pkl")]
+    _, hospital_id, series_key = name.split("_", 2)
+    return ModelKey(str(hospital_id), series_key, data_hash or "unknown", code_version)
+
+
+# ---------------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------------
+
+class ModelStore:
+    """Byte-level storage of bundles; load() and save() handle serialisation."""
+
+    backend = "base"
+
+    def get(self, key: ModelKey):
+        """The stored bytes of `key`, or None."""
+        raise NotImplementedError
+
+    def put(self, key: ModelKey, payload: bytes):
+        raise NotImplementedError
+
+    def latest_key(self, key: ModelKey):
+        """The most recently stored key of key's series and code version, or None."""
+        raise NotImplementedError
+
+    def prune(self, key: ModelKey):
+        """Drop the series' other code versions and all but its newest data versions."""
+        raise NotImplementedError
+
+    def load(self, key: ModelKey, latest: bool = True):
+        """The bundle stored at `key`, else (with `latest`) the series' latest one, else None."""
+        payload = self.get(key)
+        if payload is None and latest:
+            latest = self.latest_key(key)
+            payload = self.get(latest) if latest is not None else None
+        if payload is None:
+            return None
+        return joblib.load(io.BytesIO(payload))
+
+    def save(self, key: ModelKey, value):
+        buffer = io.BytesIO()
+        joblib.dump(value, buffer)
+        self.put(key, buffer.getvalue())
+        self.prune(key)
+
+
+class FileSystemModelStore(ModelStore):
+    """Bundles as files under a directory shared by the nodes."""
+
+    backend = "filesystem"
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, key: ModelKey) -> str:
+        return os.path.join(self.root, *key.name.split("/"))
+
+    def get(self, key):
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, key, payload):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _versions(self, key):
+        """(mtime, path) of the stored data versions of key's series and code version."""
+        directory = os.path.dirname(self._path(key))
+        try:
+            entries = list(os.scandir(directory))
+        except FileNotFoundError:
+            return []
+        return sorted(
+            ((e.stat().st_mtime, e.path) for e in entries if e.name.endswith(".pkl")),
+            reverse=True,
+        )
+
+    def latest_key(self, key):
+        versions = self._versions(key)
+        if not versions:
+            return None
+        return key._replace(data_hash=os.path.basename(versions[0][1])[:-len(".pkl")])
+
+    def prune(self, key):
+        series_dir = os.path.dirname(os.path.dirname(self._path(key)))
+        for entry in os.scandir(series_dir):
+            if entry.name != key.code_version:
+                _remove_tree(entry.path)
+        for _, path in self._versions(key)[MAX_VERSIONS_PER_SERIES:]:
+            if path != self._path(key):
+                _remove_file(path)
+
+
+class DatabaseModelStore(ModelStore):
+    """Bundles as rows of the analytics_model_blobs table."""
+
+    backend = "database"
+
+    def _series(self, key):
+        from analytics.models import ModelBlob
+        return ModelBlob.objects.filter(hospital_id=key.hospital_id, series_key=key.series_key)
+
+    def get(self, key):
+        payload = (
+            self._series(key)
+            .filter(code_version=key.code_version, data_hash=key.data_hash)
+            .values_list("payload", flat=True)
+            .first()
+        )
+        return bytes(payload) if payload is not None else None
+
+    def put(self, key, payload):
+        from django.db import IntegrityError
+        try:
+            self._series(key).update_or_create(
+                hospital_id=key.hospital_id, series_key=key.series_key,
+                code_version=key.code_version, data_hash=key.data_hash,
+                defaults={"payload": payload, "size": len(payload)},
+            )
+        except IntegrityError:
+            pass                 # a concurrent writer stored the same data version
+
+    def latest_key(self, key):
+        data_hash = (
+            self._series(key)
+            .filter(code_version=key.code_version)
+            .order_by("-updated_at")
+            .values_list("data_hash", flat=True)
+            .first()
+        )
+        return key._replace(data_hash=data_hash) if data_hash else None
+
+    def prune(self, key):
+        series = self._series(key)
+        series.exclude(code_version=key.code_version).delete()
+        stale = list(
+            series.filter(code_version=key.code_version)
+            .exclude(data_hash=key.data_hash)
+            .order_by("-updated_at")
+            .values_list("id", flat=True)[MAX_VERSIONS_PER_SERIES - 1:]
+        )
+        if stale:
+            series.filter(id__in=stale).delete()
+
+
+class S3ModelStore(ModelStore):
+    """Bundles as objects in an S3-compatible bucket (AWS, MinIO, ...)."""
+
+    backend = "s3"
+
+    def __init__(self, bucket: str, endpoint_url: str = None, prefix: str = ""):
+        import boto3             # optional dependency, only needed for this backend
+        self.client = boto3.client("s3", endpoint_url=endpoint_url)
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def get(self, key):
+        try:
+            obj = self.client.get_object(Bucket=self.bucket, Key=self.prefix + key.name)
+        except self.client.exceptions.NoSuchKey:
+            return None
+        return obj["Body"].read()
+
+    def put(self, key, payload):
+        self.client.put_object(Bucket=self.bucket, Key=self.prefix + key.name, Body=payload)
+
+    def _objects(self, prefix):
+        pages = self.client.get_paginator("list_objects_v2").paginate(
+            Bucket=self.bucket, Prefix=self.prefix + prefix
+        )
+        return [obj for page in pages for obj in page.get("Contents", [])]
+
+    def latest_key(self, key):
+        objects = self._objects(f"{key.series_prefix}{key.code_version}/")
+        if not objects:
+            return None
+        newest = max(objects, key=lambda obj: obj["LastModified"])
+        return key._replace(data_hash=newest["Key"].rsplit("/", 1)[-1][:-len(".pkl")])
+
+    def prune(self, key):
+        current = f"{self.prefix}{key.series_prefix}{key.code_version}/"
+        objects = self._objects(key.series_prefix)
+        stale = [obj["Key"] for obj in objects if not obj["Key"].startswith(current)]
+        versions = sorted(
+            (obj for obj in objects if obj["Key"].startswith(current) and obj["Key"] != self.prefix + key.name),
+            key=lambda obj: obj["LastModified"], reverse=True,
+        )
+        stale += [obj["Key"] for obj in versions[MAX_VERSIONS_PER_SERIES - 1:]]
+        if stale:
+            self.client.delete_objects(
+                Bucket=self.bucket, Delete={"Objects": [{"Key": k} for k in stale]}
+            )
+
+
+def _remove_file(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _remove_tree(directory: str):
+    for entry in os.scandir(directory):
+        _remove_file(entry.path)
+    try:
+        os.rmdir(directory)
+    except OSError:
+        pass                     # a concurrent writer just added a file
+
+
+# ---------------------------------------------------------------------------
+# Shared instance and the helpers used by the engines
+# ---------------------------------------------------------------------------
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_model_store():
+    """The configured ModelStore, or None for node-local caching only."""
+    global _store
+    if MODEL_STORE_BACKEND == "none":
+        return None
+    with _store_lock:
+        if _store is None:
+            if MODEL_STORE_BACKEND == "filesystem":
+                _store = FileSystemModelStore(MODEL_STORE_PATH)
+            elif MODEL_STORE_BACKEND == "database":
+                _store = DatabaseModelStore()
+            elif MODEL_STORE_BACKEND == "s3":
+                _store = S3ModelStore(MODEL_STORE_BUCKET, MODEL_STORE_ENDPOINT, MODEL_STORE_PREFIX)
+            else:
+                raise ValueError(
+                    f"Unknown ANALYTICS_MODEL_STORE '{MODEL_STORE_BACKEND}'. "
+                    f"Use none, filesystem, database or s3."
+                )
+        return _store
+
+
+def _in_forked_worker() -> bool:
+    # A forked fit worker inherits the parent's DB connection (and S3 client),
+    # which must not be used from two processes
+    return multiprocessing.parent_process() is not None
+
+
+def fetch(key: ModelKey, latest: bool = True):
+    """
+    The shared bundle for `key` (or its series' latest), or None — never
+    raises.  Returns None in forked fit workers: the parent process pulls
+    their bundles into the local cache before handing out the fits.
+    """
+    store = get_model_store()
+    if store is None or _in_forked_worker():
+        return None
+    try:
+        return store.load(key, latest)
+    except Exception as e:
+        print(f"[ModelStore] Warning: could not fetch {key.name}: {e}")
+        return None
+
+
+def publish(key: ModelKey, bundle) -> bool:
+    """
+    Store `bundle` under `key` for the other nodes.  Skipped in forked fit
+    workers (their inherited DB connection must not be used) — the parent
+    process publishes their results once they are collected.  Never raises.
+    """
+    store = get_model_store()
+    if store is None or _in_forked_worker():
+        return False
+    try:
+        store.save(key, bundle)
+        return True
+    except Exception as e:
+        print(f"[ModelStore] Warning: could not publish {key.name}: {e}")
+        return False
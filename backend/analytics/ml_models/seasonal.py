@@ -0,0 +1,34 @@
+"""
+Weekly-cycle helpers shared by the vectorised forecasters.
+
+fast_models and fourier_model both build on these (fourier_model falls
+back to seasonal_naive for short input), so they live here rather than in
+either of them.  Every function takes a (series × days) matrix.
+"""
+import numpy as np
+
+
+SEASONAL_PERIOD = 7
+
+
+def as_matrix(Y) -> np.ndarray:
+    """Y as a float (series × days) matrix; a single series becomes one row."""
+    Y = np.asarray(Y, dtype=float)
+    return Y[np.newaxis, :] if Y.ndim == 1 else Y
+
+
+def season_index(n_days: int, steps: int, m: int = SEASONAL_PERIOD) -> np.ndarray:
+    """Position within the cycle of each forecast day (relative to day 0)."""
+    return (n_days + np.arange(steps)) % m
+
+
+def seasonal_naive(Y, steps: int, m: int = SEASONAL_PERIOD) -> np.ndarray:
+    """Every future day repeats the same weekday of the last observed week."""
+    Y = as_matrix(Y)
+    n_days = Y.shape[1]
+    last_cycle = Y[:, -m:]
+    # Column k of last_cycle sits at cycle position (n_days - m + k) % m
+    positions = (n_days - m + np.arange(m)) % m
+    by_position = np.empty_like(last_cycle)
+    by_position[:, positions] = last_cycle
+    return by_position[:, season_index(n_days, steps, m)]
@@ -1,5 +1,6 @@
 from django.db import models
-from hospitals.models import Hospital
+from hospitals.models import Hospital, Department
+from users.models import Profile
 import uuid
 
 class AIAnalytics(models.Model):
@@ -15,3 +16,113 @@ class AIAnalytics(models.Model):
 
     def __str__(self):
         return f"{self.metric_name} - {self.hospital.name}"
+
+
+class VisitDailyRollup(models.Model):
+    """
+    Daily visit counts per (hospital, department, doctor, diagnosis, day).
+
+    Kept in step with clinical.Visit by the signal handlers in
+    analytics/rollup.py and rebuilt from scratch by `rebuild_visit_rollup`.
+    Analytics loaders aggregate these rows instead of scanning raw visits,
+    so their cost grows with the number of days rather than of visits.
+
+    `department` is the doctor's current department (rows follow a doctor
+    who moves; see analytics/rollup.py).
+    Concurrent first writes can leave two rows for the same key, so readers
+    always Sum(visit_count) rather than reading a single row.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    hospital = models.ForeignKey(Hospital, on_delete=models.CASCADE)
+    department = models.ForeignKey(Department, on_delete=models.SET_NULL, null=True, blank=True)
+    doctor = models.ForeignKey(Profile, on_delete=models.CASCADE, null=True, blank=True)
+    diagnosis = models.TextField()
+    day = models.DateField()
+    visit_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'visit_daily_rollup'
+        indexes = [
+            models.Index(fields=['hospital', 'day'], name='rollup_hospital_day_idx'),
+            models.Index(fields=['doctor', 'day'], name='rollup_doctor_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.diagnosis}: {self.visit_count}"
+
+
+class AnalyticsJob(models.Model):
+    """
+    An analytics computation submitted for asynchronous execution.
+
+    Clients create a job and poll it; a worker pool (see analytics/jobs.py
+    and the run_analytics_jobs command) claims pending jobs, runs them and
+    stores the JSON result or the error.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_SUCCEEDED, 'Succeeded'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    hospital = models.ForeignKey(Hospital, on_delete=models.CASCADE)
+    kind = models.CharField(max_length=50)
+    params = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING, db_index=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'analytics_jobs'
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='analytics_job_queue_idx'),
+        ]
+
+    @property
+    def is_finished(self):
+        return self.status in (self.STATUS_SUCCEEDED, self.STATUS_FAILED)
+
+    def __str__(self):
+        return f"{self.kind} ({self.status}) - {self.hospital_id}"
+
+
+class ModelBlob(models.Model):
+    """
+    A fitted model bundle shared by every app instance (the "database"
+    backend of analytics/ml_models/model_store.py).
+
+    Addressed by (hospital, series key, data hash, code version); the
+    joblib-serialised bundle is stored as-is in `payload`.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    hospital = models.ForeignKey(Hospital, on_delete=models.CASCADE)
+    series_key = models.CharField(max_length=255)
+    data_hash = models.CharField(max_length=64)
+    code_version = models.CharField(max_length=50)
+    payload = models.BinaryField()
+    size = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'analytics_model_blobs'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['hospital', 'series_key', 'code_version', 'data_hash'],
+                name='model_blob_address_uniq',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['hospital', 'series_key', 'updated_at'], name='model_blob_series_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.series_key}@{self.data_hash[:8]} ({self.code_version}) - {self.hospital_id}"
@@ -0,0 +1,204 @@
+"""
+Maintenance of the VisitDailyRollup table.
+
+Every Visit save/delete adjusts the matching daily counter with an F()
+update inside a transaction (so it commits or rolls back with the visit
+write when the caller runs in one).  Writes that bypass model signals —
+QuerySet.update(), bulk_create(), raw SQL — must be followed by
+rebuild_rollup() for the affected hospitals, as must bulk deletes run
+under suspended(), which skips the per-visit updates.
+
+Visits count towards their doctor's current department, as in
+rebuild_rollup() and the raw-visit queries: a doctor who changes
+department takes their rollup rows along (move_doctor_rows).
+"""
+import threading
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from clinical.models import Visit
+from users.models import Profile
+from .models import VisitDailyRollup
+
+# Rows inserted per bulk_create batch during a rebuild
+REBUILD_BATCH_SIZE = 5000
+
+_suspension = threading.local()
+
+
+@contextmanager
+def suspended():
+    """
+    Skip the signal-driven counter updates in this thread, e.g. while
+    deleting many visits.  Call rebuild_rollup() afterwards.
+    """
+    previous = getattr(_suspension, "active", False)
+    _suspension.active = True
+    try:
+        yield
+    finally:
+        _suspension.active = previous
+
+
+def _is_suspended() -> bool:
+    return getattr(_suspension, "active", False)
+
+
+def _visit_key(visit) -> dict:
+    """Rollup key of a visit (department: its doctor's current one)."""
+    department_id = (
+        Profile.objects.filter(pk=visit.doctor_id)
+        .values_list("department_id", flat=True)
+        .first()
+    )
+    return {
+        "hospital_id":   visit.hospital_id,
+        "department_id": department_id,
+        "doctor_id":     visit.doctor_id,
+        "diagnosis":     visit.diagnosis,
+        "day":           timezone.localdate(visit.visit_date),
+    }
+
+
+def _increment(key: dict):
+    with transaction.atomic():
+        updated = VisitDailyRollup.objects.filter(**key).update(
+            visit_count=F("visit_count") + 1
+        )
+        if not updated:
+            VisitDailyRollup.objects.create(**key, visit_count=1)
+
+
+def _decrement(key: dict):
+    """
+    Take one visit off the counter for `key`.  The department is only a
+    preference: a department change written without signals (e.g. a
+    QuerySet.update() of profiles) leaves the doctor's rows under the old
+    department, so any department's row for the same doctor/diagnosis/day works.
+    """
+    loose = {k: v for k, v in key.items() if k != "department_id"}
+    with transaction.atomic():
+        candidates = (
+            VisitDailyRollup.objects.select_for_update()
+            .filter(**loose, visit_count__gt=0)
+            .values_list("pk", "department_id")
+        )
+        row_pk = None
+        for pk, department_id in candidates:
+            if row_pk is None or department_id == key["department_id"]:
+                row_pk = pk
+        if row_pk is not None:
+            VisitDailyRollup.objects.filter(pk=row_pk).update(
+                visit_count=F("visit_count") - 1
+            )
+
+
+# --- Synchronization Signals ---
+
+@receiver(pre_save, sender=Visit)
+def remember_previous_visit_key(sender, instance, raw=False, **kwargs):
+    """Record the rollup key of a visit about to be edited."""
+    instance._rollup_previous_key = None
+    if raw or instance._state.adding or _is_suspended():
+        return
+    previous = Visit.objects.filter(pk=instance.pk).first()
+    if previous is not None:
+        instance._rollup_previous_key = _visit_key(previous)
+
+
+@receiver(post_save, sender=Visit)
+def count_saved_visit(sender, instance, created, raw=False, **kwargs):
+    if raw or _is_suspended():
+        return
+    key = _visit_key(instance)
+    previous_key = getattr(instance, "_rollup_previous_key", None)
+
+    if created or previous_key is None:
+        _increment(key)
+    elif previous_key != key:
+        with transaction.atomic():
+            _decrement(previous_key)
+            _increment(key)
+
+
+@receiver(post_delete, sender=Visit)
+def uncount_deleted_visit(sender, instance, **kwargs):
+    if _is_suspended():
+        return
+    _decrement(_visit_key(instance))
+
+
+def move_doctor_rows(doctor_id, department_id) -> int:
+    """Re-attribute all of a doctor's rollup rows to `department_id`."""
+    return VisitDailyRollup.objects.filter(doctor_id=doctor_id).exclude(
+        department_id=department_id
+    ).update(department_id=department_id)
+
+
+@receiver(pre_save, sender=Profile)
+def remember_previous_department(sender, instance, raw=False, **kwargs):
+    """Record the department of a profile about to be edited."""
+    instance._rollup_previous_department = None
+    if raw or instance._state.adding or _is_suspended():
+        return
+    instance._rollup_previous_department = (
+        Profile.objects.filter(pk=instance.pk).values_list("department_id", flat=True).first()
+    )
+
+
+@receiver(post_save, sender=Profile)
+def follow_department_change(sender, instance, created, raw=False, **kwargs):
+    if raw or created or _is_suspended():
+        return
+    if getattr(instance, "_rollup_previous_department", None) != instance.department_id:
+        move_doctor_rows(instance.pk, instance.department_id)
+
+
+# --- Rebuild ---
+
+def rebuild_rollup(hospital_ids=None, batch_size: int = REBUILD_BATCH_SIZE) -> int:
+    """
+    Recompute the rollup from clinical.Visit with one grouped query and
+    replace the existing rows, for the given hospitals (default: all).
+    Returns the number of rollup rows written.
+    """
+    visits = Visit.objects.all()
+    rollup = VisitDailyRollup.objects.all()
+    if hospital_ids is not None:
+        visits = visits.filter(hospital_id__in=hospital_ids)
+        rollup = rollup.filter(hospital_id__in=hospital_ids)
+
+    groups = (
+        visits.annotate(day=TruncDate("visit_date"))
+        .values("hospital_id", "doctor__department_id", "doctor_id", "diagnosis", "day")
+        .annotate(visits=Count("id"))
+        .order_by()
+    )
+
+    written = 0
+    with transaction.atomic():
+        rollup.delete()
+        batch = []
+        for group in groups.iterator(chunk_size=batch_size):
+            batch.append(VisitDailyRollup(
+                hospital_id=group["hospital_id"],
+                department_id=group["doctor__department_id"],
+                doctor_id=group["doctor_id"],
+                diagnosis=group["diagnosis"],
+                day=group["day"],
+                visit_count=group["visits"],
+            ))
+            if len(batch) >= batch_size:
+                VisitDailyRollup.objects.bulk_create(batch)
+                written += len(batch)
+                batch = []
+        if batch:
+            VisitDailyRollup.objects.bulk_create(batch)
+            written += len(batch)
+    return written
@@ -1,7 +1,15 @@
 from rest_framework import serializers
-from .models import AIAnalytics
+from .models import AIAnalytics, AnalyticsJob
 
 class AIAnalyticsSerializer(serializers.ModelSerializer):
     class Meta:
         model = AIAnalytics
         fields = '__all__'
+
+
+class AnalyticsJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AnalyticsJob
+        fields = ['id', 'kind', 'params', 'status', 'result', 'error',
+                  'created_at', 'started_at', 'finished_at']
+        read_only_fields = fields
@@ -0,0 +1,306 @@
+"""
+Shared computation and result-caching helpers for the Analytics app.
+Used by the API views and by background jobs (precompute_analytics) so
+that both read and write exactly the same AIAnalytics cache entries.
+"""
+import re
+import uuid
+
+from django.utils import timezone
+
+from hospitals.models import Department
+from .models import AIAnalytics
+from . import ml_models, singleflight, timing
+from .ml_models import MAX_FORECAST_HORIZON
+
+# How long a stored AIAnalytics result is served before it is recomputed (hours)
+ANALYTICS_CACHE_HOURS = 6
+
+# Range values offered by the AI Analytics dashboard
+STANDARD_RANGES = ['7days', '30days', '90days']
+
+# Cache key of the full-horizon forecast every range is sliced from
+FORECAST_CACHE_KEY = "forecast_full"
+
+# Hardcoded range mappings for consistency
+VALID_RANGES = {
+    '7d': 7, '7days': 7,
+    '30d': 30, '30days': 30,
+    '90d': 90, '90days': 90, '3m': 90,
+    '180d': 180, '180days': 180, '6m': 180
+}
+
+# Look-back windows (days) the disease distribution is computed and cached for
+DISEASE_RANGE_DAYS = sorted(set(VALID_RANGES.values()))
+
+
+def parse_range(range_param, default_days=7):
+    """
+    Safely parses range strings into integers.
+    Supports '7days', '30d', '30days', '7', etc.
+    """
+    if not range_param:
+        return default_days
+
+    if range_param in VALID_RANGES:
+        return VALID_RANGES[range_param]
+
+    # Regex-style fallback for mixed strings like "14days"
+    match = re.search(r'(\d+)', str(range_param))
+    if match:
+        try:
+            return int(match.group(1))
+        except ValueError:
+            pass
+
+    return default_days
+
+
+def normalize_range(range_param, default_days=30):
+    """
+    Canonical disease-distribution window: the smallest of DISEASE_RANGE_DAYS
+    covering the requested range (the largest for longer ones).  Like
+    normalize_department, this keeps arbitrary query values from becoming
+    cache keys, lock files or model files.
+    """
+    days = parse_range(range_param, default_days=default_days)
+    return next((d for d in DISEASE_RANGE_DAYS if d >= days), DISEASE_RANGE_DAYS[-1])
+
+
+def get_cached_result(metric_name, hospital_id, validity_hours=ANALYTICS_CACHE_HOURS):
+    cutoff = timezone.now() - timezone.timedelta(hours=validity_hours)
+    return AIAnalytics.objects.filter(
+        hospital_id=hospital_id,
+        metric_name=metric_name,
+        calculated_at__gte=cutoff
+    ).order_by('-calculated_at').first()
+
+
+def set_cached_result(metric_name, hospital_id, value):
+    AIAnalytics.objects.create(
+        hospital_id=hospital_id,
+        metric_name=metric_name,
+        metric_date=timezone.now().date(),
+        value=value
+    )
+
+
+def forecast_cache_key(reconcile=None):
+    if reconcile:
+        return f"{FORECAST_CACHE_KEY}_{reconcile}"
+    return FORECAST_CACHE_KEY
+
+
+def get_latest_result(metric_name, hospital_id):
+    """The most recent stored value regardless of age (stale fallback)."""
+    return AIAnalytics.objects.filter(
+        hospital_id=hospital_id,
+        metric_name=metric_name,
+    ).order_by('-calculated_at').first()
+
+
+def get_or_compute(metric_name, hospital_id, compute, usable=None):
+    """
+    Return the fresh cached value of `metric_name`, or compute and store it.
+
+    Concurrent callers for the same (hospital, metric) — in any thread or
+    worker on this host — share one compute() call (see singleflight.run);
+    a caller that waits too long gets the last stored value instead.
+    Results of None are returned but not cached.  A cached value for which
+    `usable(value)` is false counts as a miss.
+    """
+    def cached():
+        with timing.stage("result_cache"):
+            entry = get_cached_result(metric_name, hospital_id)
+        if entry is None or (usable is not None and not usable(entry.value)):
+            return None
+        timing.count("result_cache_hits")
+        return entry.value
+
+    def stale():
+        entry = get_latest_result(metric_name, hospital_id)
+        return entry.value if entry else None
+
+    return singleflight.run(
+        f"{hospital_id}:{metric_name}",
+        lambda: _compute_and_store(metric_name, hospital_id, compute),
+        cached=cached,
+        stale=stale,
+    )
+
+
+def refresh(metric_name, hospital_id, compute):
+    """Recompute and store `metric_name` now, serialised with get_or_compute."""
+    return singleflight.run(
+        f"{hospital_id}:{metric_name}",
+        lambda: _compute_and_store(metric_name, hospital_id, compute),
+    )
+
+
+def _compute_and_store(metric_name, hospital_id, compute):
+    timing.count("result_cache_misses")
+    value = compute()
+    if value is not None:
+        set_cached_result(metric_name, hospital_id, value)
+    return value
+
+
+def _is_degraded(value):
+    """
+    True for a budgeted forecast in which some series ran out of time or
+    were served by a fixed-order stopgap model.  Such a forecast is cached
+    with metadata.degraded set, and schedule_full_forecast() queues the
+    unbudgeted computation that replaces it.
+    """
+    metadata = value.get("metadata", {}) if isinstance(value, dict) else {}
+    budget = metadata.get("budget")
+    return bool(
+        metadata.get("degraded")
+        or (budget and (budget.get("timed_out") or budget.get("stopgap")))
+    )
+
+
+def schedule_full_forecast(hospital_id, reconcile=None):
+    """
+    Queue the unbudgeted forecast (full order search for every series) as an
+    analytics job; it overwrites the degraded cache entry once it finishes.
+    Never raises — the degraded answer is still served.
+    """
+    from . import jobs                 # jobs imports this module
+    try:
+        jobs.submit(hospital_id, "forecast", {"days": MAX_FORECAST_HORIZON, "reconcile": reconcile})
+    except Exception as e:
+        print(f"[analytics] Could not schedule the full forecast for {hospital_id}: {e}")
+
+
+def normalize_department(hospital_id, department_id):
+    """
+    Canonical department key: 'all', or the id of one of the hospital's
+    departments.  Returns None for anything else, so arbitrary query values
+    never become cache keys or model files.
+    """
+    if department_id in (None, "", "all"):
+        return "all"
+    try:
+        dept_uuid = uuid.UUID(str(department_id))
+    except ValueError:
+        return None
+    if not Department.objects.filter(id=dept_uuid, hospital_id=hospital_id).exists():
+        return None
+    return str(dept_uuid)
+
+
+def disease_cache_key(days, department_id):
+    """Cache key of a distribution; `days` comes from normalize_range."""
+    return f"disease_dist_{days}days_{department_id}"
+
+
+# ---------------------------------------------------------------------------
+# Forecast
+# ---------------------------------------------------------------------------
+
+def compute_forecast(hospital_id, reconcile=None, budgeted=True):
+    """
+    Run the full-horizon department forecast plus load status for a hospital.
+    `reconcile` optionally selects one of RECONCILIATION_METHODS; budgeted=False
+    lifts the request-path time budget (for background computation).  A
+    degraded budgeted result (see _is_degraded) is marked as such and the
+    full computation is scheduled in the background.
+    Returns the result dict stored under forecast_cache_key(reconcile), or
+    None when there is no historical data to forecast from.
+    """
+    forecaster = ml_models.ARIMAForecaster(hospital_id=hospital_id)
+
+    forecast_results = forecaster.forecast_by_department(
+        steps=MAX_FORECAST_HORIZON, reconcile=reconcile, budgeted=budgeted
+    )
+    if forecast_results is None or not forecast_results.get('forecast'):
+        return None
+
+    # Analyze load status (capacity vs expected volume)
+    load_status = forecaster.get_department_load_status(forecast_data=forecast_results)
+
+    result = {
+        "forecast": forecast_results['forecast'],
+        "status": load_status,
+        "metadata": forecast_results['metadata']
+    }
+    if budgeted and _is_degraded(result):
+        result["metadata"]["degraded"] = True
+        schedule_full_forecast(hospital_id, reconcile)
+    return result
+
+
+def forecast_payload(hospital_id, days, reconcile=None, budgeted=True):
+    """
+    The forecast response for `days` days: the cached (or single-flight
+    computed) full-horizon result sliced to the range, or an empty
+    learning-mode payload when there is no historical data.
+    """
+    # One full-horizon computation per hospital serves every range:
+    # 7/30/90-day views are slices of the same stored forecast path.
+    # An unbudgeted call (background job) replaces a degraded cached result.
+    result = get_or_compute(
+        forecast_cache_key(reconcile), hospital_id,
+        lambda: compute_forecast(hospital_id, reconcile=reconcile, budgeted=budgeted),
+        usable=None if budgeted else (lambda value: not _is_degraded(value)),
+    )
+
+    # Handle cases with no data safely (empty forecast instead of an error)
+    if result is None:
+        return {
+            "forecast": [],
+            "status": [],
+            "metadata": {
+                "confidence": 0,
+                "is_learning": True,
+                "message": "No historical data available for analysis"
+            }
+        }
+
+    return slice_forecast(result, days)
+
+
+def slice_forecast(result, days):
+    """Cut a full-horizon forecast result down to the requested range."""
+    return {
+        **result,
+        "forecast": result["forecast"][:days],
+        "status": [
+            {**status, "days": status["days"][:days]} if "days" in status else status
+            for status in result.get("status", [])
+        ],
+        "metadata": {**result["metadata"], "max_forecast_range": days},
+    }
+
+
+# ---------------------------------------------------------------------------
+# Disease distribution
+# ---------------------------------------------------------------------------
+
+def disease_payload(hospital_id, range_param, department_id='all'):
+    """Cached (or single-flight computed) disease distribution response."""
+    days = normalize_range(range_param)
+    return get_or_compute(
+        disease_cache_key(days, department_id), hospital_id,
+        lambda: compute_disease_distribution(hospital_id, days, department_id),
+    )
+
+
+def compute_disease_distribution(hospital_id, range_param, department_id='all'):
+    classifier = ml_models.DiseaseClassifier(hospital_id=hospital_id)
+    days = normalize_range(range_param)
+    return classifier.get_distribution(days=days, department_id=department_id)
+
+
+# ---------------------------------------------------------------------------
+# Model evaluation
+# ---------------------------------------------------------------------------
+
+def evaluate_models(hospital_id):
+    forecaster = ml_models.ARIMAForecaster(hospital_id=hospital_id)
+    classifier = ml_models.DiseaseClassifier(hospital_id=hospital_id)
+    return {
+        "arima_forecasting": forecaster.evaluate(),
+        "disease_classification": classifier.evaluate()
+    }
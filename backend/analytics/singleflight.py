@@ -0,0 +1,122 @@
+"""
+Single-flight execution of expensive analytics computations.
+
+When a cached result expires, every open dashboard asks for it at once.
+run() lets exactly one caller per key compute it — across threads (a
+per-key threading lock) and across gunicorn workers on the same host (an
+flock on a per-key lock file) — while the others wait and then read the
+freshly cached value.  Callers that wait longer than the timeout get the
+last stored value instead, however old.
+"""
+import hashlib
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl                          # POSIX only
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+# Directory of the per-key lock files shared by all worker processes
+LOCK_DIR = os.getenv("ANALYTICS_LOCK_DIR", "/tmp/smartaid_locks")
+
+# Seconds a caller waits for another caller's computation before giving up
+WAIT_TIMEOUT_SECONDS = float(os.getenv("ANALYTICS_SINGLEFLIGHT_WAIT", "120"))
+
+# Poll interval while waiting for the cross-process lock
+POLL_SECONDS = 0.1
+
+# key → [lock, number of threads holding or waiting for it]; an entry is
+# dropped when its last user lets go, so the dict only holds keys in use
+_thread_locks = {}
+_thread_locks_guard = threading.Lock()
+
+
+def _checkout_thread_lock(key: str) -> threading.Lock:
+    with _thread_locks_guard:
+        entry = _thread_locks.get(key)
+        if entry is None:
+            entry = _thread_locks[key] = [threading.Lock(), 0]
+        entry[1] += 1
+        return entry[0]
+
+
+def _checkin_thread_lock(key: str):
+    with _thread_locks_guard:
+        entry = _thread_locks[key]
+        entry[1] -= 1
+        if entry[1] == 0:
+            del _thread_locks[key]
+
+
+@contextmanager
+def acquire(key: str, timeout: float = WAIT_TIMEOUT_SECONDS):
+    """
+    Hold the lock for `key` in this process and on this host.
+    Yields True when acquired, False when `timeout` expired first.
+    """
+    deadline = time.monotonic() + timeout
+    thread_lock = _checkout_thread_lock(key)
+    try:
+        if not thread_lock.acquire(timeout=max(0.0, timeout)):
+            yield False
+            return
+
+        lock_file = None
+        try:
+            if FCNTL_AVAILABLE:
+                os.makedirs(LOCK_DIR, exist_ok=True)
+                name = hashlib.sha1(key.encode()).hexdigest()[:24]
+                lock_file = open(os.path.join(LOCK_DIR, f"{name}.lock"), "a")
+                while True:
+                    try:
+                        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        break
+                    except BlockingIOError:
+                        if time.monotonic() >= deadline:
+                            yield False
+                            return
+                        time.sleep(POLL_SECONDS)
+            yield True
+        finally:
+            if lock_file is not None:
+                lock_file.close()         # closing releases the flock
+            thread_lock.release()
+    finally:
+        _checkin_thread_lock(key)
+
+
+def run(key: str, compute, cached=None, stale=None, timeout: float = WAIT_TIMEOUT_SECONDS):
+    """
+    Return cached() if it has a value, otherwise compute() — with at most
+    one compute() per key running at a time.
+
+    cached  : returns the current (fresh) value or None; checked again once
+              the lock is held, so waiters reuse the winner's result
+    stale   : returns the last value regardless of age (or None); served to
+              callers whose wait exceeded `timeout`
+    If the wait times out and there is no stale value, the caller computes
+    without the lock rather than failing.
+    """
+    if cached is not None:
+        value = cached()
+        if value is not None:
+            return value
+
+    with acquire(key, timeout) as acquired:
+        if acquired:
+            if cached is not None:
+                value = cached()
+                if value is not None:
+                    return value
+            return compute()
+
+    print(f"[singleflight] Timed out after {timeout:g}s waiting for {key}")
+    if stale is not None:
+        value = stale()
+        if value is not None:
+            return value
+    return compute()
@@ -0,0 +1,344 @@
+"""
+Reproducible synthetic hospital datasets for load and ML benchmarking.
+
+generate() creates hospitals, departments, doctors and patients, then
+draws daily visit counts per department from a Poisson model with weekly
+and annual seasonality and diagnosis-specific outbreaks, and inserts the
+visits with bulk_create in batches.  Everything random comes from NumPy
+generators seeded with (`seed`, hospital number or label), so the same
+parameters always produce the same dataset (UUIDs included), and a second
+run adds new hospitals rather than colliding with the first.
+
+Synthetic rows are tagged — hospital names start with SYNTHETIC_PREFIX and
+profiles use SYNTHETIC_EMAIL_DOMAIN — so clear() can remove them again.
+"""
+import time
+import uuid
+import zlib
+from datetime import datetime, time as dt_time, timedelta
+
+import numpy as np
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from hospitals.models import Hospital, Department
+from users.models import Profile
+from clinical.models import Prescription, Visit
+from . import rollup
+from .models import VisitDailyRollup
+
+# Name prefix of generated hospitals and email domain of generated profiles
+SYNTHETIC_PREFIX = "Synthetic Hospital"
+SYNTHETIC_EMAIL_DOMAIN = "synthetic.invalid"
+
+# Department names, cycled when more departments are requested
+DEPARTMENT_NAMES = [
+    "General Medicine", "Pediatrics", "Cardiology", "Orthopedics",
+    "Pulmonology", "Gastroenterology", "Neurology", "Dermatology",
+    "ENT", "Endocrinology", "Nephrology", "Psychiatry",
+]
+
+# Default diagnosis mix: name → relative frequency
+DEFAULT_DIAGNOSIS_MIX = {
+    "Fever & Common Cold":     18,
+    "Hypertension Checkup":    14,
+    "Acute Bronchitis":         9,
+    "Type 2 Diabetes Routine": 12,
+    "Osteoarthritis Pain":      8,
+    "Allergic Rhinitis":        7,
+    "Gastritis":               10,
+    "Lower Back Pain":          9,
+    "Migraine Headaches":       6,
+    "Urinary Tract Infection":  7,
+}
+
+# Relative weekday load (Mon … Sun) at weekly_amplitude = 1, mean 1
+WEEKLY_SHAPE = np.array([1.3, 1.15, 1.1, 1.1, 1.05, 0.75, 0.55])
+
+# Outbreak duration range (days) and peak volume multiplier range
+OUTBREAK_DAYS = (10, 28)
+OUTBREAK_PEAK = (2.0, 4.0)
+
+# Visits inserted per bulk_create call
+DEFAULT_BATCH_SIZE = 10000
+
+# Clinic hours visits are spread over
+OPENING_HOUR, CLOSING_HOUR = 8, 18
+
+
+def parse_diagnosis_mix(text: str) -> dict:
+    """'Flu=3,Cold=2' → {'Flu': 3.0, 'Cold': 2.0}; raises ValueError if malformed."""
+    mix = {}
+    for item in filter(None, (part.strip() for part in text.split(","))):
+        name, _, weight = item.rpartition("=")
+        if not name or float(weight) <= 0:
+            raise ValueError(f"Invalid diagnosis mix entry: {item!r} (expected name=weight)")
+        mix[name.strip()] = float(weight)
+    if not mix:
+        raise ValueError("Diagnosis mix is empty")
+    return mix
+
+
+def bulk_create_backdated(model, objs, field_names, batch_size=None):
+    """
+    bulk_create `objs` keeping their own values of the auto_now_add fields
+    `field_names`: bulk_create stamps those with the current time, so they
+    are written back by primary key in the same transaction (one
+    parameterised UPDATE run with executemany — bulk_update's CASE
+    expressions cost several times the insert itself).  The model's field
+    metadata is never touched, so concurrent saves elsewhere in the process
+    keep their automatic timestamps.  `objs` need their pks set.
+    """
+    wanted = [[getattr(obj, name) for name in field_names] for obj in objs]
+    fields = [model._meta.get_field(name) for name in field_names]
+    pk = model._meta.pk
+    connection = connections[router.db_for_write(model)]
+    quote = connection.ops.quote_name
+    sql = "UPDATE {} SET {} WHERE {} = %s".format(
+        quote(model._meta.db_table),
+        ", ".join(f"{quote(field.column)} = %s" for field in fields),
+        quote(pk.column),
+    )
+    params = [
+        [field.get_db_prep_save(value, connection) for field, value in zip(fields, values)]
+        + [pk.get_db_prep_save(obj.pk, connection)]
+        for obj, values in zip(objs, wanted)
+    ]
+    with transaction.atomic(using=connection.alias):
+        model.objects.bulk_create(objs, batch_size=batch_size)
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, params)
+    for obj, values in zip(objs, wanted):
+        for name, value in zip(field_names, values):
+            setattr(obj, name, value)
+    return objs
+
+
+def clear(log=print, batch_size: int = DEFAULT_BATCH_SIZE) -> dict:
+    """
+    Delete every generated hospital and profile, with their visits.
+
+    Visit has rollup post_delete receivers, so QuerySet.delete() (and the
+    hospital cascade) would load every visit into memory to send them.
+    The visits are therefore removed first with raw DELETEs of `batch_size`
+    primary keys, and the hospitals' rollup rows with them — the hospitals
+    are going, so there is nothing to rebuild.
+    """
+    hospital_ids = list(
+        Hospital.objects.filter(name__startswith=SYNTHETIC_PREFIX).values_list("id", flat=True)
+    )
+    visits = Visit.objects.filter(hospital_id__in=hospital_ids)
+    using = router.db_for_write(Visit)
+    removed = 0
+    with transaction.atomic(using=using):
+        # Prescriptions written against generated visits would block the raw deletes
+        Prescription.objects.filter(visit__in=visits).delete()
+        while True:
+            batch = list(visits.values_list("pk", flat=True)[:batch_size])
+            if not batch:
+                break
+            removed += Visit.objects.filter(pk__in=batch)._raw_delete(using)
+        VisitDailyRollup.objects.filter(hospital_id__in=hospital_ids)._raw_delete(using)
+        Profile.objects.filter(email__endswith=f"@{SYNTHETIC_EMAIL_DOMAIN}").delete()
+        Hospital.objects.filter(id__in=hospital_ids).delete()
+    log(f"[synthetic] Removed {len(hospital_ids)} hospital(s) and {removed} visit(s)")
+    return {"hospitals": len(hospital_ids), "visits": removed}
+
+
+def _uuids(rng, n: int) -> list:
+    """n version-4 UUIDs drawn from `rng` (reproducible, unlike uuid4())."""
+    raw = np.frombuffer(rng.bytes(16 * n), dtype=np.uint8).reshape(n, 16).copy()
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40        # version 4
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80        # RFC 4122 variant
+    return [uuid.UUID(bytes=row.tobytes()) for row in raw]
+
+
+def _seasonality(day_dates, weekly_amplitude: float, annual_amplitude: float) -> np.ndarray:
+    """Multiplicative daily volume factor with mean ≈ 1."""
+    weekdays = np.array([d.weekday() for d in day_dates])
+    day_of_year = np.array([d.timetuple().tm_yday for d in day_dates])
+    weekly = 1 + weekly_amplitude * (WEEKLY_SHAPE[weekdays] - 1)
+    annual = 1 + annual_amplitude * np.cos(2 * np.pi * (day_of_year - 15) / 365.25)   # winter peak
+    return np.maximum(weekly * annual, 0.0)
+
+
+def _diagnosis_weights(rng, n_days: int, base: np.ndarray, outbreaks: int) -> np.ndarray:
+    """
+    days × diagnoses visit-volume weights: the base mix, with each outbreak
+    multiplying one diagnosis by a smooth bump over a random window.
+    Rows sum to the day's volume multiplier (1 without outbreaks).
+    """
+    weights = np.tile(base / base.sum(), (n_days, 1))
+    for _ in range(outbreaks):
+        duration = int(rng.integers(OUTBREAK_DAYS[0], OUTBREAK_DAYS[1] + 1))
+        start = int(rng.integers(0, max(1, n_days - duration)))
+        diagnosis = int(rng.integers(0, len(base)))
+        peak = rng.uniform(*OUTBREAK_PEAK)
+        bump = np.sin(np.linspace(0, np.pi, duration)) * (peak - 1)
+        window = slice(start, min(n_days, start + duration))
+        weights[window, diagnosis] *= 1 + bump[: window.stop - window.start]
+    return weights
+
+
+def generate(
+    hospitals: int = 1,
+    departments: int = 4,
+    doctors: int = 3,
+    patients: int = 500,
+    days: int = 365,
+    daily_rate: float = 20.0,
+    weekly_amplitude: float = 1.0,
+    annual_amplitude: float = 0.2,
+    outbreaks: int = 2,
+    diagnosis_mix: dict = None,
+    seed: int = 42,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    end_date=None,
+    label: str = None,
+    log=print,
+) -> dict:
+    """
+    Generate a synthetic dataset and rebuild its visit rollup.
+
+    departments : per hospital
+    doctors     : per department
+    patients    : per hospital
+    days        : history length, ending at end_date (default: today)
+    daily_rate  : mean visits per department per day, before seasonality;
+                  each department's rate is scaled by a random weight
+    weekly_amplitude / annual_amplitude : strength of the weekday profile
+                  (WEEKLY_SHAPE) and of the winter-peaking annual cycle
+    outbreaks   : per hospital, each boosting one diagnosis for 10–28 days
+    diagnosis_mix : name → relative frequency (default DEFAULT_DIAGNOSIS_MIX)
+    label       : names hospitals "<SYNTHETIC_PREFIX> <label>" (plus "-<n>"
+                  when several) instead of numbering them
+
+    Returns {"hospitals": [ids], "visits": int, "seconds": float}.
+    """
+    started = time.monotonic()
+
+    mix = diagnosis_mix or DEFAULT_DIAGNOSIS_MIX
+    diagnosis_names = list(mix)
+    base_mix = np.array([mix[name] for name in diagnosis_names], dtype=float)
+
+    end_day = end_date or timezone.localdate()
+    day_dates = [end_day - timedelta(days=days - 1 - i) for i in range(days)]
+    seasonality = _seasonality(day_dates, weekly_amplitude, annual_amplitude)
+    tz = timezone.get_current_timezone()
+    day_starts = np.array([
+        timezone.make_aware(datetime.combine(d, dt_time(OPENING_HOUR)), tz).timestamp()
+        for d in day_dates
+    ])
+
+    existing = Hospital.objects.filter(name__startswith=SYNTHETIC_PREFIX).count()
+    hospital_ids = []
+    total_visits = 0
+
+    for h in range(existing, existing + hospitals):
+        if label is None:
+            rng = np.random.default_rng([seed, h])
+            name = f"{SYNTHETIC_PREFIX} {h + 1}"
+        else:
+            # Labelled datasets don't depend on what else was generated before
+            rng = np.random.default_rng([seed, h - existing, zlib.crc32(label.encode())])
+            name = f"{SYNTHETIC_PREFIX} {label}" + (f"-{h - existing + 1}" if hospitals > 1 else "")
+        hospital = Hospital.objects.create(
+            id=_uuids(rng, 1)[0],
+            name=name,
+            contact_email=f"hospital{h + 1}@{SYNTHETIC_EMAIL_DOMAIN}",
+        )
+        hospital_ids.append(hospital.id)
+
+        dept_objs = Department.objects.bulk_create([
+            Department(
+                id=dept_id,
+                hospital=hospital,
+                name=DEPARTMENT_NAMES[d % len(DEPARTMENT_NAMES)]
+                     + ("" if d < len(DEPARTMENT_NAMES) else f" {d // len(DEPARTMENT_NAMES) + 1}"),
+                dept_code=f"D{d + 1:03d}",
+                doctor_count=doctors,
+            )
+            for d, dept_id in enumerate(_uuids(rng, departments))
+        ])
+
+        doctor_ids = _uuids(rng, departments * doctors)
+        Profile.objects.bulk_create([
+            Profile(
+                id=doctor_id,
+                role="doctor",
+                hospital=hospital,
+                department=dept_objs[i // doctors],
+                full_name=f"Dr. Synthetic {h + 1}-{i + 1}",
+                email=f"doctor{h + 1}_{i + 1}@{SYNTHETIC_EMAIL_DOMAIN}",
+            )
+            for i, doctor_id in enumerate(doctor_ids)
+        ], batch_size=batch_size)
+
+        patient_ids = _uuids(rng, patients)
+        ages = rng.integers(1, 90, size=patients)
+        genders = rng.choice(["Male", "Female", "Other"], size=patients, p=[0.49, 0.49, 0.02])
+        Profile.objects.bulk_create([
+            Profile(
+                id=patient_id,
+                role="patient",
+                hospital=hospital,
+                full_name=f"Patient {h + 1}-{i + 1}",
+                email=f"patient{h + 1}_{i + 1}@{SYNTHETIC_EMAIL_DOMAIN}",
+                age=int(ages[i]),
+                gender=str(genders[i]),
+            )
+            for i, patient_id in enumerate(patient_ids)
+        ], batch_size=batch_size)
+
+        # --- Daily counts: departments × days, Poisson around the seasonal rate ---
+        dept_weights = rng.lognormal(0.0, 0.4, size=departments)
+        dept_weights /= dept_weights.mean()
+        diagnosis_weights = _diagnosis_weights(rng, days, base_mix, outbreaks)
+        rates = daily_rate * np.outer(dept_weights, seasonality * diagnosis_weights.sum(axis=1))
+        counts = rng.poisson(rates)
+
+        # One entry per visit, in (department, day) order
+        dept_idx = np.repeat(np.repeat(np.arange(departments), days), counts.ravel())
+        day_idx = np.repeat(np.tile(np.arange(days), departments), counts.ravel())
+        n_visits = len(day_idx)
+
+        cum_mix = np.cumsum(diagnosis_weights / diagnosis_weights.sum(axis=1, keepdims=True), axis=1)
+        open_seconds = (CLOSING_HOUR - OPENING_HOUR) * 3600
+
+        log(f"[synthetic] {hospital.name}: inserting {n_visits} visits...")
+        for lo in range(0, n_visits, batch_size):
+            hi = min(n_visits, lo + batch_size)
+            days_b = day_idx[lo:hi]
+            doctors_b = dept_idx[lo:hi] * doctors + rng.integers(0, doctors, size=hi - lo)
+            patients_b = rng.integers(0, patients, size=hi - lo)
+            diagnoses_b = (rng.random(hi - lo)[:, None] > cum_mix[days_b]).sum(axis=1)
+            diagnoses_b = np.minimum(diagnoses_b, len(diagnosis_names) - 1)
+            stamps = day_starts[days_b] + rng.integers(0, open_seconds, size=hi - lo)
+            when = [datetime.fromtimestamp(stamp, tz) for stamp in stamps.tolist()]
+
+            # visit_date/created_at are auto_now_add — written back after the insert
+            bulk_create_backdated(Visit, [
+                Visit(
+                    id=visit_id,
+                    hospital_id=hospital.id,
+                    patient_id=patient_ids[patients_b[k]],
+                    doctor_id=doctor_ids[doctors_b[k]],
+                    diagnosis=diagnosis_names[diagnoses_b[k]],
+                    visit_date=when[k],
+                    created_at=when[k],
+                )
+                for k, visit_id in enumerate(_uuids(rng, hi - lo))
+            ], ["visit_date", "created_at"])
+            total_visits += hi - lo
+            if (lo // batch_size) % 10 == 9:
+                log(f"[synthetic]   {hi}/{n_visits} visits")
+
+    # bulk_create bypasses the rollup signals
+    log("[synthetic] Rebuilding visit rollup...")
+    rollup.rebuild_rollup(hospital_ids)
+
+    return {
+        "hospitals": [str(h) for h in hospital_ids],
+        "visits": total_visits,
+        "seconds": round(time.monotonic() - started, 2),
+    }
@@ -1,3 +1,992 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+import pandas as pd
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from clinical.models import Visit
+from hospitals.models import Department, Hospital
+from users.models import Profile
+
+from analytics import jobs, rollup, services, singleflight, synthetic, timing
+from analytics.ml_models import (
+    arima_model, disease_model, fast_models, fingerprint, fourier_model, hierarchy,
+    model_store,
+)
+from analytics.ml_models.disk_cache import DiskCache
+from analytics.models import AnalyticsJob, VisitDailyRollup
+
+
+def _weekly_series(days: int, end: str, seed: int = 0) -> pd.Series:
+    """A gap-free daily count series with a weekly cycle, ending on `end`."""
+    rng   = np.random.default_rng(seed)
+    dates = pd.date_range(end=pd.Timestamp(end), periods=days, freq="D")
+    level = 40 + 12 * np.sin(2 * np.pi * np.arange(days) / 7)
+    return pd.Series(rng.poisson(level).astype(float), index=dates, name="count")
+
+
+class IncrementalUpdateTests(SimpleTestCase):
+    """Cached SARIMA models are extended day by day instead of refitted."""
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        self.path = f"{self.cache_dir}/arima_test_dept_x.pkl"
+
+    def _day(self, full: pd.Series, k: int) -> pd.Series:
+        """The series as seen on day k: complete days plus a partly filled current day."""
+        seen = full.iloc[:100 + k].copy()
+        seen.iloc[-1] = np.floor(seen.iloc[-1] * 0.3)
+        return seen
+
+    def test_consecutive_complete_days_update_without_refit(self):
+        full = _weekly_series(110, "2026-03-01")
+        with timing.recording("test") as timer:
+            for k in range(6):
+                bundle = arima_model._fit_series(self._day(full, k), self.path)
+
+        self.assertEqual(timer.counters.get("fits"), 1)
+        self.assertEqual(timer.counters.get("model_updates"), 5)
+        self.assertEqual(bundle["last_date"], full.index[100 + 5 - 2])
+
+    def test_model_never_sees_the_provisional_day(self):
+        full   = _weekly_series(110, "2026-03-01")
+        series = self._day(full, 0)
+        bundle = arima_model._fit_series(series, self.path)
+
+        self.assertEqual(bundle["last_date"], series.index[-2])
+        np.testing.assert_array_equal(
+            bundle["tail"], series.iloc[-1 - arima_model.HISTORY_CHECK_DAYS:-1].to_numpy()
+        )
+
+    def test_more_visits_today_is_a_cache_hit(self):
+        full   = _weekly_series(110, "2026-03-01")
+        series = self._day(full, 0)
+        arima_model._fit_series(series, self.path)
+
+        series.iloc[-1] += 5
+        with timing.recording("test") as timer:
+            arima_model._fit_series(series, self.path)
+        self.assertEqual(timer.counters.get("cache_hits"), 1)
+        self.assertIsNone(timer.counters.get("fits"))
+
+    def test_edited_history_forces_a_refit(self):
+        full = _weekly_series(110, "2026-03-01")
+        arima_model._fit_series(self._day(full, 0), self.path)
+
+        edited = self._day(full, 1)
+        edited.iloc[-4] += 10
+        with timing.recording("test") as timer:
+            arima_model._fit_series(edited, self.path)
+        self.assertEqual(timer.counters.get("cache_misses"), 1)
+        self.assertIsNone(timer.counters.get("model_updates"))
+
+    def test_forecast_starts_the_day_after_the_provisional_day(self):
+        full   = _weekly_series(110, "2026-03-01")
+        series = self._day(full, 0)
+        bundle = arima_model._fit_series(series, self.path)
+
+        start = series.index[-1] + timedelta(days=1)
+        np.testing.assert_allclose(
+            arima_model._slice_forecast(bundle, start, 7),
+            arima_model._compact_forecast(bundle["model"], 8)[1:],
+        )
+
+
+class RollingOriginEvaluationTests(SimpleTestCase):
+    """evaluate() scores folds trained on complete days before each origin."""
+
+    def setUp(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        patcher = mock.patch.object(arima_model, "MODEL_CACHE_DIR", cache_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        # Ends with today's partly recorded day, as get_historical_data does
+        self.series = _weekly_series(91, "2026-03-01", seed=2)
+        self.series.iloc[-1] = 3
+        self.forecaster = arima_model.ARIMAForecaster("h1")
+
+    def _evaluate(self, **kwargs):
+        with mock.patch.object(self.forecaster, "get_historical_data", return_value=self.series):
+            return self.forecaster.evaluate(test_days=14, origins=3, stride_days=7, workers=0, **kwargs)
+
+    def test_fold_layout_and_aggregate_metrics(self):
+        result = self._evaluate()
+        complete = self.series.iloc[:-1]
+
+        self.assertEqual(result["status"], "success")
+        self.assertEqual([f["train_days"] for f in result["folds"]], [76, 69, 62])
+        self.assertEqual(
+            [f["origin"] for f in result["folds"]],
+            [complete.index[end].strftime("%Y-%m-%d") for end in (76, 69, 62)],
+        )
+        self.assertAlmostEqual(
+            result["mae"], np.mean([f["mae"] for f in result["folds"]]), places=1
+        )
+        self.assertEqual(result["folds_failed"], 0)
+
+    def test_folds_train_up_to_the_day_before_their_origin(self):
+        self._evaluate()
+        complete = self.series.iloc[:-1]
+
+        for end in (76, 69, 62):
+            train  = complete.iloc[:end]
+            bundle = arima_model._load_cached_model(
+                arima_model._cache_path("h1", arima_model._eval_cache_key(train))
+            )
+            self.assertEqual(bundle["last_date"], train.index[-1])
+
+
+class CompactModelTests(SimpleTestCase):
+    """The parameter-only bundle forecasts and extends exactly like statsmodels."""
+
+    def setUp(self):
+        from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+        series = _weekly_series(140, "2026-03-01")
+        self.history, self.new_days = series.iloc[:-7], series.iloc[-7:]
+        self.result = SARIMAX(
+            self.history, order=(1, 0, 1), seasonal_order=(1, 0, 0, 7), trend="c",
+        ).fit(disp=False)
+        self.compact = arima_model._compact_model(self.result)
+
+    def test_forecast_matches_get_forecast(self):
+        np.testing.assert_allclose(
+            arima_model._compact_forecast(self.compact, 30),
+            self.result.get_forecast(30).predicted_mean.to_numpy(),
+            rtol=1e-8, atol=1e-8,
+        )
+
+    def test_extend_matches_append_without_refit(self):
+        appended = self.result.append(self.new_days, refit=False)
+        extended = arima_model._compact_extend(self.compact, self.new_days.to_numpy())
+
+        np.testing.assert_allclose(
+            extended["state"], appended.filter_results.predicted_state[:, -1],
+            rtol=1e-8, atol=1e-8,
+        )
+        np.testing.assert_allclose(
+            arima_model._compact_forecast(extended, 30),
+            appended.get_forecast(30).predicted_mean.to_numpy(),
+            rtol=1e-8, atol=1e-8,
+        )
+
+
+class SeriesFingerprintTests(SimpleTestCase):
+    """The still-filling current day is not part of a series' fingerprint."""
+
+    def test_provisional_day_is_ignored(self):
+        series = _weekly_series(60, "2026-03-01")
+        busier = series.copy()
+        busier.iloc[-1] += 25
+
+        self.assertEqual(fingerprint.of_series(series), fingerprint.of_series(busier))
+
+    def test_completed_day_changes_the_fingerprint(self):
+        series = _weekly_series(60, "2026-03-01")
+        edited = series.copy()
+        edited.iloc[-2] += 1
+
+        self.assertNotEqual(
+            fingerprint.of_series(series).digest, fingerprint.of_series(edited).digest
+        )
+
+    def test_next_day_settles_the_previous_one(self):
+        full = _weekly_series(61, "2026-03-02")
+
+        self.assertNotEqual(
+            fingerprint.of_series(full.iloc[:-1]), fingerprint.of_series(full)
+        )
+        self.assertEqual(
+            fingerprint.of_series(full).last_date, full.index[-2].date().isoformat()
+        )
+
+
+class LostJobTests(TestCase):
+    """Jobs whose executor died are run again instead of blocking their params."""
+
+    def setUp(self):
+        self.hospital = Hospital.objects.create(name="General")
+        jobs._last_recovery = float("-inf")
+        schedule = mock.patch.object(jobs, "_schedule", return_value=True)
+        self.schedule = schedule.start()
+        self.addCleanup(schedule.stop)
+
+    def _job(self, status, age_minutes, **fields):
+        job = AnalyticsJob.objects.create(hospital=self.hospital, kind="evaluate_models", params={})
+        then = timezone.now() - timedelta(minutes=age_minutes)
+        AnalyticsJob.objects.filter(id=job.id).update(
+            status=status, created_at=then,
+            started_at=then if status == AnalyticsJob.STATUS_RUNNING else None, **fields
+        )
+        return job
+
+    def test_stale_running_job_is_requeued_and_rescheduled(self):
+        lost = self._job(AnalyticsJob.STATUS_RUNNING, jobs.JOB_STALE_MINUTES + 5)
+
+        job = jobs.submit(self.hospital.id, "evaluate_models", {})
+
+        self.assertEqual(job.id, lost.id)
+        self.assertEqual(job.status, AnalyticsJob.STATUS_PENDING)
+        self.schedule.assert_called_once_with(lost.id)
+
+    def test_pending_job_of_a_dead_queue_is_rescheduled(self):
+        lost = self._job(AnalyticsJob.STATUS_PENDING, jobs.JOB_PENDING_STALE_MINUTES + 1)
+
+        self.assertEqual(jobs.recover_lost_jobs(), 1)
+        self.schedule.assert_called_once_with(lost.id)
+
+    def test_recent_jobs_are_left_alone(self):
+        running = self._job(AnalyticsJob.STATUS_RUNNING, 1)
+
+        self.assertEqual(jobs.submit(self.hospital.id, "evaluate_models", {}).id, running.id)
+        self.schedule.assert_not_called()
+
+    def test_external_mode_does_not_dedupe_onto_a_stale_job(self):
+        lost = self._job(AnalyticsJob.STATUS_RUNNING, jobs.JOB_STALE_MINUTES + 5)
+
+        with mock.patch.object(jobs, "JOB_MODE", "external"):
+            job = jobs.submit(self.hospital.id, "evaluate_models", {})
+
+        self.assertNotEqual(job.id, lost.id)
+        self.schedule.assert_not_called()
+
+
+class JobStatusViewTests(TestCase):
+    """GET /api/analytics/trends/jobs/<id>/ for the user's hospital."""
+
+    def setUp(self):
+        self.hospital = Hospital.objects.create(name="General")
+        user = User.objects.create_user("admin@general.test", password="x")
+        Profile.objects.create(user=user, role="admin", hospital=self.hospital)
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+    def test_finished_job_is_returned(self):
+        job = AnalyticsJob.objects.create(
+            hospital=self.hospital, kind="evaluate_models", params={},
+            status=AnalyticsJob.STATUS_SUCCEEDED, result={"status": "success"},
+        )
+        reply = self.client.get(f"/api/analytics/trends/jobs/{job.id}/")
+        self.assertEqual(reply.status_code, 200)
+        self.assertEqual(reply.data["result"], {"status": "success"})
+
+    def test_unknown_or_malformed_ids_are_not_found(self):
+        for job_id in (uuid.uuid4(), "abc", "0-0-0"):
+            with self.subTest(job_id=job_id):
+                reply = self.client.get(f"/api/analytics/trends/jobs/{job_id}/")
+                self.assertEqual(reply.status_code, 404)
+
+
+class FastTierTests(SimpleTestCase):
+    """Vectorised fast-tier methods and their backtest-based selection."""
+
+    def setUp(self):
+        self.week = np.array([30, 42, 45, 44, 40, 25, 12], dtype=float)
+
+    def _periodic(self, days: int, offset: int = 0) -> np.ndarray:
+        return np.resize(np.roll(self.week, -offset), days)
+
+    def test_seasonal_naive_repeats_the_last_week_by_weekday(self):
+        Y = np.vstack([self._periodic(30), self._periodic(30, offset=3)])
+        np.testing.assert_array_equal(
+            fast_models.seasonal_naive(Y, 10),
+            np.vstack([self._periodic(40)[30:], self._periodic(40, offset=3)[30:]]),
+        )
+
+    def test_weekly_profile_and_holt_winters_follow_a_steady_weekly_cycle(self):
+        Y = self._periodic(56)
+        expected = self._periodic(70)[56:]
+        np.testing.assert_allclose(fast_models.weekly_profile(Y, 14)[0], expected)
+        np.testing.assert_allclose(fast_models.holt_winters(Y, 14)[0], expected, atol=1.0)
+
+    def test_selection_picks_the_lowest_backtest_error_per_row(self):
+        rng = np.random.default_rng(5)
+        Y = np.vstack([self._periodic(56), rng.poisson(self._periodic(56)).astype(float)])
+        forecasts, methods, maes = fast_models.select_and_forecast(Y, 21)
+
+        scores = fast_models.backtest(Y)
+        for row, method in enumerate(methods):
+            self.assertIn(method, fast_models.FAST_METHODS)
+            self.assertAlmostEqual(maes[row], min(score[row] for score in scores.values()))
+        self.assertEqual(forecasts.shape, (2, 21))
+        self.assertTrue(np.all(forecasts >= 0))
+        np.testing.assert_allclose(forecasts[0], self._periodic(77)[56:], atol=1e-6)
+
+    def test_forecaster_fast_tier_ignores_the_provisional_day(self):
+        Y = np.vstack([self._periodic(57), self._periodic(57, offset=2)])
+        partial = Y.copy()
+        partial[:, -1] = np.floor(partial[:, -1] * 0.2)
+
+        forecasts, _, maes = arima_model._fast_forecast(partial, 14)
+        expected, _, expected_maes = arima_model._fast_forecast(Y, 14)
+        np.testing.assert_allclose(forecasts, expected)
+        np.testing.assert_allclose(maes, expected_maes)
+        # First value is the day after the provisional one, as on the SARIMA path
+        np.testing.assert_allclose(forecasts[0], self._periodic(71)[57:], atol=1e-6)
+
+
+class FourierModelTests(SimpleTestCase):
+    """Trend + weekly/annual harmonic regression solved for all rows at once."""
+
+    def _seasonal(self, days: int, annual: float = 0.0) -> np.ndarray:
+        t = np.arange(days)
+        return (
+            40 + 8 * np.sin(2 * np.pi * t / 7) + 3 * np.cos(4 * np.pi * t / 7)
+            + annual * np.cos(2 * np.pi * t / 365.25)
+        )
+
+    def test_weekly_cycle_is_recovered_for_every_row(self):
+        Y = np.vstack([self._seasonal(70), 2 * self._seasonal(70)])
+        truth = self._seasonal(84)[70:]
+
+        forecast = fourier_model.forecast(Y, 14)
+        np.testing.assert_allclose(forecast, np.vstack([truth, 2 * truth]), atol=1e-6)
+
+    def test_annual_terms_only_with_a_year_of_history(self):
+        _, annual = fourier_model.fit(self._seasonal(fourier_model.ANNUAL_MIN_DAYS - 1))
+        self.assertFalse(annual)
+
+        coefficients, annual = fourier_model.fit(self._seasonal(fourier_model.ANNUAL_MIN_DAYS))
+        self.assertTrue(annual)
+        self.assertEqual(coefficients.shape, (2 + 2 * 3 + 2 * 2, 1))
+
+    def test_annual_cycle_is_forecast_from_long_history(self):
+        Y = self._seasonal(400, annual=15)
+        truth = self._seasonal(460, annual=15)[400:]
+
+        np.testing.assert_allclose(fourier_model.forecast(Y, 60)[0], truth, atol=1e-6)
+
+    def test_short_history_falls_back_to_seasonal_naive(self):
+        Y = self._seasonal(fourier_model.min_days() - 1)
+        np.testing.assert_array_equal(
+            fourier_model.forecast(Y, 7), fast_models.seasonal_naive(Y, 7)
+        )
+
+    def test_fast_tier_history_starts_at_the_first_visit(self):
+        Y = np.zeros((2, 400))
+        Y[1, 150:] = 5
+        self.assertEqual(arima_model._fast_tier_history(Y, 91).shape, (2, 250))
+        self.assertEqual(arima_model._fast_tier_history(Y[:, 300:], 91).shape, (2, 100))
+        self.assertEqual(arima_model._fast_tier_history(np.zeros((2, 400)), 91).shape, (2, 91))
+
+
+class ReconciliationTests(SimpleTestCase):
+    """Reconciled department forecasts add up to the hospital total."""
+
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.Y      = rng.poisson(20, size=(4, 60)).astype(float)
+        self.bottom = rng.uniform(10, 30, size=(4, 7))
+        self.total  = self.bottom.sum(axis=0) * 1.2          # incoherent on purpose
+
+    def test_bottom_up_total_is_the_sum_of_the_departments(self):
+        total, bottom = hierarchy.bottom_up(self.bottom)
+        np.testing.assert_array_equal(bottom, self.bottom)
+        np.testing.assert_allclose(total, self.bottom.sum(axis=0))
+
+    def test_top_down_splits_the_total_by_historical_shares(self):
+        shares = hierarchy.historical_proportions(self.Y)
+        total, bottom = hierarchy.top_down(self.total, shares)
+        self.assertAlmostEqual(shares.sum(), 1.0)
+        np.testing.assert_allclose(bottom.sum(axis=0), total)
+
+    def test_mint_is_coherent(self):
+        residuals = hierarchy.seasonal_naive_residuals(
+            np.vstack([self.Y.sum(axis=0), self.Y]), m=7
+        )
+        total, bottom = hierarchy.mint(self.total, self.bottom, residuals)
+
+        self.assertEqual(bottom.shape, self.bottom.shape)
+        np.testing.assert_allclose(bottom.sum(axis=0), total)
+
+    def test_mint_leaves_coherent_forecasts_unchanged(self):
+        residuals = hierarchy.seasonal_naive_residuals(
+            np.vstack([self.Y.sum(axis=0), self.Y]), m=7
+        )
+        total, bottom = hierarchy.mint(self.bottom.sum(axis=0), self.bottom, residuals)
+        np.testing.assert_allclose(bottom, self.bottom)
+
+    def test_shrunk_covariance_is_symmetric_positive_definite(self):
+        W = hierarchy.shrunk_covariance(hierarchy.seasonal_naive_residuals(self.Y))
+        np.testing.assert_allclose(W, W.T)
+        self.assertTrue(np.all(np.linalg.eigvalsh(W) > 0))
+
+
+class RollupSignalTests(TestCase):
+    """The signal-maintained rollup always equals a rebuild from the visits."""
+
+    def setUp(self):
+        self.hospital   = Hospital.objects.create(name="General")
+        self.cardiology = Department.objects.create(hospital=self.hospital, name="Cardiology")
+        self.neurology  = Department.objects.create(hospital=self.hospital, name="Neurology")
+        self.doctor  = Profile.objects.create(
+            role="doctor", hospital=self.hospital, department=self.cardiology
+        )
+        self.patient = Profile.objects.create(role="patient", hospital=self.hospital)
+
+    def _visit(self, diagnosis="Flu"):
+        return Visit.objects.create(
+            hospital=self.hospital, patient=self.patient, doctor=self.doctor, diagnosis=diagnosis
+        )
+
+    def _rollup(self) -> dict:
+        counts = {}
+        for row in VisitDailyRollup.objects.filter(visit_count__gt=0):
+            key = (row.department_id, row.doctor_id, row.diagnosis, row.day)
+            counts[key] = counts.get(key, 0) + row.visit_count
+        return counts
+
+    def assertMatchesRebuild(self):
+        maintained = self._rollup()
+        rollup.rebuild_rollup([self.hospital.id])
+        self.assertEqual(maintained, self._rollup())
+
+    def test_created_visits_are_counted(self):
+        self._visit()
+        self._visit()
+        self._visit("Asthma")
+        self.assertEqual(sum(self._rollup().values()), 3)
+        self.assertMatchesRebuild()
+
+    def test_edited_diagnosis_moves_the_count(self):
+        visit = self._visit()
+        visit.diagnosis = "Asthma"
+        visit.save()
+        self.assertEqual({key[2] for key in self._rollup()}, {"Asthma"})
+        self.assertMatchesRebuild()
+
+    def test_deleted_visit_is_uncounted(self):
+        self._visit()
+        self._visit().delete()
+        self.assertEqual(sum(self._rollup().values()), 1)
+        self.assertMatchesRebuild()
+
+    def test_department_change_moves_the_doctors_rows(self):
+        self._visit()
+        self._visit("Asthma")
+        self.doctor.department = self.neurology
+        self.doctor.save()
+
+        self.assertEqual({key[0] for key in self._rollup()}, {self.neurology.id})
+        self.assertMatchesRebuild()
+
+    def test_visit_deleted_after_a_department_change_is_uncounted(self):
+        visit = self._visit()
+        self.doctor.department = self.neurology
+        self.doctor.save()
+        visit.delete()
+        self.assertEqual(self._rollup(), {})
+        self.assertMatchesRebuild()
+
+
+class DiseaseDistributionTests(TestCase):
+    """Top-N diagnoses counted in the database match pandas on the raw rows."""
+
+    COUNTS = {
+        "cardiology": {"Flu": 6, "Asthma": 5, "Migraine": 2, "Diabetes": 4, "Rash": 1},
+        "neurology":  {"Flu": 3, "Migraine": 5, "Asthma": 2, "Hypertension": 3, "Covid": 2},
+    }
+
+    def setUp(self):
+        self.hospital = Hospital.objects.create(name="General")
+        patient = Profile.objects.create(role="patient", hospital=self.hospital)
+        self.departments = {}
+        visits = []
+        for name, counts in self.COUNTS.items():
+            department = Department.objects.create(hospital=self.hospital, name=name)
+            doctor = Profile.objects.create(
+                role="doctor", hospital=self.hospital, department=department
+            )
+            self.departments[name] = department
+            visits += [
+                Visit(hospital=self.hospital, patient=patient, doctor=doctor, diagnosis=diagnosis)
+                for diagnosis, n in counts.items()
+                for _ in range(n)
+            ]
+        Visit.objects.bulk_create(visits)
+
+        # Outside a 30-day window: counted by neither side
+        old = Visit.objects.create(
+            hospital=self.hospital, patient=patient, doctor=doctor, diagnosis="Covid"
+        )
+        Visit.objects.filter(pk=old.pk).update(visit_date=timezone.now() - timedelta(days=60))
+
+        self.classifier = disease_model.DiseaseClassifier(self.hospital.id)
+
+    def _expected(self, department_id=None) -> list[tuple]:
+        df = self.classifier._load_visits(30, department_id)
+        counts = df["diagnosis"].value_counts()
+        ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+        return [
+            (name, round(n / len(df) * 100, 1))
+            for name, n in ranked[:disease_model.TOP_N_DIAGNOSES]
+        ]
+
+    def _distribution(self, department_id=None) -> list[tuple]:
+        total, _ = self.classifier._visit_stats(30, department_id)
+        return [
+            (row["name"], row["value"])
+            for row in self.classifier._historical_distribution(30, department_id, total)
+        ]
+
+    def test_hospital_top_n_matches_value_counts(self):
+        expected = self._expected()
+        self.assertEqual(len(expected), disease_model.TOP_N_DIAGNOSES)
+        self.assertEqual(self._distribution(), expected)
+        # Ties (Asthma / Migraine, 7 each) rank by name
+        self.assertEqual([name for name, _ in expected[:3]], ["Flu", "Asthma", "Migraine"])
+
+    def test_department_top_n_matches_value_counts(self):
+        for department in self.departments.values():
+            with self.subTest(department=department.name):
+                self.assertEqual(self._distribution(department.id), self._expected(department.id))
+
+    def test_stats_match_the_raw_rows(self):
+        df = self.classifier._load_visits(30)
+        self.assertEqual(
+            self.classifier._visit_stats(30), (len(df), df["diagnosis"].nunique())
+        )
+
+    def test_historical_mode_serves_the_database_counts(self):
+        result = self.classifier.get_distribution(days=30)
+
+        self.assertEqual(result["metadata"]["mode"], "historical_counts")
+        self.assertEqual(result["metadata"]["total_records"], 33)
+        self.assertEqual(result["metadata"]["unique_diagnoses"], 7)
+        self.assertEqual(result["metadata"]["top_diagnosis"], "Flu")
+        self.assertEqual(
+            [(row["name"], row["value"]) for row in result["distribution"]], self._expected()
+        )
+
+
+class DepartmentLoadStatusTests(TestCase):
+    """Capacity bands for every forecast day from one aggregate query."""
+
+    def setUp(self):
+        self.hospital   = Hospital.objects.create(name="General")
+        self.cardiology = Department.objects.create(hospital=self.hospital, name="Cardiology")
+        self.neurology  = Department.objects.create(hospital=self.hospital, name="Neurology")
+        for active in (True, True, False):
+            Profile.objects.create(
+                role="doctor", hospital=self.hospital, department=self.cardiology,
+                is_active=active,
+            )
+        self.forecast = {"forecast": [
+            {"name": "Mar 02", str(self.cardiology.id): 10, str(self.neurology.id): 0},
+            {"name": "Mar 03", str(self.cardiology.id): 20},
+            {"name": "Mar 04", str(self.cardiology.id): 27, str(self.neurology.id): 5},
+        ]}
+
+    def test_bands_for_every_forecast_day(self):
+        forecaster = arima_model.ARIMAForecaster(self.hospital.id)
+        with self.assertNumQueries(1):
+            status = forecaster.get_department_load_status(forecast_data=self.forecast)
+        by_name = {row["name"]: row for row in status}
+
+        # Two active doctors × DEFAULT_PATIENTS_PER_DOCTOR = 30 patients a day
+        cardiology = by_name["Cardiology"]
+        self.assertEqual(
+            [(day["name"], day["percent"], day["status"]) for day in cardiology["days"]],
+            [("Mar 02", 33, "Normal"), ("Mar 03", 67, "Moderate"), ("Mar 04", 90, "High")],
+        )
+        self.assertEqual((cardiology["percent"], cardiology["status"]), (33, "Normal"))
+
+        # No active doctors: capacity floors at one patient, utilisation at 100%
+        self.assertEqual([day["percent"] for day in by_name["Neurology"]["days"]], [0, 0, 100])
+
+    def test_slice_forecast_trims_the_daily_bands(self):
+        forecaster = arima_model.ARIMAForecaster(self.hospital.id)
+        result = {
+            **self.forecast,
+            "status": forecaster.get_department_load_status(forecast_data=self.forecast)
+                      + [{"name": "Legacy", "status": "Normal"}],
+            "metadata": {"max_forecast_range": 3},
+        }
+        sliced = services.slice_forecast(result, 2)
+
+        self.assertEqual(len(sliced["forecast"]), 2)
+        self.assertEqual(sliced["metadata"]["max_forecast_range"], 2)
+        for row in sliced["status"][:-1]:
+            self.assertEqual([day["name"] for day in row["days"]], ["Mar 02", "Mar 03"])
+        self.assertEqual(sliced["status"][-1], {"name": "Legacy", "status": "Normal"})
+        self.assertEqual(len(result["status"][0]["days"]), 3)        # input untouched
+
+
+class RangeNormalizationTests(SimpleTestCase):
+    """Only the standard windows ever reach a disease cache key."""
+
+    def test_standard_ranges_keep_their_window(self):
+        for range_param, days in [("7days", 7), ("30d", 30), ("3m", 90), ("6m", 180)]:
+            self.assertEqual(services.normalize_range(range_param), days)
+
+    def test_arbitrary_ranges_snap_to_a_covering_window(self):
+        self.assertEqual(services.normalize_range("14days"), 30)
+        self.assertEqual(services.normalize_range("99999"), 180)
+        self.assertEqual(services.normalize_range("nonsense"), 30)
+        self.assertEqual(services.normalize_range(None), 30)
+
+    def test_equivalent_ranges_share_a_cache_key(self):
+        keys = {
+            services.disease_cache_key(services.normalize_range(r), "all")
+            for r in ("30days", "30d", "21", "30days;x")
+        }
+        self.assertEqual(keys, {"disease_dist_30days_all"})
+
+
+class DiskCacheEvictionTests(SimpleTestCase):
+    """Model cache directories stay under their TTL and byte cap."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        # Collect explicitly instead of on the background thread
+        patcher = mock.patch.object(DiskCache, "_ensure_gc_thread")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.now = time.time()
+
+    def _bundle(self, name: str, hours_ago: float, size: int = 100, suffix: str = ".pkl") -> str:
+        path = f"{self.directory}/{name}{suffix}"
+        with open(path, "wb") as f:
+            f.write(b"x" * size)
+        used = self.now - hours_ago * 3600
+        os.utime(path, (used, used))
+        return path
+
+    def _files(self) -> set:
+        return set(os.listdir(self.directory))
+
+    def test_bundles_unused_beyond_the_ttl_expire(self):
+        self._bundle("old", hours_ago=30)
+        self._bundle("recent", hours_ago=2)
+        cache = DiskCache(self.directory, max_bytes=10_000, ttl_hours=24)
+
+        self.assertEqual(cache.collect()["expired"], 1)
+        self.assertEqual(self._files(), {"recent.pkl"})
+
+    def test_least_recently_used_bundles_go_first_over_the_cap(self):
+        for name, hours_ago in (("a", 3), ("b", 2), ("c", 1)):
+            self._bundle(name, hours_ago)
+        cache = DiskCache(self.directory, max_bytes=250, ttl_hours=24)
+
+        result = cache.collect()
+        self.assertEqual((result["evicted"], result["freed_bytes"]), (1, 100))
+        self.assertEqual(self._files(), {"b.pkl", "c.pkl"})
+
+    def test_touch_protects_a_bundle_from_eviction(self):
+        oldest = self._bundle("a", hours_ago=3)
+        self._bundle("b", hours_ago=2)
+        self._bundle("c", hours_ago=1)
+        cache = DiskCache(self.directory, max_bytes=250, ttl_hours=24)
+
+        cache.touch(oldest)                          # loaded by a request
+        cache.collect()
+        self.assertEqual(self._files(), {"a.pkl", "c.pkl"})
+
+    def test_orphaned_temporary_files_are_removed(self):
+        self._bundle("stale", hours_ago=2, suffix=".pkl.123.tmp")
+        self._bundle("writing", hours_ago=0, suffix=".pkl.456.tmp")
+        DiskCache(self.directory, max_bytes=10_000, ttl_hours=24).collect()
+
+        self.assertEqual(self._files(), {"writing.pkl.456.tmp"})
+
+
+class ModelStoreTests(TestCase):
+    """Shared model store backends: round trips, latest lookup and pruning."""
+
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        self.stores = [model_store.FileSystemModelStore(root), model_store.DatabaseModelStore()]
+        self.hospital_id = str(Hospital.objects.create(name="General").id)
+        self.key = model_store.ModelKey(self.hospital_id, "dept_x", "hash1", "v1")
+
+    def test_save_then_load_exact_or_latest(self):
+        for store in self.stores:
+            with self.subTest(backend=store.backend):
+                store.save(self.key, {"model": 1})
+                other = self.key._replace(data_hash="hash2")
+
+                self.assertEqual(store.load(self.key), {"model": 1})
+                self.assertEqual(store.load(other), {"model": 1})
+                self.assertIsNone(store.load(other, latest=False))
+
+    def test_publishing_prunes_old_data_and_code_versions(self):
+        for store in self.stores:
+            with self.subTest(backend=store.backend):
+                keys = [self.key._replace(data_hash=f"hash{i}") for i in range(4)]
+                for i, key in enumerate(keys):
+                    store.save(key, {"model": i})
+                    time.sleep(0.01)             # distinct modification times
+                self.assertEqual(store.latest_key(self.key), keys[-1])
+                self.assertEqual(
+                    [store.get(key) is not None for key in keys], [False, False, True, True]
+                )
+
+                newer = self.key._replace(code_version="v2")
+                store.save(newer, {"model": "v2"})
+                self.assertIsNone(store.get(keys[-1]))
+                self.assertEqual(store.load(newer._replace(data_hash="other")), {"model": "v2"})
+
+    def test_evaluation_folds_are_not_published(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        store = mock.Mock(wraps=self.stores[0])
+        with mock.patch.object(model_store, "get_model_store", return_value=store), \
+                mock.patch.object(model_store, "_in_forked_worker", return_value=False), \
+                mock.patch.object(arima_model, "MODEL_CACHE_DIR", cache_dir):
+            series = _weekly_series(60, "2026-03-01")
+            arima_model._fit_series(series, arima_model._cache_path(self.hospital_id, "dept_x"))
+            train = series.iloc[:-14]
+            arima_model._fit_series(
+                train,
+                arima_model._cache_path(self.hospital_id, arima_model._eval_cache_key(train)),
+                settled=True,
+            )
+
+        self.assertEqual(
+            [call.args[0].series_key for call in store.save.call_args_list], ["dept_x"]
+        )
+        self.assertEqual(
+            {call.args[0].series_key for call in store.load.call_args_list}, {"dept_x"}
+        )
+
+
+class SingleFlightTests(SimpleTestCase):
+    """One computation per key, and no per-key state left behind."""
+
+    def setUp(self):
+        lock_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, lock_dir, ignore_errors=True)
+        patcher = mock.patch.object(singleflight, "LOCK_DIR", lock_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_concurrent_callers_share_one_computation(self):
+        store, calls = {}, []
+        release = threading.Event()
+
+        def compute():
+            calls.append(1)
+            release.wait(5)
+            store["value"] = 42
+            return 42
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(
+                singleflight.run("key", compute, cached=lambda: store.get("value"))
+            ))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join(10)
+
+        self.assertEqual(results, [42] * 5)
+        self.assertEqual(len(calls), 1)
+
+    def test_lock_entries_are_released(self):
+        for i in range(100):
+            singleflight.run(f"key-{i}", lambda: i)
+        with singleflight.acquire("held") as acquired:
+            self.assertTrue(acquired)
+            self.assertEqual(set(singleflight._thread_locks), {"held"})
+        self.assertEqual(singleflight._thread_locks, {})
+
+
+class SyntheticDataTests(TestCase):
+    """Generated visits keep their back-dated timestamps."""
+
+    def test_visits_are_backdated_without_touching_model_metadata(self):
+        end = timezone.localdate() - timedelta(days=3)
+        result = synthetic.generate(
+            hospitals=1, departments=2, doctors=1, patients=5, days=20,
+            daily_rate=3, end_date=end, log=lambda *args: None,
+        )
+
+        visits = Visit.objects.filter(hospital_id__in=result["hospitals"])
+        self.assertEqual(visits.count(), result["visits"])
+        days = {timezone.localdate(v) for v in visits.values_list("visit_date", flat=True)}
+        self.assertEqual(max(days), end)
+        self.assertEqual(min(days), end - timedelta(days=19))
+        self.assertTrue(Visit._meta.get_field("visit_date").auto_now_add)
+
+        counted = sum(VisitDailyRollup.objects.filter(
+            hospital_id__in=result["hospitals"]
+        ).values_list("visit_count", flat=True))
+        self.assertEqual(counted, result["visits"])
+
+    def test_clear_removes_generated_data_without_loading_visits(self):
+        result = synthetic.generate(
+            hospitals=1, departments=2, doctors=1, patients=5, days=20,
+            daily_rate=3, log=lambda *args: None,
+        )
+        hospital = Hospital.objects.create(name="General")
+        patient  = Profile.objects.create(role="patient", hospital=hospital)
+        Visit.objects.create(hospital=hospital, patient=patient, doctor=patient, diagnosis="Flu")
+
+        deleted = []
+        def receiver(sender, **kwargs):
+            deleted.append(kwargs["instance"])
+        post_delete.connect(receiver, sender=Visit)
+        self.addCleanup(post_delete.disconnect, receiver, sender=Visit)
+
+        removed = synthetic.clear(log=lambda *args: None, batch_size=25)
+
+        self.assertEqual(removed, {"hospitals": 1, "visits": result["visits"]})
+        self.assertEqual(deleted, [])
+        self.assertFalse(Hospital.objects.filter(id__in=result["hospitals"]).exists())
+        self.assertFalse(VisitDailyRollup.objects.filter(hospital_id__in=result["hospitals"]).exists())
+        self.assertEqual(Visit.objects.count(), 1)
+        self.assertEqual(
+            list(VisitDailyRollup.objects.values_list("hospital_id", "visit_count")),
+            [(hospital.id, 1)],
+        )
+
+
+class DegradedForecastTests(TestCase):
+    """A stopgap forecast is cached as degraded and schedules the full fit."""
+
+    def setUp(self):
+        self.hospital = Hospital.objects.create(name="General")
+        lock_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, lock_dir, ignore_errors=True)
+        for patcher in (
+            mock.patch.object(singleflight, "LOCK_DIR", lock_dir),
+            mock.patch.object(services.ml_models, "ARIMAForecaster", self._forecaster),
+            mock.patch.object(jobs, "submit"),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.budget_calls = []
+
+    def _forecaster(self, hospital_id):
+        forecaster = mock.Mock()
+
+        def forecast_by_department(steps, reconcile, budgeted):
+            self.budget_calls.append(budgeted)
+            metadata = {"dept_models": {"d1": "sarima_fixed" if budgeted else "sarima"}}
+            if budgeted:
+                metadata["budget"] = {"timed_out": [], "stopgap": ["d1"]}
+            return {"forecast": [{"name": "Apr 01", "d1": 3}] * steps, "metadata": metadata}
+
+        forecaster.forecast_by_department.side_effect = forecast_by_department
+        forecaster.get_department_load_status.return_value = []
+        return forecaster
+
+    def test_stopgap_forecast_is_cached_as_degraded_and_refit_scheduled(self):
+        payload = services.forecast_payload(self.hospital.id, 7)
+
+        self.assertTrue(payload["metadata"]["degraded"])
+        jobs.submit.assert_called_once_with(
+            self.hospital.id, "forecast",
+            {"days": services.MAX_FORECAST_HORIZON, "reconcile": None},
+        )
+        # Later dashboard requests are served the degraded entry from the cache
+        services.forecast_payload(self.hospital.id, 7)
+        self.assertEqual(self.budget_calls, [True])
+
+    def test_background_job_replaces_the_degraded_entry(self):
+        services.forecast_payload(self.hospital.id, 7)
+        services.forecast_payload(self.hospital.id, 7, budgeted=False)
+        payload = services.forecast_payload(self.hospital.id, 7)
+
+        self.assertEqual(self.budget_calls, [True, False])
+        self.assertNotIn("degraded", payload["metadata"])
+        jobs.submit.assert_called_once()
+
+
+class BudgetedModelLabelTests(TestCase):
+    """Budgeted forecasts only report fixed-order stopgaps as "sarima_fixed"."""
+
+    def setUp(self):
+        self.hospital   = Hospital.objects.create(name="General")
+        self.department = Department.objects.create(hospital=self.hospital, name="Cardiology")
+        self.key        = str(self.department.id)
+        self.series     = _weekly_series(91, "2026-03-01", seed=4)
+
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        for patcher in (
+            mock.patch.object(arima_model, "MODEL_CACHE_DIR", cache_dir),
+            mock.patch.object(arima_model, "_load_visit_matrix", self._visit_matrix),
+            # Always prefer SARIMA to the fast tier
+            mock.patch.object(arima_model, "SARIMA_MIN_IMPROVEMENT", -100),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.forecaster = arima_model.ARIMAForecaster(self.hospital.id)
+
+    def _visit_matrix(self, hospital_id, start_date, end_date, dept_ids):
+        return self.series.index, np.vstack([self.series.to_numpy(), np.zeros(len(self.series))])
+
+    def _models(self, budgeted):
+        metadata = self.forecaster.forecast_by_department(steps=7, budgeted=budgeted)["metadata"]
+        return metadata["dept_models"][self.key], metadata.get("budget", {}).get("stopgap")
+
+    def test_cold_budgeted_fit_is_a_stopgap(self):
+        self.assertEqual(self._models(budgeted=True), ("sarima_fixed", [self.key]))
+
+    def test_updated_full_search_model_is_reported_as_sarima(self):
+        self.assertEqual(self._models(budgeted=False), ("sarima", None))
+
+        # Next day: the cached model is extended with the new day, not re-estimated
+        self.series = _weekly_series(92, "2026-03-02", seed=4)
+        with timing.recording("test") as timer:
+            self.assertEqual(self._models(budgeted=True), ("sarima", []))
+        self.assertEqual(timer.counters.get("model_updates"), 1)
+
+
+class FastTierHistoryTests(TestCase):
+    """Department forecasts give the fast tier more than a year of history."""
+
+    def setUp(self):
+        self.hospital = Hospital.objects.create(name="General")
+        Department.objects.create(hospital=self.hospital, name="Cardiology")
+        self.requested = []
+
+    def _visit_matrix(self, hospital_id, start_date, end_date, dept_ids):
+        self.requested.append((start_date, end_date))
+        dates = pd.date_range(
+            end=arima_model._naive_day(end_date),
+            start=arima_model._naive_day(start_date), freq="D",
+        )
+        series = _weekly_series(len(dates), str(dates[-1].date()), seed=6)
+        return dates, np.vstack([series.to_numpy(), np.zeros(len(dates))])
+
+    def test_fast_tier_sees_the_long_history_and_sarima_the_recent_window(self):
+        fast = mock.Mock(wraps=arima_model._fast_forecast)
+        with mock.patch.object(arima_model, "_load_visit_matrix", self._visit_matrix), \
+                mock.patch.object(arima_model, "_fast_forecast", fast), \
+                mock.patch.object(
+                    arima_model.ARIMAForecaster, "_fit_departments", return_value={},
+                ) as fit:
+            arima_model.ARIMAForecaster(self.hospital.id).forecast_by_department(steps=7)
+
+        start, end = self.requested[0]
+        self.assertEqual((end - start).days, arima_model.FAST_TIER_HISTORY_DAYS)
+        history_days = fast.call_args.args[0].shape[1]
+        self.assertEqual(history_days, arima_model.FAST_TIER_HISTORY_DAYS + 1)
+        self.assertGreaterEqual(
+            history_days - fingerprint.PROVISIONAL_DAYS - fast_models.BACKTEST_DAYS,
+            fourier_model.ANNUAL_MIN_DAYS,
+        )
+        (series, _, _), = fit.call_args.args[0].values()
+        self.assertEqual(len(series), 91)
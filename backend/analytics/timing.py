@@ -0,0 +1,100 @@
+"""
+Per-stage timing and counters for analytics computations.
+
+A view (or command) opens a recording() block; code anywhere below it —
+services, the forecaster, the disease classifier — reports into the same
+StageTimer through the module-level stage() and count() helpers, which do
+nothing when no recording is active.  The active timer lives in a
+context variable, so concurrent requests never mix their numbers.
+
+Stages (wall time, accumulated when entered repeatedly):
+    db          database queries and row transfer
+    aggregate   pandas/NumPy shaping of the loaded rows
+    model_load  reading cached models from memory or disk
+    fit         model estimation / training
+    predict     forecasting and inference from a fitted model
+Counters: rows_loaded, fits, cache_hits, cache_misses (plus any others).
+
+A finished recording is logged to the "analytics.timing" logger, and
+server_timing() renders it as a Server-Timing header value.
+"""
+import contextvars
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+logger = logging.getLogger("analytics.timing")
+
+_current = contextvars.ContextVar("analytics_stage_timer", default=None)
+
+
+class StageTimer:
+    """Accumulated wall time per stage plus named counters for one computation."""
+
+    def __init__(self, name: str):
+        self.name     = name
+        self.started  = time.perf_counter()
+        self.stages   = {}
+        self.counters = {}
+        self._lock    = threading.Lock()      # budgeted fits report from worker threads
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.stages[name] = self.stages.get(name, 0.0) + elapsed
+
+    def count(self, name: str, n: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "total_ms":  round((time.perf_counter() - self.started) * 1000, 1),
+                "stages_ms": {k: round(v * 1000, 1) for k, v in self.stages.items()},
+                "counters":  dict(self.counters),
+            }
+
+    def server_timing(self) -> str:
+        """The recording as a Server-Timing header value (durations in ms)."""
+        timings = self.as_dict()
+        entries = [f"{name};dur={ms}" for name, ms in timings["stages_ms"].items()]
+        entries.append(f"total;dur={timings['total_ms']}")
+        return ", ".join(entries)
+
+
+@contextmanager
+def recording(name: str):
+    """Collect stage timings for the enclosed block; yields the StageTimer."""
+    timer = StageTimer(name)
+    token = _current.set(timer)
+    try:
+        yield timer
+    finally:
+        _current.reset(token)
+        logger.info("%s %s", name, json.dumps(timer.as_dict()))
+
+
+def current():
+    """The active StageTimer, or None outside a recording."""
+    return _current.get()
+
+
+def stage(name: str):
+    """Time the enclosed block as `name` in the active recording (if any)."""
+    timer = _current.get()
+    return timer.stage(name) if timer is not None else nullcontext()
+
+
+def count(name: str, n: int = 1):
+    """Add `n` to counter `name` in the active recording (if any)."""
+    timer = _current.get()
+    if timer is not None:
+        timer.count(name, n)
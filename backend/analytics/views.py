@@ -3,14 +3,22 @@ Views for the Analytics app.
 Provides AI-driven forecasting and disease distribution analytics.
 Utilizes ARIMA and classification models to generate hospital-specific metrics.
 """
+import time
+
 from rest_framework import viewsets, response, permissions
 from rest_framework.decorators import action
-from .models import AIAnalytics
-from .serializers import AIAnalyticsSerializer
-from .ml_models import ARIMAForecaster, DiseaseClassifier
-from django.utils import timezone
+from .models import AIAnalytics, AnalyticsJob
+from .serializers import AIAnalyticsSerializer, AnalyticsJobSerializer
+from .ml_models import MAX_FORECAST_HORIZON, RECONCILIATION_METHODS  # lazy facade: no ML stack import here
+from . import jobs, services, timing
 from users.models import Profile # To get hospital_id from user profile
 
+# Longest a job_status request may long-poll, and how often it re-checks
+# (seconds).  A waiting poll holds a sync worker thread, so the wait is kept
+# short: clients re-poll rather than park a worker for a job's whole runtime.
+JOB_MAX_WAIT_SECONDS = 5
+JOB_POLL_SECONDS = 0.5
+
 class AIAnalyticsViewSet(viewsets.ModelViewSet):
     """
     ViewSet for AI Analytics results.
@@ -31,56 +39,49 @@ class AIAnalyticsViewSet(viewsets.ModelViewSet):
             return None
 
     def _parse_range(self, range_param, default_days=7):
-        """
-        Safely parses range strings into integers.
-        Supports '7days', '30d', '30days', '7', etc.
-        """
-        if not range_param:
-            return default_days
-        
-        # Hardcoded mappings for consistency
-        VALID_RANGES = {
-            '7d': 7, '7days': 7,
-            '30d': 30, '30days': 30,
-            '90d': 90, '90days': 90, '3m': 90,
-            '180d': 180, '180days': 180, '6m': 180
-        }
-        
-        if range_param in VALID_RANGES:
-            return VALID_RANGES[range_param]
-            
-        # Regex-style fallback for mixed strings like "14days"
-        import re
-        match = re.search(r'(\d+)', str(range_param))
-        if match:
-            try:
-                return int(match.group(1))
-            except ValueError:
-                pass
-                
-        return default_days
-
-    def get_cached_result(self, metric_name, hospital_id, validity_hours=6):
-        six_hours_ago = timezone.now() - timezone.timedelta(hours=validity_hours)
-        return AIAnalytics.objects.filter(
-            hospital_id=hospital_id,
-            metric_name=metric_name,
-            calculated_at__gte=six_hours_ago
-        ).order_by('-calculated_at').first()
+        return services.parse_range(range_param, default_days=default_days)
+
+    def get_cached_result(self, metric_name, hospital_id, validity_hours=services.ANALYTICS_CACHE_HOURS):
+        return services.get_cached_result(metric_name, hospital_id, validity_hours)
 
     def set_cached_result(self, metric_name, hospital_id, value):
-        AIAnalytics.objects.create(
-            hospital_id=hospital_id,
-            metric_name=metric_name,
-            metric_date=timezone.now().date(),
-            value=value
-        )
+        services.set_cached_result(metric_name, hospital_id, value)
+
+    def _forecast_params(self, data):
+        """Validated forecast parameters, or (None, error response)."""
+        days = self._parse_range(data.get('range', '7days'), default_days=7)
+
+        # Absolute bounds for forecast range (7 days to 1 year)
+        days = max(7, min(MAX_FORECAST_HORIZON, days))
+
+        # Optional hierarchical reconciliation (department rows sum to a total)
+        reconcile = data.get('reconcile') or None
+        if reconcile is not None and reconcile not in RECONCILIATION_METHODS:
+            return None, response.Response({
+                "error": f"Invalid reconcile value. Use one of: "
+                         f"{', '.join(RECONCILIATION_METHODS)}"
+            }, status=400)
+
+        return {"days": days, "reconcile": reconcile}, None
+
+    def _timed_response(self, payload, timer):
+        """
+        Response carrying the per-stage timings in a Server-Timing header and,
+        with ?timings=1, in metadata.timings (cached payloads are not modified).
+        """
+        if self.request.query_params.get('timings', '').lower() in ('1', 'true', 'yes'):
+            payload = dict(payload)
+            payload["metadata"] = {**(payload.get("metadata") or {}), "timings": timer.as_dict()}
+        resp = response.Response(payload)
+        resp["Server-Timing"] = timer.server_timing()
+        return resp
 
     @action(detail=False, methods=['get'])
     def forecast(self, request):
         """
         Generates volume forecasts by department using the ARIMAForecaster.
-        Supports '7d', '30d', and other ranges via query parameters.
+        Supports '7d', '30d', and other ranges via query parameters, and
+        'reconcile=bottom_up|top_down|mint' for coherent department/hospital totals.
         Includes robust validation and error handling as per diagnostic report.
         """
         try:
@@ -88,47 +89,16 @@ class AIAnalyticsViewSet(viewsets.ModelViewSet):
             if not hospital_id:
                 return response.Response({"error": "Hospital ID not found for user session."}, status=401)
 
-            range_param = request.query_params.get('range', '7days')
-            days = self._parse_range(range_param, default_days=7)
-            
-            # Absolute bounds for forecast range (7 days to 1 year)
-            days = max(7, min(365, days))
-
-            cache_key = f"forecast_{days}days"
-            
-            # Check cache to avoid heavy forecasting computations
-            cached = self.get_cached_result(cache_key, hospital_id)
-            if cached:
-                return response.Response(cached.value)
+            params, error = self._forecast_params(request.query_params)
+            if error:
+                return error
+            days, reconcile = params["days"], params["reconcile"]
 
-            forecaster = ARIMAForecaster(hospital_id=hospital_id)
-            
-            # Core computation
-            forecast_results = forecaster.forecast_by_department(steps=days)
-            
-            # Handle cases with no data safely (return 200 with empty forecast instead of 500)
-            if forecast_results is None or not forecast_results.get('forecast'):
-                return response.Response({
-                    "forecast": [], 
-                    "status": [],
-                    "metadata": {
-                        "confidence": 0,
-                        "is_learning": True,
-                        "message": "No historical data available for analysis"
-                    }
-                }, status=200)
-
-            # Analyze load status (capacity vs expected volume)
-            load_status = forecaster.get_department_load_status(forecast_data=forecast_results)
-            
-            result = {
-                "forecast": forecast_results['forecast'],
-                "status": load_status,
-                "metadata": forecast_results['metadata']
-            }
-            
-            self.set_cached_result(cache_key, hospital_id, result)
-            return response.Response(result)
+            # Cached full-horizon forecast sliced to the range (computed once
+            # for all concurrent callers on a miss)
+            with timing.recording("forecast") as timer:
+                payload = services.forecast_payload(hospital_id, days, reconcile)
+            return self._timed_response(payload, timer)
             
         except Exception as e:
             import traceback
@@ -151,22 +121,15 @@ class AIAnalyticsViewSet(viewsets.ModelViewSet):
                 return response.Response({"error": "Hospital ID not found for user"}, status=400)
             
             range_param = request.query_params.get('range', '30days')
-            department_id = request.query_params.get('dept', 'all')
-            cache_key = f"disease_dist_{range_param}_{department_id}"
-            
-            cached = self.get_cached_result(cache_key, hospital_id)
-            if cached:
-                return response.Response(cached.value)
-
-            classifier = DiseaseClassifier(hospital_id=hospital_id)
-            
-            # Use the new robust parser
-            days = self._parse_range(range_param, default_days=30)
-            
-            result = classifier.get_distribution(days=days, department_id=department_id)
-            
-            self.set_cached_result(cache_key, hospital_id, result)
-            return response.Response(result)
+            department_id = services.normalize_department(
+                hospital_id, request.query_params.get('dept', 'all')
+            )
+            if department_id is None:
+                return response.Response({"error": "Invalid dept: use 'all' or a department id of this hospital."}, status=400)
+
+            with timing.recording("disease_distribution") as timer:
+                payload = services.disease_payload(hospital_id, range_param, department_id)
+            return self._timed_response(payload, timer)
         except Exception as e:
             return response.Response({"error": f"Analysis failed: {str(e)}"}, status=500)
 
@@ -179,12 +142,75 @@ class AIAnalyticsViewSet(viewsets.ModelViewSet):
         if not hospital_id:
             return response.Response({"error": "Hospital ID not found for user"}, status=400)
 
-        forecaster = ARIMAForecaster(hospital_id=hospital_id)
-        classifier = DiseaseClassifier(hospital_id=hospital_id)
+        with timing.recording("evaluate_models") as timer:
+            payload = services.evaluate_models(hospital_id)
+        return self._timed_response(payload, timer)
+
+    # ------------------------------------------------------------------
+    # Asynchronous jobs: submit, then poll (or long-poll) for the result
+    # ------------------------------------------------------------------
+
+    @action(detail=False, methods=['post'], url_path='jobs')
+    def submit_job(self, request):
+        """
+        Queues an analytics computation and returns immediately (202).
+        Body: {"kind": "forecast" | "disease_distribution" | "evaluate_models",
+               plus that endpoint's parameters: range, reconcile, dept}.
+        Poll jobs/<id>/ (optionally with ?wait=<seconds>) for the result.
+        """
+        hospital_id = self.get_hospital_id()
+        if not hospital_id:
+            return response.Response({"error": "Hospital ID not found for user"}, status=400)
+
+        kind = request.data.get('kind')
+        if kind == 'forecast':
+            params, error = self._forecast_params(request.data)
+            if error:
+                return error
+        elif kind == 'disease_distribution':
+            params = {
+                "range": f"{services.normalize_range(request.data.get('range'))}days",
+                "dept": services.normalize_department(hospital_id, request.data.get('dept') or 'all'),
+            }
+            if params["dept"] is None:
+                return response.Response({"error": "Invalid dept: use 'all' or a department id of this hospital."}, status=400)
+        elif kind == 'evaluate_models':
+            params = {}
+        else:
+            return response.Response({
+                "error": f"Invalid job kind. Use one of: {', '.join(jobs.JOB_KINDS)}"
+            }, status=400)
+
+        job = jobs.submit(hospital_id, kind, params)
+        return response.Response(AnalyticsJobSerializer(job).data, status=202)
+
+    @action(
+        detail=False, methods=['get'],
+        url_path=r'jobs/(?P<job_id>[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12})',
+    )
+    def job_status(self, request, job_id=None):
+        """
+        Returns a job's status and, once finished, its result or error.
+        ?wait=<seconds> long-polls until the job finishes (max JOB_MAX_WAIT_SECONDS).
+        """
+        hospital_id = self.get_hospital_id()
+        if not hospital_id:
+            return response.Response({"error": "Hospital ID not found for user"}, status=400)
+
+        job = AnalyticsJob.objects.filter(id=job_id, hospital_id=hospital_id).first()
+        if job is None:
+            return response.Response({"error": "Job not found"}, status=404)
+        if not job.is_finished:
+            jobs.recover_lost_jobs()        # "thread" mode: its queue may have died
+
+        try:
+            wait = min(JOB_MAX_WAIT_SECONDS, max(0.0, float(request.query_params.get('wait', 0))))
+        except ValueError:
+            wait = 0.0
 
-        metrics = {
-            "arima_forecasting": forecaster.evaluate(),
-            "disease_classification": classifier.evaluate()
-        }
+        deadline = time.monotonic() + wait
+        while not job.is_finished and time.monotonic() < deadline:
+            time.sleep(JOB_POLL_SECONDS)
+            job.refresh_from_db()
 
-        return response.Response(metrics)
+        return response.Response(AnalyticsJobSerializer(job).data)
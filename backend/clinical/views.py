@@ -8,7 +8,8 @@ from rest_framework.response import Response
 from django.db import transaction
 from django.utils import timezone
 from datetime import timedelta
-from django.db.models import Count, Q
+from django.db.models import Q, Sum
+from django.db.models.functions import Coalesce
 from .models import Visit, Prescription, LabReport, Vaccination
 from .serializers import (
     VisitSerializer, DetailedVisitSerializer, PrescriptionSerializer, 
@@ -47,16 +48,18 @@ class VisitViewSet(viewsets.ModelViewSet):
         if not doctor_id:
             return Response({'error': 'doctor_id is required'}, status=400)
         
-        now = timezone.now()
-        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        week_ago = now - timedelta(days=7)
-        month_ago = now - timedelta(days=30)
-        
-        stats = Visit.objects.filter(doctor_id=doctor_id).aggregate(
-            today=Count('id', filter=Q(visit_date__gte=today_start)),
-            week=Count('id', filter=Q(visit_date__gte=week_ago)),
-            month=Count('id', filter=Q(visit_date__gte=month_ago)),
-            total=Count('id')
+        # Read from the daily rollup: week/month are the last 7/30 calendar days
+        from analytics.models import VisitDailyRollup
+
+        today = timezone.localdate()
+        week_start = today - timedelta(days=6)
+        month_start = today - timedelta(days=29)
+
+        stats = VisitDailyRollup.objects.filter(doctor_id=doctor_id).aggregate(
+            today=Coalesce(Sum('visit_count', filter=Q(day__gte=today)), 0),
+            week=Coalesce(Sum('visit_count', filter=Q(day__gte=week_start)), 0),
+            month=Coalesce(Sum('visit_count', filter=Q(day__gte=month_start)), 0),
+            total=Coalesce(Sum('visit_count'), 0)
         )
         
         return Response(stats)
@@ -237,3 +237,19 @@ EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
 DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', EMAIL_HOST_USER)
 
+
+# Logging: per-stage analytics timings (analytics/timing.py) as one JSON line per request
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'analytics.timing': {
+            'handlers': ['console'],
+            'level': os.getenv('ANALYTICS_TIMING_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
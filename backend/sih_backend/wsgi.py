@@ -14,3 +14,10 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sih_backend.settings')
 
 application = get_wsgi_application()
+
+# Opt-in: load cached analytics models before gunicorn forks its workers.
+# Combined with `gunicorn --preload` the warm models start out shared
+# copy-on-write instead of being unpickled again by every worker.
+if os.getenv('ANALYTICS_PRELOAD_MODELS') == '1':
+    from analytics.ml_models.model_cache import warm_model_cache
+    warm_model_cache()